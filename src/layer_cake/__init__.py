@@ -37,15 +37,18 @@ from .message_memory import *
 from .make_message import *
 from .virtual_codec import *
 from .json_codec import *
+from .binary_codec import *
 from .object_logs import *
 from .virtual_runtime import *
 from .object_runtime import *
+from .log_agent import *
 from .virtual_point import *
 from .point_runtime import *
 from .routine_point import *
 from .point_machine import *
 from .file_object import *
 from .folder_object import *
+from .journal_object import *
 from .object_startup import *
 from .object_spool import *
 from .process_object import *
@@ -58,3 +61,4 @@ from .get_response import *
 from .retry_intervals import *
 from .disk_storage import *
 from .http import *
+from .http_pool import *
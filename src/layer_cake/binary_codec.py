@@ -0,0 +1,823 @@
+# Author: Scott Woods <scott.18.ansar@gmail.com>
+# MIT License
+#
+# Copyright (c) 2025 Scott Woods
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Implementation of the binary codec.
+
+A compact alternative to the JSON codec, intended for network
+streams. Rather than passing through the generic word form, values
+are written directly by functions compiled from the type expression,
+i.e. numbers, UUIDs, times and blocks go onto the wire without any
+conversion to text;
+
+* integers are zig-zag varints, floats are 8-byte IEEE,
+* strings and blocks are a varint length followed by the bytes,
+* containers are a varint count followed by the members,
+* messages are a varint count of (index, value) pairs, where the
+  index is the position of the member within the schema,
+* an Any is the signature, the length-prefixed value and the
+  list of pointer aliases used by that value.
+
+Pointers, addresses and a few other types still need the tables of
+the base codec. These are carried as generic words, with a small
+tagged rendering;
+
+* word_to_binary - generate the binary representation of a generic word.
+* binary_to_word - recovers a generic word from a binary representation.
+
+Both ends must share the same message schemas, with the exception of
+members appended to a schema.
+"""
+
+__docformat__ = 'restructuredtext'
+
+# .. autoclass:: CodecBinary
+# .. autofunction:: word_to_binary
+# .. autofunction:: binary_to_word
+
+import struct
+import uuid
+import datetime
+from collections import deque
+from copy import deepcopy
+from enum import Enum
+
+from .virtual_memory import *
+from .convert_memory import *
+from .convert_signature import *
+from .convert_type import *
+from .virtual_runtime import *
+from .message_memory import *
+from .make_message import *
+from .virtual_codec import *
+from .virtual_codec import CircularReferenceError, patch_attribute, patch_item
+from .virtual_codec import CODEC_SPACE, CODEC_OPERATION, STARTING_ALIAS
+
+
+__all__ = [
+	'word_to_binary',
+	'binary_to_word',
+	'CodecBinary',
+]
+
+# First byte of every encoding. Also distinguishes
+# a binary encoding from JSON, i.e. never a '{'.
+BINARY_VERSION = 1
+
+FLOAT = struct.Struct('<d')
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Primitive rendering.
+def put_varint(s, n):
+	while n > 0x7f:
+		s.append((n & 0x7f) | 0x80)
+		n >>= 7
+	s.append(n)
+
+def put_integer(s, n):
+	put_varint(s, n << 1 if n >= 0 else ((-n) << 1) - 1)
+
+def put_bytes(s, b):
+	put_varint(s, len(b))
+	s += b
+
+def put_text(s, t):
+	put_bytes(s, t.encode('utf-8'))
+
+class BinaryReader(object):
+	"""Sequential parsing of a binary representation.
+
+	:param data: the encoded bytes
+	:type data: bytes or bytearray
+	"""
+	def __init__(self, data):
+		self.data = data
+		self.at = 0
+
+	def byte(self):
+		c = self.data[self.at]
+		self.at += 1
+		return c
+
+	def varint(self):
+		data = self.data
+		at = self.at
+		n = 0
+		shift = 0
+		while True:
+			c = data[at]
+			at += 1
+			n |= (c & 0x7f) << shift
+			if c < 0x80:
+				break
+			shift += 7
+		self.at = at
+		return n
+
+	def integer(self):
+		z = self.varint()
+		if z & 1:
+			return -((z + 1) >> 1)
+		return z >> 1
+
+	def float(self):
+		f = FLOAT.unpack_from(self.data, self.at)[0]
+		self.at += 8
+		return f
+
+	def take(self, n):
+		at = self.at
+		e = at + n
+		if e > len(self.data):
+			raise ValueError('truncated encoding')
+		self.at = e
+		return self.data[at:e]
+
+	def block(self):
+		return self.take(self.varint())
+
+	def text(self):
+		return bytes(self.block()).decode('utf-8')
+
+# Tagged rendering of generic words, i.e. the
+# fallback for types that need the tables.
+WORD_NULL, WORD_FALSE, WORD_TRUE, WORD_INT, WORD_FLOAT, WORD_TEXT, WORD_LIST, WORD_DICT = range(8)
+
+def put_word(s, w):
+	c = w.__class__
+	if w is None:
+		s.append(WORD_NULL)
+	elif c is bool:
+		s.append(WORD_TRUE if w else WORD_FALSE)
+	elif c is int:
+		s.append(WORD_INT)
+		put_integer(s, w)
+	elif c is float:
+		s.append(WORD_FLOAT)
+		s += FLOAT.pack(w)
+	elif c is str:
+		s.append(WORD_TEXT)
+		put_text(s, w)
+	elif c is list:
+		s.append(WORD_LIST)
+		put_varint(s, len(w))
+		for y in w:
+			put_word(s, y)
+	elif c is dict:
+		s.append(WORD_DICT)
+		put_varint(s, len(w))
+		for k, v in w.items():
+			put_text(s, k)
+			put_word(s, v)
+	else:
+		raise TypeError(f'no binary word for "{c.__name__}"')
+
+def get_word(r):
+	b = r.byte()
+	if b == WORD_NULL:
+		return None
+	elif b == WORD_FALSE:
+		return False
+	elif b == WORD_TRUE:
+		return True
+	elif b == WORD_INT:
+		return r.integer()
+	elif b == WORD_FLOAT:
+		return r.float()
+	elif b == WORD_TEXT:
+		return r.text()
+	elif b == WORD_LIST:
+		return [get_word(r) for _ in range(r.varint())]
+	elif b == WORD_DICT:
+		w = {}
+		for _ in range(r.varint()):
+			k = r.text()
+			w[k] = get_word(r)
+		return w
+	raise ValueError(f'unknown word tag {b}')
+
+def word_to_binary(c, w):
+	"""Generate the binary representation of a generic word.
+
+	:param c: an active codec
+	:type c: a Codec-based object
+	:param w: a generic word
+	:rtype: bytes
+	"""
+	s = bytearray()
+	put_word(s, w)
+	return bytes(s)
+
+def binary_to_word(c, b):
+	"""Produce a generic word from a binary representation.
+
+	:param c: an active codec
+	:type c: a Codec-based instance
+	:param b: the binary representation
+	:type b: bytes
+	:rtype: a generic word.
+	"""
+	r = BinaryReader(b)
+	return get_word(r)
+
+# Compilation of encode/decode functions from
+# type expressions.
+def cannot(p, t):
+	raise TypeError(f'no transform {p.__class__.__name__}/{t.__class__.__name__}')
+
+INTEGER = (Byte, Integer2, Integer4, Integer8, Unsigned2, Unsigned4, Unsigned8)
+FLOATING = (Float4, Float8, ClockTime, TimeSpan)
+TEXT = (Rune, Unicode)
+BYTES = (Character, String)
+
+# Types carried as generic words.
+GENERIC = (PointerTo, Address, TargetAddress, Type, Word)
+
+def is_generic(t):
+	return isinstance(t, GENERIC) or t.__class__ is Portable
+
+def binary_encoder(t):
+	"""Generate a function that appends a non-null value of type `t`."""
+	if isinstance(t, Boolean):
+		def encode(c, p, s):
+			if p.__class__ is not bool:
+				cannot(p, t)
+			s.append(1 if p else 0)
+
+	elif isinstance(t, INTEGER):
+		def encode(c, p, s):
+			if p.__class__ is not int:
+				cannot(p, t)
+			put_integer(s, p)
+
+	elif isinstance(t, FLOATING):
+		def encode(c, p, s):
+			if p.__class__ is not float:
+				cannot(p, t)
+			s += FLOAT.pack(p)
+
+	elif isinstance(t, TEXT):
+		def encode(c, p, s):
+			if p.__class__ is not str:
+				cannot(p, t)
+			put_text(s, p)
+
+	elif isinstance(t, BYTES):
+		def encode(c, p, s):
+			if p.__class__ is not bytes:
+				cannot(p, t)
+			put_bytes(s, p)
+
+	elif isinstance(t, Block):
+		def encode(c, p, s):
+			if p.__class__ is not bytearray:
+				cannot(p, t)
+			put_bytes(s, p)
+
+	elif isinstance(t, WorldTime):
+		def encode(c, p, s):
+			if p.__class__ is not datetime.datetime:
+				cannot(p, t)
+			tz = p.tzinfo
+			if tz is None:
+				raise ValueError('cannot represent a naive datetime')
+			if not isinstance(tz, datetime.timezone):
+				raise ValueError('cannot represent a tzinfo that is not a datetime.timezone')
+			d = p - EPOCH
+			o = tz.utcoffset(None)
+			put_integer(s, (d.days * 86400 + d.seconds) * 1000000 + d.microseconds)
+			put_integer(s, o.days * 86400 + o.seconds)
+
+	elif isinstance(t, TimeDelta):
+		def encode(c, p, s):
+			if p.__class__ is not datetime.timedelta:
+				cannot(p, t)
+			put_integer(s, p.days)
+			put_varint(s, p.seconds)
+			put_varint(s, p.microseconds)
+
+	elif isinstance(t, UUID):
+		def encode(c, p, s):
+			if p.__class__ is not uuid.UUID:
+				cannot(p, t)
+			s += p.bytes
+
+	elif isinstance(t, Enumeration):
+		def encode(c, p, s):
+			if not isinstance(p, Enum):
+				cannot(p, t)
+			put_text(s, p.name)
+
+	elif isinstance(t, (VectorOf, ArrayOf, DequeOf, SetOf)):
+		b = t.__class__
+		if b is DequeOf:
+			expected = deque
+		elif b is SetOf:
+			expected = set
+		else:
+			expected = list
+		size = t.size if b is ArrayOf else None
+		e = nullable_encoder(t.element)
+		def encode(c, p, s):
+			if p.__class__ is not expected:
+				cannot(p, t)
+			n = len(p)
+			if size is not None and n != size:
+				raise ValueError(f'array [{n}] vs type [{size}]')
+			put_varint(s, n)
+			stack = c.walking_stack
+			for i, y in enumerate(p):
+				stack.append(i)
+				e(c, y, s)
+				stack.pop()
+
+	elif isinstance(t, MapOf):
+		k_e = nullable_encoder(t.key)
+		v_e = nullable_encoder(t.value)
+		def encode(c, p, s):
+			if p.__class__ is not dict:
+				cannot(p, t)
+			put_varint(s, len(p))
+			for k, v in p.items():
+				k_e(c, k, s)
+				v_e(c, v, s)
+
+	elif isinstance(t, UserDefined):
+		message = t.element
+		def encode(c, p, s):
+			if not is_message(p):
+				cannot(p, t)
+			binary_plan(message).encode(c, p, s)
+
+	elif isinstance(t, Any):
+		def encode(c, p, s):
+			encode_any(c, p, s)
+
+	elif is_generic(t):
+		def encode(c, p, s):
+			put_word(s, python_to_word(c, p, t))
+
+	else:
+		raise TypeError(f'no binary encoding for "{t.__class__.__name__}"')
+	return encode
+
+def binary_decoder(t):
+	"""Generate a function that parses a non-null value of type `t`."""
+	if isinstance(t, Boolean):
+		def decode(c, r):
+			return r.byte() != 0
+
+	elif isinstance(t, INTEGER):
+		def decode(c, r):
+			return r.integer()
+
+	elif isinstance(t, FLOATING):
+		def decode(c, r):
+			return r.float()
+
+	elif isinstance(t, TEXT):
+		def decode(c, r):
+			return r.text()
+
+	elif isinstance(t, BYTES):
+		def decode(c, r):
+			return bytes(r.block())
+
+	elif isinstance(t, Block):
+		def decode(c, r):
+			return bytearray(r.block())
+
+	elif isinstance(t, WorldTime):
+		def decode(c, r):
+			p = EPOCH + datetime.timedelta(microseconds=r.integer())
+			o = r.integer()
+			if o:
+				p = p.astimezone(datetime.timezone(datetime.timedelta(seconds=o)))
+			return p
+
+	elif isinstance(t, TimeDelta):
+		def decode(c, r):
+			days = r.integer()
+			seconds = r.varint()
+			microseconds = r.varint()
+			return datetime.timedelta(days=days, seconds=seconds, microseconds=microseconds)
+
+	elif isinstance(t, UUID):
+		def decode(c, r):
+			return uuid.UUID(bytes=bytes(r.take(16)))
+
+	elif isinstance(t, Enumeration):
+		def decode(c, r):
+			w = r.text()
+			try:
+				return t.element[w]
+			except KeyError:
+				m = t.element.__name__
+				raise ValueError(f'undefined enum "{m}.{w}"')
+
+	elif isinstance(t, (VectorOf, DequeOf, SetOf)):
+		b = t.__class__
+		d = nullable_decoder(t.element)
+		if b is SetOf:
+			def decode(c, r):
+				return set(d(c, r) for _ in range(r.varint()))
+		else:
+			def decode(c, r):
+				stack = c.walking_stack
+				p = []
+				for i in range(r.varint()):
+					stack.append(i)
+					try:
+						p.append(d(c, r))
+					except CircularReferenceError as e:
+						p.append(None)
+						c.patch_work.append([e.args[0], p, i, patch_item])
+					stack.pop()
+				if b is DequeOf:
+					return deque(p)
+				return p
+
+	elif isinstance(t, ArrayOf):
+		d = nullable_decoder(t.element)
+		size = t.size
+		def decode(c, r):
+			stack = c.walking_stack
+			p = []
+			n = r.varint()
+			for i in range(n):
+				stack.append(i)
+				try:
+					a = d(c, r)
+					if i < size:		# Ignore additional items.
+						p.append(a)
+				except CircularReferenceError as e:
+					if i < size:
+						p.append(None)
+						c.patch_work.append([e.args[0], p, i, patch_item])
+				stack.pop()
+			if n < size:
+				v = make(t.element)
+				p.extend(deepcopy(v) for _ in range(size - n))
+			return p
+
+	elif isinstance(t, MapOf):
+		k_d = nullable_decoder(t.key)
+		v_d = nullable_decoder(t.value)
+		def decode(c, r):
+			p = {}
+			for _ in range(r.varint()):
+				k = k_d(c, r)
+				try:
+					p[k] = v_d(c, r)
+				except CircularReferenceError as e:
+					p[k] = None
+					c.patch_work.append([e.args[0], p, k, patch_item])
+			return p
+
+	elif isinstance(t, UserDefined):
+		message = t.element
+		def decode(c, r):
+			return binary_plan(message).decode(c, r)
+
+	elif isinstance(t, Any):
+		def decode(c, r):
+			return decode_any(c, r)
+
+	elif is_generic(t):
+		def decode(c, r):
+			w = get_word(r)
+			try:
+				return word_to_python(c, w, t)
+			except CircularReferenceError:
+				raise CircularReferenceError(w)	# Need the alias for patching.
+
+	else:
+		raise TypeError(f'no binary decoding for "{t.__class__.__name__}"')
+	return decode
+
+def is_nullable(t):
+	# Structures cannot be null. Generic words and Any
+	# carry their own null.
+	return not is_structural(t) and not isinstance(t, Any) and not is_generic(t)
+
+def nullable_encoder(t):
+	"""Generate an encoder that also accepts None, where the type allows it."""
+	e = binary_encoder(t)
+	if not is_nullable(t):
+		return e
+	def encode(c, p, s):
+		if p is None:
+			s.append(0)
+			return
+		s.append(1)
+		e(c, p, s)
+	return encode
+
+def nullable_decoder(t):
+	"""Generate a decoder matching nullable_encoder."""
+	d = binary_decoder(t)
+	if not is_nullable(t):
+		return d
+	def decode(c, r):
+		if r.byte() == 0:
+			return None
+		return d(c, r)
+	return decode
+
+# The Any representation. Values of unknown types
+# are carried forward as opaque bytes.
+ANY_NULL, ANY_BINARY, ANY_WORD = range(3)
+
+def encode_any(c, p, s):
+	if p is None:
+		s.append(ANY_NULL)
+		return
+
+	if isinstance(p, Incognito):			# Created during a previous decoding operation.
+		w = p.decoded_word
+		if isinstance(w, (bytes, bytearray)):
+			s.append(ANY_BINARY)
+			put_text(s, p.type_name)
+			put_bytes(s, w)
+		else:								# From a JSON decoding.
+			s.append(ANY_WORD)
+			put_text(s, p.type_name)
+			put_word(s, w)
+		if p.saved_pointers:
+			c.portable_pointer.update(p.saved_pointers)
+			saved_pointers = list(p.saved_pointers.keys())
+		else:
+			saved_pointers = []
+		if c.address_book is not None:
+			c.address_book.update(p.address_book)
+
+	else:
+		if hasattr(p, '__art__'):
+			t = UserDefined(type(p))
+			v = p
+		elif isinstance(p, tuple) and len(p) == 2 and isinstance(p[1], Portable):
+			t = p[1]
+			v = p[0]
+		else:
+			raise ValueError(f'unexpected any value {p}')
+		stack = c.any_stack
+		stack.append(set())
+		b = bytearray()
+		e, _ = binary_coding(t)
+		e(c, v, b)
+		n = stack.pop()
+		stack[-1].update(n)
+		saved_pointers = list(n)
+		s.append(ANY_BINARY)
+		put_text(s, portable_to_signature(t))
+		put_bytes(s, b)
+
+	put_varint(s, len(saved_pointers))
+	for a in saved_pointers:
+		put_text(s, a)
+
+def decode_any(c, r):
+	kind = r.byte()
+	if kind == ANY_NULL:
+		return None
+	type_name = r.text()
+	if kind == ANY_BINARY:
+		w = r.block()
+	elif kind == ANY_WORD:
+		w = get_word(r)
+	else:
+		raise ValueError(f'unknown any encoding {kind}')
+	saved_pointers = [r.text() for _ in range(r.varint())]
+
+	s = lookup_signature(type_name)
+	if s is None:
+		y = c.portable_pointer
+		h = [x for x in saved_pointers if x not in y]
+		if h:
+			raise ValueError(f'missing pointers')
+		m = {x: y[x] for x in saved_pointers}
+		if kind == ANY_BINARY:
+			w = bytes(w)
+		return Incognito(type_name, w, m, c.address_book)
+
+	if kind == ANY_BINARY:
+		_, d = binary_coding(s)
+		p = d(c, BinaryReader(w))
+	else:
+		p = word_to_python(c, w, s)
+
+	if not isinstance(s, UserDefined):
+		p = (p, s)
+	return p
+
+class BinaryPlan(object):
+	"""Compiled binary encoding and decoding of a registered message.
+
+	:param message: the registered class
+	:type message: :ref:`message<lc-message>`
+	"""
+	def __init__(self, message):
+		schema = message.__art__.schema
+		self.message = message
+		self.member = [(k, binary_encoder(v), binary_decoder(v), is_structural(v)) for k, v in schema.items()]
+
+	def encode(self, c, p, s):
+		"""Append the non-null members of the message, by schema index."""
+		present = []
+		for i, (k, _, _, structural) in enumerate(self.member):
+			m = getattr(p, k, None)
+			if m is None:
+				if structural and hasattr(p, k):
+					c.walking_stack.append(k)
+					raise ValueError(f'null structure')
+				continue
+			present.append((i, m))
+
+		put_varint(s, len(present))
+		stack = c.walking_stack
+		member = self.member
+		for i, m in present:
+			k, e, _, _ = member[i]
+			stack.append(k)
+			put_varint(s, i)
+			e(c, m, s)
+			stack.pop()
+
+	def decode(self, c, r):
+		"""Create a new instance of the message and assign the members present."""
+		stack = c.walking_stack
+		member = self.member
+		p = self.message()
+		for _ in range(r.varint()):
+			i = r.varint()
+			if i >= len(member):
+				raise ValueError(f'member {i} beyond schema')
+			k, _, d, _ = member[i]
+			stack.append(k)
+			try:
+				object.__setattr__(p, k, d(c, r))
+			except CircularReferenceError as e:
+				c.patch_work.append([e.args[0], p, k, patch_attribute])
+			stack.pop()
+		return p
+
+# Compiled materials, by message runtime and by
+# the signature of anonymous types.
+BINARY_PLAN = {}
+BINARY_CODING = {}
+
+def binary_plan(message):
+	"""Find or compile the binary plan for a registered message. Return a BinaryPlan."""
+	rt = message.__art__
+	plan = BINARY_PLAN.get(rt, None)
+	if plan is None:
+		plan = BinaryPlan(message)
+		BINARY_PLAN[rt] = plan
+	return plan
+
+def binary_coding(t):
+	"""Find or compile the encoder and decoder for type `t`. Return a 2-tuple."""
+	if isinstance(t, (Container, Enumeration)):
+		k = portable_to_signature(t)
+	else:
+		k = t.__class__
+	f = BINARY_CODING.get(k, None)
+	if f is None:
+		f = (nullable_encoder(t), nullable_decoder(t))
+		BINARY_CODING[k] = f
+	return f
+
+#
+#
+class CodecBinary(Codec):
+	"""Encoding and decoding of compact binary representations.
+
+	An alternative to :class:`~.CodecJson` for network streams. The
+	:meth:`encode` method returns ``bytes`` and :meth:`decode` accepts
+	``bytes`` or ``bytearray``. Refer to the :ref:`base codec class<codec-base>`
+	for the significant methods.
+	"""
+
+	EXTENSION = 'bin'
+
+	def __init__(self, return_proxy=None, local_termination=None, pretty_format=False, decorate_names=True):
+		"""Construct a binary codec."""
+		Codec.__init__(self,
+			CodecBinary.EXTENSION,
+			word_to_binary,
+			binary_to_word,
+			return_proxy, local_termination, pretty_format, decorate_names)
+
+	def encode(self, value, expression, address_book=None):
+		"""Encode an application value to its binary representation.
+
+		:param value: a runtime application value
+		:type value: a type consistent with the specified `expression`
+		:param expression: a formal description of the `value`
+		:type expression: :ref:`type expression<type-reference>`
+		:return: a portable representation of the `value`
+		:rtype: bytes
+		"""
+		self.address_book = address_book
+		self.walking_stack = []
+		self.aliased_pointer = {}
+		self.portable_pointer = {}
+		self.any_stack = [set()]
+		self.pointer_alias = STARTING_ALIAS
+
+		space = f'{next(CODEC_OPERATION)}-{CODEC_SPACE}'
+		self.alias_space = space
+		self.opcode = space
+
+		v = bytearray()
+		try:
+			e, _ = binary_coding(expression)
+			e(self, value, v)
+		except (AttributeError, TypeError, ValueError, IndexError, KeyError, ConversionEncodeError, OverflowError, struct.error) as e:
+			s = str(e)
+			nesting = self.nesting()
+			if len(nesting) == 0:
+				raise CodecRuntimeError(f'cannot encode ({s})')
+			raise CodecRuntimeError(f'cannot encode, near "{nesting}" ({s})')
+
+		if len(self.aliased_pointer) > 0:
+			a = {v[0]: v[1] for _, v in self.aliased_pointer.items()}
+			self.portable_pointer.update(a)
+
+		# Version, value and then the flattened pointers.
+		s = bytearray((BINARY_VERSION,))
+		put_bytes(s, v)
+		try:
+			put_varint(s, len(self.portable_pointer))
+			for k, w in self.portable_pointer.items():
+				put_text(s, k)
+				put_word(s, w)
+		except (TypeError, ValueError) as e:
+			e = str(e)
+			raise CodecRuntimeError(f'cannot encode ({e})')
+		return bytes(s)
+
+	def decode(self, representation, expression, address_book=None):
+		"""Decode a binary representation to its final application form.
+
+		:param representation: the result of a previous encode operation
+		:type representation: bytes
+		:param expression: a formal description of portable
+		:type expression: a :ref:`type expression<type-reference>`
+		:return: an application value
+		"""
+		self.address_book = address_book
+
+		self.walking_stack = []
+		self.portable_pointer = {}
+		self.decoded_pointer = {}
+		self.patch_work = []
+		self.pointer_reference = set()
+
+		try:
+			r = BinaryReader(representation)
+			if r.byte() != BINARY_VERSION:
+				raise ValueError('unknown version')
+			v = r.block()
+			for _ in range(r.varint()):
+				k = r.text()
+				self.portable_pointer[k] = get_word(r)
+		except (TypeError, ValueError, IndexError, UnicodeDecodeError):
+			raise CodecRuntimeError('cannot decode (not the output of an encoding?)')
+
+		try:
+			_, d = binary_coding(expression)
+			p = d(self, BinaryReader(v))
+		except (AttributeError, TypeError, ValueError, IndexError, KeyError, ConversionDecodeError, struct.error) as e:
+			s = str(e)
+			text = self.nesting()
+			if len(text) == 0:
+				raise CodecRuntimeError(f'cannot decode ({s})')
+			raise CodecRuntimeError(f'cannot decode, near "{text}" ({s})')
+
+		for b in self.patch_work:
+			decoded = self.decoded_pointer[b[0]]
+			r, k = b[1], b[2]
+			f = b[3]
+			f(r, k, decoded)
+
+		return p
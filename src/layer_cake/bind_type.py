@@ -63,6 +63,7 @@ class PointRuntime(Runtime):
 		self.return_type = return_type
 		self.entry_point = entry_point
 		self.value = None
+		self.resolved = {}		# Handler per class/signature (and state).
 
 #
 def bind_routine(routine, return_type=None, entry_point: list=None,
@@ -231,6 +232,7 @@ def bind_stateless(machine: Stateless, dispatch: tuple, return_type=None, entry_
 			messaging[p.element] = f
 
 	machine.__art__.value = (shift, messaging)
+	machine.__art__.resolved = {}
 
 def bind_statemachine(machine: StateMachine, dispatch: dict, return_type=None, entry_point: list=None, **explicit_schema):
 	"""
@@ -318,6 +320,7 @@ def bind_statemachine(machine: StateMachine, dispatch: dict, return_type=None, e
 				r[p.element] = f
 
 	machine.__art__.value = (shift, messaging)
+	machine.__art__.resolved = {}
 
 def bind(object_type, *args, **kw_args):
 	"""
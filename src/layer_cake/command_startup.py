@@ -32,6 +32,7 @@ __all__ = [
 	'process_flags',
 	'break_arguments',
 	'decode_argument',
+	'compile_argument',
 	'encode_argument',
 	'from_any',
 	'extract_arguments',
@@ -50,6 +51,8 @@ from .virtual_memory import *
 from .convert_signature import *
 from .message_memory import *
 from .virtual_codec import *
+from .virtual_codec import compile_decoder
+from .convert_memory import ConversionDecodeError
 from .json_codec import *
 from .noop_codec import *
 from .virtual_runtime import *
@@ -155,6 +158,36 @@ def decode_argument(c, s, t):
 		d = c.decode(j, t)
 	return d
 
+def compile_argument(t):
+	'''Generate a function equivalent to decode_argument(c, s, t) for the given type. Return the function.'''
+	q = ENQUOTED.get(type(t), None)
+	if q is not None:
+		def decode(c, s):
+			return q(c, s, t)
+		return decode
+
+	empty = True if isinstance(t, Boolean) else None
+	if includes_pointer(t):
+		def decode(c, s):
+			if s is None:
+				return empty
+			return c.decode(s, t)
+		return decode
+
+	# Parse the bare value and go straight
+	# to the compiled conversion.
+	d = compile_decoder(t)
+	def decode(c, s):
+		if s is None:
+			return empty
+		try:
+			w = json.loads(s)
+			c.walking_stack = []
+			return d(c, w)
+		except (AttributeError, TypeError, ValueError, IndexError, KeyError, ConversionDecodeError) as e:
+			raise CodecRuntimeError(f'cannot decode ({e})')
+	return decode
+
 def p2w(c, p, t):
 	return p
 
@@ -25,16 +25,19 @@
 This module defines the machinery that underpins the timer service
 available at `Point.start`. There are three major parts:
 
-- ``Tick``, a class deriving from Message, this is the metronome sent to
-  countdown machine.
+- ``Tick``, a class deriving from Message, this is the prompt sent to
+  countdown machine when the earliest deadline arrives.
 - ``CountdownTimer``, a class, runs in own thread this object accepts
   StartTimer messsages.
-- ``timer_circuit``, a function, runs as custom routine, sends regular
-  Ticks to CountdownTimer.
+- ``timer_circuit``, a function, runs as custom routine, sleeps until
+  the next deadline and then sends a Tick to CountdownTimer.
 """
 __docformat__ = 'restructuredtext'
 
-from time import sleep, monotonic
+import threading
+import itertools
+from heapq import heappush, heappop, heapify
+from time import monotonic
 
 from .object_space import *
 from .virtual_runtime import *
@@ -47,6 +50,7 @@ from .bind_type import *
 
 __all__ = [
 	'Tick',
+	'TimerClock',
 	'CountdownTimer',
 	'timer_circuit',
 ]
@@ -57,12 +61,60 @@ class Tick(object):
 bind_message(Tick,
 	message_trail=False, execution_trace=False, copy_before_sending=False)
 
-# Handling of expression of time values
-# and conversion to something that this
-# module understands.
-TICKS_PER_SECOND	= 4
-TIME_QUANTUM		= 100 / TICKS_PER_SECOND
-QUANTUM_LESS_1	  = TIME_QUANTUM - 1
+# Longest sleep of the circuit, i.e. the
+# latency of a halt.
+CIRCUIT_IDLE = 0.25
+
+# Rebuild the heap when cancelled or
+# restarted entries outnumber the live.
+DEAD_BEFORE_COMPACT = 1024
+
+class TimerClock(object):
+	"""The next deadline, shared by the countdown and its circuit.
+
+	The countdown publishes the earliest expiry after every change to
+	its timers, and after every Tick. The circuit waits for that moment
+	and sends a Tick. If no answer is published within the idle period,
+	e.g. the Tick was lost, the Tick is sent again.
+	"""
+	def __init__(self):
+		self.condition = threading.Condition()
+		self.deadline = None
+		self.sent = None
+
+	def publish(self, deadline):
+		"""Set the moment of the next expiry, or None. Wakes the circuit.
+
+		:param deadline: value of monotonic() or None
+		:type deadline: float
+		"""
+		with self.condition:
+			self.deadline = deadline
+			self.sent = None
+			self.condition.notify()
+
+	def expired(self, idle):
+		"""Wait for the deadline or the idle period. Return true on expiry.
+
+		:param idle: longest wait in seconds
+		:type idle: float
+		"""
+		with self.condition:
+			d = self.deadline
+			if d is None or self.sent is not None:
+				self.condition.wait(idle)
+			else:
+				w = d - monotonic()
+				if w > 0:
+					self.condition.wait(min(w, idle))
+			d = self.deadline
+			now = monotonic()
+			if d is None or d > now:
+				return False
+			if self.sent is not None and now - self.sent < idle:
+				return False		# Tick sent, answer pending.
+			self.sent = now
+			return True
 
 class CountdownTimer(Threaded, Stateless):
 	"""
@@ -70,79 +122,106 @@ class CountdownTimer(Threaded, Stateless):
 	objects as pt.timer_address.
 
 	This object accepts StartTimer messages, creating a record of each
-	active timer as if there was a (sender_address, timer) unique,
-	composite key. The record is initialized with the ticks before
-	expiry.
+	active timer indexed by the (sender_address, timer) composite key.
+	Records are held in a heap ordered by the moment of expiry, making
+	start and cancel O(log n). Replaced and cancelled records are
+	marked dead and discarded as they surface.
 
-	Ticks are received from the timer_circuit and are used to decrement
-	the active record. If this decements to less than 1 the record is
-	"expired". The timer message is sent and the record is removed.
+	A Tick arrives from the timer_circuit when the earliest expiry is
+	reached. Every expired record sends its timer message and is either
+	rescheduled (repeating) or removed.
 
 	Most timer-related logging is necessarily disabled.
 	"""
 	def __init__(self):
 		Threaded.__init__(self)
 		Stateless.__init__(self)
-		self.running = []
+		self.clock = TimerClock()
+		self.running = []		# Heap of records.
+		self.index = {}			# Live record per key.
+		self.sequence = itertools.count()
+		self.dead = 0
+		self.published = None
+
+	def schedule(self, key, seconds, repeating, expiry):
+		# A timer record;
+		# [0] the moment of expiry.
+		# [1] tie-breaker, order of scheduling
+		# [2] key, i.e. (address of requesting party, class of timer)
+		# [3] seconds of delay
+		# [4] true if a repeating timer
+		# [5] false if cancelled or replaced
+		c = [expiry, next(self.sequence), key, seconds, repeating, True]
+		self.index[key] = c
+		heappush(self.running, c)
+
+	def discard(self, key):
+		c = self.index.pop(key, None)
+		if c is None:
+			return
+		c[5] = False
+		self.dead += 1
+		if self.dead > DEAD_BEFORE_COMPACT and self.dead > len(self.index):
+			self.running = [c for c in self.running if c[5]]
+			heapify(self.running)
+			self.dead = 0
+
+	def next_deadline(self, answer=False):
+		running = self.running
+		while running and not running[0][5]:
+			heappop(running)
+			self.dead -= 1
+		deadline = running[0][0] if running else None
+		if answer or deadline != self.published:
+			self.published = deadline
+			self.clock.publish(deadline)
 
 def CountdownTimer_Start(self, message):
 	# Silence the "dropped" message.
 	pass
 
 def CountdownTimer_Tick(self, message):
-	still_running = []
+	running = self.running
 	now = monotonic()
-	for c in self.running:
-		if now >= c[4]:			# END OF A PERIOD
-			who = c[0]			# Who requested it.
-			what = c[1]()		# The timer instance.
-			send_a_message(what, who, self.object_address)
-			if c[3]:
-				c[4] = monotonic() + c[2]
-				still_running.append(c)
+	while running and running[0][0] <= now:
+		c = heappop(running)
+		if not c[5]:
+			self.dead -= 1
+			continue
+		key = c[2]
+		who = key[0]			# Who requested it.
+		what = key[1]()			# The timer instance.
+		send_a_message(what, who, self.object_address)
+		if c[4]:
+			e = c[0] + c[3]
+			c[0] = e if e > now else now + c[3]
+			c[1] = next(self.sequence)
+			heappush(running, c)
 		else:
-			still_running.append(c)
+			del self.index[key]
 
-	if len(still_running) != len(self.running):
-		self.running = still_running
+	# Always publish, even an unchanged deadline. The
+	# circuit repeats the Tick until there is an answer.
+	self.next_deadline(answer=True)
 
 def CountdownTimer_StartTimer(self, message):
 	sender  = self.return_address
 	timer   = message.timer
-	for c in self.running:
-		if c[0] == sender and c[1] == timer:	# An existing timer.
-			c[2] = message.seconds				# Redefine its details.
-			c[3] = message.repeating
-			c[4] = monotonic() + c[2]			# Freshen up that expiry.
-			return
+	seconds = message.seconds
 
-	if message.seconds < 0.2:
-		send_a_message(message.timer(), sender, self.object_address)
+	key = (sender, timer)
+	self.discard(key)			# Any existing timer.
+	if seconds <= 0:
+		self.next_deadline()
+		send_a_message(timer(), sender, self.object_address)
 		return
 
-	# A brand new timer block;
-	# [0] address of requesting party
-	# [1] class, e.g. ar.T1
-	# [2] seconds of delay
-	# [3] true if a repeating timer
-	# [4] the moment of expiry.
-	c = [
-		sender,				# Who wants it.
-		timer,				# Class of the timer.
-		message.seconds,
-		message.repeating,
-		monotonic() + message.seconds
-	]
-	self.running.append(c)
+	self.schedule(key, seconds, message.repeating, monotonic() + seconds)
+	self.next_deadline()
 
 def CountdownTimer_CancelTimer(self, message):
-	return_address = self.return_address
-	for i, c in enumerate(self.running):
-		if c[0] == return_address and c[1] == message.timer:
-			# Ok to modify cos immediate
-			# return afterwards?
-			self.running.pop(i)
-			return
+	self.discard((self.return_address, message.timer))
+	self.next_deadline()
 
 def CountdownTimer_Stop(self, message):
 	self.complete()
@@ -152,15 +231,12 @@ bind_stateless(CountdownTimer,
 	lifecycle=False, message_trail=False,
 	execution_trace=False, user_logs=USER_LOG.NONE)
 
-# Control the rate of ticks
-BETWEEN_TICKS = 1.0 / TICKS_PER_SECOND
-
 def timer_circuit(queue, timer_address):
+		clock = find_object(timer_address).clock
 		t = Tick()
 		while not queue.halted:
-			send_a_message(t, timer_address, queue.object_address)
-			sleep(BETWEEN_TICKS)
-		t = Stop()
+			if clock.expired(CIRCUIT_IDLE):
+				send_a_message(t, timer_address, queue.object_address)
 
 bind_routine(timer_circuit,
 	lifecycle=False, message_trail=False, execution_trace=False, user_logs=USER_LOG.NONE)
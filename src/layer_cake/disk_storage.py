@@ -27,9 +27,13 @@
 __docformat__ = 'restructuredtext'
 
 import os
+import zlib
 import uuid
+import json
 import shutil
+import hashlib
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from .bind_type import *
 from .virtual_memory import *
@@ -53,6 +57,13 @@ __all__ = [
 	'StorageManifest',
 	'StorageListing',
 	'StorageTables',
+	'MANIFEST_WORKERS',
+	'TRANSFER_BLOCK',
+	'TRANSFER_WORKERS',
+	'PATCH_SIZE',
+	'PATCH_BLOCK',
+	'DIGEST_CACHE',
+	'file_digest',
 	'storage_manifest',
 	'storage_selection',
 	'storage_walk',
@@ -62,6 +73,7 @@ __all__ = [
 	'RemoveFolder',
 	'RemoveFile',
 	'UpdateFile',
+	'PatchFile',
 	'UpdateUser',
 	'UpdateGroup',
 	'UpdateMode',
@@ -132,11 +144,12 @@ class StorageListing(object):
 	"""File in a folder/file storage hierarchy."""
 	def __init__(self, name: str=None,
 			modified: datetime=None, attributes: StorageAttributes=None,
-			size: int=0, parent=None):
+			size: int=0, digest: str=None, parent=None):
 		self.name = name
 		self.modified = modified
 		self.attributes = attributes or StorageAttributes()
 		self.size = size
+		self.digest = digest
 		self.parent = parent
 
 	def full_path(self):
@@ -166,8 +179,98 @@ bind(StorageTables, copy_before_sending=False)
 
 #
 #
-def storage_manifest(path, parent=None, table=None):
-	"""Scan the given folder, recursively. Return a manifest of contents."""
+MANIFEST_WORKERS = 8				# Scanning is mostly waiting on the disk.
+DIGEST_CACHE = '.storage-digest'	# Cached digests, a file per scanned tree.
+DIGEST_BLOCK = 1024 * 1024
+
+def file_digest(path):
+	"""Hash the contents of the named file. Return a hex string."""
+	h = hashlib.blake2b(digest_size=16)
+	with open(path, 'rb') as f:
+		while True:
+			b = f.read(DIGEST_BLOCK)
+			if not b:
+				break
+			h.update(b)
+	return h.hexdigest()
+
+def digest_key(root, path, s):
+	# Content is assumed unchanged while all three of these
+	# are unchanged. Not the inode, which reads as zero from
+	# a Windows scandir().
+	relative = os.path.relpath(path, root)
+	return f'{relative}:{s.st_size}:{s.st_mtime_ns}'
+
+def digest_sidecar(cache, path):
+	# Name the file of cached digests for the tree at path.
+	k = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=16)
+	return os.path.join(cache, f'{k.hexdigest()}.json')
+
+def load_digests(sidecar):
+	try:
+		with open(sidecar, 'r') as f:
+			cached = json.load(f)
+		if isinstance(cached, dict):
+			return cached
+	except (OSError, ValueError):
+		pass
+	return {}
+
+def save_digests(sidecar, digests):
+	# Best effort. A read-only tree is
+	# simply hashed again next time.
+	t = sidecar + '.tmp'
+	try:
+		os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+		with open(t, 'w') as f:
+			json.dump(digests, f)
+		os.replace(t, sidecar)
+	except OSError:
+		pass
+
+def scan_folder(path, root, cached):
+	"""Read a single folder within the tree at root. Return a list of the folders and files within.
+
+	Each entry is a 4-tuple of name, full path, stat and digest. Folders
+	have a digest of False. Files have a digest from the cached values or
+	freshly computed, or None where cached is None.
+	"""
+	scanned = []
+	with os.scandir(path) as it:
+		for e in it:
+			if e.is_dir():
+				scanned.append((e.name, e.path, e.stat(), False))
+			elif e.is_file():
+				s = e.stat()
+				d = None
+				if cached is not None:
+					d = cached.get(digest_key(root, e.path, s), None) or file_digest(e.path)
+				scanned.append((e.name, e.path, s, d))
+	return scanned
+
+def storage_manifest(path, parent=None, table=None, digest=False, cache=None, workers=MANIFEST_WORKERS):
+	"""Scan the given folder, recursively. Return a manifest of contents.
+
+	Folders are scanned concurrently on a pool of threads, where workers is
+	greater than one. Passing digest as True adds a hash of contents to
+	every listing. Where a cache folder is also passed, hashes are kept in
+	a file within it, named after the tree and keyed on inode, size and
+	modified time. Nothing is written into the scanned tree.
+
+	:param path: location of the folder
+	:type path: str
+	:param parent: manifest of the enclosing folder, or None
+	:type parent: StorageManifest
+	:param table: names for user and group ids, or None
+	:type table: StorageTables
+	:param digest: include the hash of each file
+	:type digest: bool
+	:param cache: folder of cached hashes, or None
+	:type cache: str
+	:param workers: number of threads scanning folders
+	:type workers: int
+	:rtype: 2-tuple of StorageManifest and StorageTables
+	"""
 	table = table or StorageTables()
 	user_name = table.user_name
 	group_name = table.group_name
@@ -198,35 +301,70 @@ def storage_manifest(path, parent=None, table=None):
 		a = StorageAttributes(user=s.st_uid, group=s.st_gid, mode=s.st_mode)
 		return a
 
+	cached = None
+	if digest:
+		sidecar = digest_sidecar(cache, path) if cache else None
+		cached = load_digests(sidecar) if sidecar else {}
+		seen = {}
+
+	# Add the results of a folder scan to its manifest.
+	# Return the sub-folders that are yet to be scanned.
+	def fill(m, scanned):
+		content = m.content
+		pending = []
+		for k, p, s, d in scanned:
+			t = datetime.fromtimestamp(s.st_mtime, tz=UTC)
+			a = lookup(s)
+			if d is False:
+				v = StorageManifest(path=p, modified=t, attributes=a, parent=m)
+				pending.append(v)
+			else:
+				v = StorageListing(name=k, modified=t, attributes=a, size=s.st_size, digest=d, parent=m)
+				if d is not None:
+					seen[digest_key(path, p, s)] = d
+			content[k] = v
+		return pending
+
+	# Totals are only known once the
+	# whole tree is in place.
+	def tally(m):
+		for v in m.content.values():
+			if isinstance(v, StorageManifest):
+				tally(v)
+				m.manifests += 1 + v.manifests
+				m.listings += v.listings
+				m.bytes += v.bytes
+			else:
+				m.listings += 1
+				m.bytes += v.size
+
 	s = os.stat(path)
 	d = datetime.fromtimestamp(s.st_mtime, tz=UTC)
 	a = lookup(s)
 	m = StorageManifest(path=path, modified=d, attributes=a, parent=parent)
 
-	content = m.content
-	for k in os.listdir(path):
-		p = os.path.join(path, k)
-		if os.path.isdir(p):
-			m.manifests += 1
-			v, _ = storage_manifest(p, parent=m, table=table)
-			m.manifests += v.manifests
-			m.listings += v.listings
-			m.bytes += v.bytes
-		elif os.path.isfile(p):
-			m.listings += 1
-			s = os.stat(p)
-			d = datetime.fromtimestamp(s.st_mtime, tz=UTC)
-			a = lookup(s)
-			v = StorageListing(name=k, modified=d, attributes=a, size=s.st_size, parent=m)
-			m.bytes += v.size
-		else:
-			continue
-		content[k] = v
-
+	if workers > 1:
+		with ThreadPoolExecutor(max_workers=workers) as pool:
+			running = {pool.submit(scan_folder, path, path, cached): m}
+			while running:
+				done, _ = wait(running, return_when=FIRST_COMPLETED)
+				for f in done:
+					v = running.pop(f)
+					for p in fill(v, f.result()):
+						running[pool.submit(scan_folder, p.path, path, cached)] = p
+	else:
+		pending = [m]
+		while pending:
+			v = pending.pop()
+			pending.extend(fill(v, scan_folder(v.path, path, cached)))
+
+	tally(m)
+	if digest and sidecar:
+		save_digests(sidecar, seen)
 	return m, table
 
 #
-def storage_selection(selection, path=None, table=None):
+def storage_selection(selection, path=None, table=None, digest=False, cache=None):
 	"""Gather arbitrary files and folders into a single logical manifest. Return a manifest of contents."""
 	table = table or StorageTables()
 	user_name = table.user_name
@@ -282,7 +420,7 @@ def storage_selection(selection, path=None, table=None):
 
 		if os.path.isdir(absolute):
 			selected.manifests += 1
-			v, _ = storage_manifest(path=absolute, parent=parent, table=table)
+			v, _ = storage_manifest(path=absolute, parent=parent, table=table, digest=digest, cache=cache)
 			selected.manifests += v.manifests
 			selected.listings += v.listings
 			selected.bytes += v.bytes
@@ -291,7 +429,8 @@ def storage_selection(selection, path=None, table=None):
 			s = os.stat(absolute)
 			d = datetime.fromtimestamp(s.st_mtime, tz=UTC)
 			a = lookup(s)
-			v = StorageListing(name=s1, modified=d, attributes=a, size=s.st_size, parent=parent)
+			h = file_digest(absolute) if digest else None
+			v = StorageListing(name=s1, modified=d, attributes=a, size=s.st_size, digest=h, parent=parent)
 			selected.bytes += v.size
 		content[s1] = v
 
@@ -428,18 +567,171 @@ class DeltaMachine(object):
 				pass
 
 # Actual file and folder copying fragements.
+TRANSFER_BLOCK = 8 * 1024 * 1024		# Bytes per copy, i.e. between checks for halt.
+TRANSFER_WORKERS = 4
+
+# Copy up to a block at the given offset, from one file
+# descriptor to another. Return the number of bytes copied,
+# zero at the end of the source.
+def copy_range(r, w, offset):
+	return os.copy_file_range(r, w, TRANSFER_BLOCK, offset, offset)
+
+def copy_send(r, w, offset):
+	os.lseek(w, offset, os.SEEK_SET)
+	return os.sendfile(w, r, offset, TRANSFER_BLOCK)
+
+def copy_user(r, w, offset):
+	os.lseek(r, offset, os.SEEK_SET)
+	b = os.read(r, TRANSFER_BLOCK)
+	os.lseek(w, offset, os.SEEK_SET)
+	v = memoryview(b)
+	while v:
+		n = os.write(w, v)
+		v = v[n:]
+	return len(b)
+
+# In order of preference. The copy stays inside the
+# kernel where the platform (and filesystems) allow.
+COPY_BLOCK = []
+if hasattr(os, 'copy_file_range'):
+	COPY_BLOCK.append(copy_range)
+if hasattr(os, 'sendfile'):
+	COPY_BLOCK.append(copy_send)
+COPY_BLOCK.append(copy_user)
+
 def transfer_file(self, source, target):
 	"""Copy a single executable to an interim alias."""
 	with open(source, 'rb') as r, open(target, 'wb') as w:
+		r, w = r.fileno(), w.fileno()
+		block = iter(COPY_BLOCK)
+		copy = next(block)
+		offset = 0
 		while True:
 			if self.halted:
 				raise TransferHalted()
-			t = r.read(4096)
-			if t == b'':
+			try:
+				n = copy(r, w, offset)
+			except OSError:
+				if copy is copy_user:
+					raise
+				copy = next(block)	# Not for these files. Fall back.
+				continue
+			if n == 0:
 				break
-			w.write(t)
+			offset += n
 	shutil.copystat(source, target)
 
+# Rewriting of large files that are mostly unchanged, along the
+# lines of rsync. Blocks of the existing target are recognised
+# wherever they appear in the source, using a rolling adler32
+# over each byte offset. Long runs of new material are searched
+# a block at a time. Only the bytes found nowhere in the target
+# are copied from the source.
+PATCH_SIZE = 8 * 1024 * 1024			# Smallest target considered for patching.
+PATCH_BLOCK = 64 * 1024
+PATCH_ROLL = 1024 * 1024				# Bytes rolled without a match, before striding.
+PATCH_STRIDE = 4 * 1024 * 1024			# Bytes strided, before rolling again.
+ADLER_BASE = 65521
+
+def weak_sum(b):
+	return zlib.adler32(b)
+
+def strong_sum(b):
+	return hashlib.blake2b(b, digest_size=16).digest()
+
+def file_signature(path, block):
+	"""Sum the full blocks of a file. Return a map of weak sum to list of strong sum and offset."""
+	signature = {}
+	with open(path, 'rb') as f:
+		offset = 0
+		while True:
+			b = f.read(block)
+			if len(b) < block:
+				break
+			signature.setdefault(weak_sum(b), []).append((strong_sum(b), offset))
+			offset += block
+	return signature
+
+def patch_file(self, source, target, alias, block=PATCH_BLOCK):
+	"""Build a copy of source at alias, re-using blocks of target. Return the bytes taken from each."""
+	signature = file_signature(target, block)
+	reused = 0
+	copied = 0
+	with open(source, 'rb') as s, open(target, 'rb') as t, open(alias, 'wb') as w:
+		buf = bytearray()
+		i = 0			# Start of the window.
+		pending = 0		# Start of source bytes not yet written.
+		h = None
+		rolled = 0
+		strided = 0
+		eof = False
+		while True:
+			n = len(buf) - i
+			if n <= block and not eof:
+				# Rolling needs the byte after the window. Write
+				# out what has been passed over and top up.
+				if self.halted:
+					raise TransferHalted()
+				w.write(buf[pending:i])
+				copied += i - pending
+				del buf[:i]
+				i = pending = 0
+				more = s.read(TRANSFER_BLOCK)
+				if more:
+					buf += more
+				else:
+					eof = True
+				continue
+			if n < block:
+				break
+			if h is None:
+				h = weak_sum(buf[i:i + block])
+			matched = signature.get(h, None)
+			if matched:
+				strong = strong_sum(buf[i:i + block])
+				for m, offset in matched:
+					if m == strong:
+						break
+				else:
+					offset = None
+				if offset is not None:
+					w.write(buf[pending:i])
+					copied += i - pending
+					t.seek(offset)
+					w.write(t.read(block))
+					reused += block
+					i += block
+					pending = i
+					h = None
+					rolled = strided = 0
+					continue
+			if n == block:
+				break		# End of source.
+			if rolled >= PATCH_ROLL:
+				# Looks like new material. Stop searching every
+				# offset and only try the next whole block, for
+				# a while. Rolling resumes in case old material
+				# follows at some other alignment.
+				i += block
+				h = None
+				strided += block
+				if strided >= PATCH_STRIDE:
+					rolled = strided = 0
+				continue
+			# Slide the window along one byte, i.e. the
+			# adler32 of the next window.
+			x = buf[i]
+			a = ((h & 0xffff) - x + buf[i + block]) % ADLER_BASE
+			b = ((h >> 16) - block * x + a - 1) % ADLER_BASE
+			h = (b << 16) | a
+			i += 1
+			rolled += 1
+
+		w.write(buf[pending:])
+		copied += len(buf) - pending
+	shutil.copystat(source, alias)
+	return reused, copied
+
 def add_folder(self, source, target):
 	"""Add folder cos folders are never transferred, i.e. like a file update."""
 	try:
@@ -504,6 +796,21 @@ class UpdateFile(object):
 bind(UpdateFile, source=PointerTo(StorageListing), target=PointerTo(StorageListing))
 
 
+class PatchFile(object):
+	def __init__(self, source=None, target=None):
+		self.source = source
+		self.target = target
+
+	def __str__(self):
+		return f'PatchFile(path={self.source.full_path()}, modified={self.source.modified}, target={self.target.parent.path})'
+
+	def __call__(self, dm):
+		a = dm.alias(self, dm.alias_file, t=self.target.parent.path)
+		patch_file(dm.context, self.source.full_path(), self.target.full_path(), a)
+
+bind(PatchFile, source=PointerTo(StorageListing), target=PointerTo(StorageListing))
+
+
 class UpdateUser(object):
 	def __init__(self, target=None, user: int=None):
 		self.target = target
@@ -602,20 +909,32 @@ class ReplaceWithFolder(object):
 		f = self.target.full_path()
 		os.remove(f)
 		a = dm.alias(self, dm.alias_folder)
-		add_folder(self, self.source.path, a)
+		add_folder(dm.context, self.source.path, a)
 
 bind(ReplaceWithFolder, source=PointerTo(StorageManifest), target=PointerTo(StorageListing))
 
 #
 #
-def storage_delta(source, target, flags=DELTA_CRUD, guard_path=None):
-	"""Compare the two trees. Yield a sequence of the changes needed."""
+def storage_delta(source, target, flags=DELTA_CRUD, guard_path=None, patch_size=PATCH_SIZE):
+	"""Compare the two trees. Yield a sequence of the changes needed.
+
+	Updates of target files of patch_size bytes or more are PatchFile
+	opcodes, i.e. only the changed ranges are copied. Pass None to
+	always rewrite entire files.
+	"""
 	def content_keys(m):
 		if m is None:
 			return []
 		return m.content.keys()
 	keys = content_keys(source) | content_keys(target)
 
+	# Digests are the better evidence, where
+	# both sides have them.
+	def changed(s, t):
+		if s.digest and t.digest:
+			return s.digest != t.digest
+		return s.modified > t.modified
+
 	# Source and target guaranteed to exist and represent the
 	# equivalent nodes (i.e. manifests) of their respective trees.
 	# Iterate through this pair of nodes using the union of the two
@@ -636,7 +955,7 @@ def storage_delta(source, target, flags=DELTA_CRUD, guard_path=None):
 				# mismatched folder and file.
 				if type(s) == type(t):
 					if isinstance(s, StorageManifest):
-						if flags & DELTA_FOLDER_UPDATE: yield from storage_delta(s, t, flags=flags)			# Recurse.
+						if flags & DELTA_FOLDER_UPDATE: yield from storage_delta(s, t, flags=flags, patch_size=patch_size)			# Recurse.
 						if s.attributes.user != t.attributes.user and flags & DELTA_FOLDER_UGM:
 							yield UpdateUser(t, s.attributes.user)
 						if s.attributes.group != t.attributes.group and flags & DELTA_FOLDER_UGM:
@@ -644,8 +963,11 @@ def storage_delta(source, target, flags=DELTA_CRUD, guard_path=None):
 						if s.attributes.mode != t.attributes.mode and flags & DELTA_FOLDER_UGM:
 							yield UpdateMode(t, s.attributes.mode)
 					else:
-						if s.modified > t.modified and flags & DELTA_FILE_UPDATE:
-							yield UpdateFile(s, t)		# Creates new target file.
+						if flags & DELTA_FILE_UPDATE and changed(s, t):
+							if patch_size is not None and t.size >= patch_size:
+								yield PatchFile(s, t)
+							else:
+								yield UpdateFile(s, t)		# Creates new target file.
 							continue
 						if s.attributes.user != t.attributes.user and flags & DELTA_FILE_UGM:
 							yield UpdateUser(t, s.attributes.user)
@@ -673,7 +995,43 @@ def storage_delta(source, target, flags=DELTA_CRUD, guard_path=None):
 
 #
 #
-def folder_transfer(self, delta, target):
+def apply_delta(machine, delta, workers):
+	"""Apply each delta opcode. File copies are spread across a pool of threads."""
+	context = machine.context
+	if workers < 2:
+		for d in delta:
+			if context.halted:
+				raise TransferHalted()
+			d(machine)
+		return
+
+	# Adding, updating and patching of files never depends on other
+	# opcodes, i.e. each copy is to its own unique alias within
+	# a folder that already exists. Everything else happens
+	# on this thread, in the original order.
+	pool = ThreadPoolExecutor(max_workers=workers)
+	try:
+		copying = []
+		for d in delta:
+			if isinstance(d, (AddFile, UpdateFile, PatchFile)):
+				copying.append(pool.submit(d, machine))
+				continue
+			# Leave the target alone once there is a halt
+			# or a copy has already failed.
+			if context.halted:
+				raise TransferHalted()
+			for f in copying:
+				if f.done() and f.exception() is not None:
+					f.result()
+			d(machine)
+		for f in copying:
+			f.result()
+	finally:
+		# Nothing can be cleared until all copies have
+		# stopped. A halt is seen by each at its next block.
+		pool.shutdown(wait=True, cancel_futures=True)
+
+def folder_transfer(self, delta, target, workers=TRANSFER_WORKERS):
 	"""An async routine to copy folders-and-files to target folder."""
 
 	# Interruption happens at the lowest level of transfer activity, i.e before
@@ -685,9 +1043,8 @@ def folder_transfer(self, delta, target):
 	try:
 		deltas = len(delta)
 		self.console(f'File transfer ({deltas} deltas) to {target}')
-		for d in delta:
-			d(machine)
-			aliases = machine.aliases()
+		apply_delta(machine, delta, workers)
+		aliases = machine.aliases()
 		self.console(f'Move {aliases} aliases to targets')
 		machine.rename()
 	except TransferHalted:
@@ -707,15 +1064,16 @@ bind(folder_transfer)
 #
 #
 class FolderTransfer(Point, StateMachine):
-	def __init__(self, delta, target):
+	def __init__(self, delta, target, workers=TRANSFER_WORKERS):
 		Point.__init__(self)
 		StateMachine.__init__(self, INITIAL)
 		self.delta = delta
 		self.target = target
+		self.workers = workers
 		self.transfer = None
 
 def FolderTransfer_INITIAL_Start(self, message):
-	self.transfer = self.create(folder_transfer, self.delta, self.target)
+	self.transfer = self.create(folder_transfer, self.delta, self.target, workers=self.workers)
 	return RUNNING
 
 def FolderTransfer_RUNNING_Returned(self, message):
@@ -47,7 +47,9 @@ __all__ = [
 
 import os
 import errno
+import hashlib
 import re as regex
+from itertools import repeat
 
 from .virtual_memory import *
 from .message_memory import *
@@ -100,6 +102,27 @@ def shape_of_folder(path):
 
 	return folders, files, bytes
 
+RECOVER_CHUNK = 256
+
+def content_digest(s):
+	"""Reduce an encoding to a short, fixed-size value. Return bytes."""
+	if isinstance(s, str):
+		s = s.encode('utf-8')
+	return hashlib.blake2b(s, digest_size=16).digest()
+
+def recover_files(encoding, expression, paths, decorate_names):
+	"""Read and decode the named files. Return a list of digest and value 2-tuples.
+
+	A function at module level, for the benefit of process pools.
+	"""
+	codec = encoding(decorate_names=decorate_names)
+	recovered = []
+	for p in paths:
+		with open(codec.full_name(p), 'r') as f:
+			s = f.read()
+		recovered.append((content_digest(s), codec.decode(s, expression)))
+	return recovered
+
 #
 #
 class Folder(object):
@@ -117,13 +140,14 @@ class Folder(object):
 	:type keys_names: 2-tuple of functions
 	:param make_absolute: expand a relative path to be an absolute location, defaults to ``True``
 	:param auto_create: create folders as necessary, defaults to ``True``
+	:param track_changes: write only those values that differ from the files, defaults to ``False``
 	"""
 
 	def __init__(self, path: str=None,
 			tip=None, re: str=None, encoding=None,
 			pretty_format: bool=True, decorate_names: bool=True,
 			create_default: bool=False, keys_names=None,
-			make_absolute: bool=False, auto_create: bool=True):
+			make_absolute: bool=False, auto_create: bool=True, track_changes: bool=False):
 		"""Construct a Folder instance."""
 		path = path or '.'
 		if make_absolute:
@@ -150,6 +174,8 @@ class Folder(object):
 		self.create_default = create_default
 		self.keys_names = keys_names
 		self.auto_create = auto_create
+		self.track_changes = track_changes
+		self.written = None			# Digest of each file, by name.
 
 		if not auto_create:
 			return
@@ -161,7 +187,7 @@ class Folder(object):
 
 	def folder(self, name: str, tip=None, re: str=None, encoding=None,
 			pretty_format: bool=None, decorate_names: bool=None, create_default: bool=None,
-			auto_create: bool=None, keys_names=None):
+			auto_create: bool=None, keys_names=None, track_changes: bool=None):
 		"""Create a new :class:`~.Folder` object representing a sub-folder at the current location.
 
 		:param path: the name to be added to the saved ``path``
@@ -176,6 +202,7 @@ class Folder(object):
 		:type keys_names: 2-tuple of functions
 		:param make_absolute: expand a relative path to be an absolute location, defaults to ``True``
 		:param auto_create: create folders as necessary, defaults to ``None``
+		:param track_changes: write only those values that differ from the files, defaults to ``None``
 		:return: a new location in the filesystem
 		:rtype: Folder
 		"""
@@ -189,12 +216,13 @@ class Folder(object):
 		if decorate_names is None: decorate_names = self.decorate_names
 		if create_default is None: create_default = self.create_default
 		if auto_create is None: auto_create = self.auto_create
+		if track_changes is None: track_changes = self.track_changes
 		keys_names = keys_names or self.keys_names
 
 		path = os.path.join(self.path, name)
 		return Folder(path, re=re, tip=tip, encoding=encoding,
 			pretty_format=pretty_format, decorate_names=decorate_names, create_default=create_default,
-			keys_names=keys_names, make_absolute=False, auto_create=auto_create)
+			keys_names=keys_names, make_absolute=False, auto_create=auto_create, track_changes=track_changes)
 
 	def file(self, name: str, tip=None, encoding=None,
 			pretty_format: bool=None, decorate_names: bool=None, create_default: bool=None):
@@ -261,54 +289,119 @@ class Folder(object):
 		for f in matched:
 			yield self.file(f, tip=self.file_type)
 
+	def codec(self):
+		return self.encoding(pretty_format=self.pretty_format, decorate_names=self.decorate_names)
+
+	def write(self, codec, name, value):
+		# Encode the value and write it to the named file,
+		# unless tracking shows the file already holds it.
+		expression = self.file_type
+		if expression is None:
+			if not is_message(value):
+				raise CodecUsageError(f'encoding of unregistered message to file "{name}"')
+			expression = UserDefined(value.__class__)
+		s = codec.encode(value, expression)
+
+		written = self.written
+		if written is not None:
+			d = content_digest(s)
+			if written.get(name, None) == d:
+				return False
+			written[name] = d
+
+		path = codec.full_name(os.path.join(self.path, name))
+		with open(path, 'w') as f:
+			f.write(s)
+		return True
+
 	def store(self, values: dict):
 		"""Store a ``dict`` of values as files in the folder.
 
+		When tracking changes, only those values that differ from what
+		was last written or recovered are written. Changes to the folder
+		by other means are not seen.
+
 		:param values: a collection of application values
 		"""
-		# Get a fresh image of folder/slice.
-		matched = set(self.matching())
+		# Get a fresh image of folder/slice, unless
+		# tracking has it.
+		if self.written is None:
+			matched = set(self.matching())
+			if self.track_changes:
+				self.written = dict.fromkeys(matched)
+		else:
+			matched = set(self.written)
+
+		codec = self.codec()
 		stored = set()
 		for k, v in values.items():
 			name = self.name(v)
-			io = self.file(name, tip=self.file_type)
-			io.store(v)
+			self.write(codec, name, v)
 			stored.add(name)
+
 		# Clean out files that look like they
 		# have been previously written but are
 		# no longer in the map.
 		matched -= stored
+		written = self.written
 		for m in matched:
-			self.erase(m)
-
-	def recover(self):
+			try:
+				os.remove(codec.full_name(os.path.join(self.path, m)))
+			except FileNotFoundError:
+				pass
+			if written is not None:
+				written.pop(m, None)
+
+	def recover(self, executor=None):
 		"""Recover application values from the files in the folder.
 
 		A generator function that yields a sequence of tuples that
 		allow the caller to process an entire folder with a clean loop.
 
-		All arguments are forwarded to :meth:`~.file_object.recover`.
+		Passing an executor, e.g. a ``concurrent.futures.ThreadPoolExecutor``,
+		spreads the reading and decoding of files across its workers. Values
+		are still yielded in folder order. A process pool requires that the
+		type of the folder can be pickled.
 
 		The return value includes the version of the main decoded object, or None
 		if the encoding and decoding applications are at the same version. This value is
 		the mechanism by which applications can select different code-paths in support of
 		older versions of encoded materials.
 
+		:param executor: pool of workers or None
+		:type executor: concurrent.futures.Executor
 		:return: a sequence of 2-tuples, 0) key and 1) the value
 		:rtype: tuple
 		"""
 		# Get a fresh image of folder/slice.
 		matched = [f for f in self.matching()]
+		if self.track_changes:
+			self.written = dict.fromkeys(matched)
+
+		# Read and decode in chunks, possibly
+		# on a pool.
+		paths = [os.path.join(self.path, f) for f in matched]
+		chunks = [paths[i:i + RECOVER_CHUNK] for i in range(0, len(paths), RECOVER_CHUNK)]
+		args = (repeat(self.encoding), repeat(self.file_type), chunks, repeat(self.decorate_names))
+		if executor is None:
+			recovered = map(recover_files, *args)
+		else:
+			recovered = executor.map(recover_files, *args)
+
 		# Visit each named file.
 		# Yield the key, message tuple.
-		for f in matched:
-			io = self.file(f, tip=self.file_type)
-			r = io.recover()
-			if self.keys_names is None:
-				k = None
-			else:
-				k = self.key(r)
-			yield k, r
+		names = iter(matched)
+		written = self.written
+		for chunk in recovered:
+			for d, r in chunk:
+				f = next(names)
+				if written is not None:
+					written[f] = d
+				if self.keys_names is None:
+					k = None
+				else:
+					k = self.key(r)
+				yield k, r
 
 	def add(self, values: dict, item):
 		"""Add a value, both to a ``dict`` of values and as a file in the folder.
@@ -327,7 +420,7 @@ class Folder(object):
 		io = self.file(name, tip=self.file_type)
 		if key in values:
 			raise ValueError(f'name "{io.name}" already present (add)')
-		io.store(item)
+		self.write(self.codec(), name, item)
 		values[key] = item
 
 	def update(self, values: dict, item):
@@ -348,7 +441,7 @@ class Folder(object):
 		if key not in values:
 			raise ValueError(f'name "{io.name}" not an existing entry (update)')
 
-		io.store(item)
+		self.write(self.codec(), name, item)
 		values[key] = item
 
 	def remove(self, values: dict, item):
@@ -378,12 +471,16 @@ class Folder(object):
 		for removing in matched:
 			self.erase(removing)
 		values.clear()
+		if self.track_changes:
+			self.written = {}
 
 	def erase(self, name: str):
 		"""Delete the named file from the folder.
 
 		:param name: a name of a file
 		"""
+		if self.written is not None:
+			self.written.pop(name, None)
 		path = os.path.join(self.path, name)
 		name = path
 		if self.decorate_names:
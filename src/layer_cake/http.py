@@ -22,7 +22,6 @@
 # SOFTWARE.
 __docformat__ = 'restructuredtext'
 
-import string
 import re
 from urllib.parse import quote_plus, unquote_plus
 from enum import Enum
@@ -45,6 +44,8 @@ __all__ = [
 	'HttpRequest',
 	'HttpResponse',
 	'FormRequest',
+	'HttpChunk',
+	'HttpChunkAck',
 	'HttpMethod',
 	'decode_resource',
 	'decode_body',
@@ -122,6 +123,39 @@ class FormRequest(object):
 
 bind(FormRequest)
 
+# Streamed bodies.
+class HttpChunk(object):
+	"""A section of a streamed HTTP body, inbound or outbound.
+
+	Inbound streaming is enabled by ``stream_body`` on :func:`~.listen` or
+	:func:`~.connect`. A body is then streamed when it is sent with the chunked
+	transfer-encoding or, at a server, when its Content-Length is over the limit
+	for a whole body. The request or response is delivered with a null body and
+	is followed by a sequence of chunks. An empty block marks the end. Without
+	``stream_body`` a chunked body is collected and delivered whole, and an
+	oversized body is dropped.
+
+	To stream a body outbound, include ``Transfer-Encoding: chunked`` in
+	the header of the request or response, then send the chunks to the
+	same address.
+
+	:param block: section of the body
+	"""
+	def __init__(self, block: bytearray=None):
+		self.block = block or bytearray()
+
+class HttpChunkAck(object):
+	"""Acknowledge an inbound :class:`~.HttpChunk`.
+
+	Sent back to the address of the chunk. Delivery of chunks stops after
+	a fixed number without an acknowledgement, leaving further bytes in
+	the socket.
+	"""
+	pass
+
+bind(HttpChunk, copy_before_sending=False)
+bind(HttpChunkAck, copy_before_sending=False)
+
 #
 #
 class HttpMethod(Enum):
@@ -183,6 +217,10 @@ class ResourceDispatch(object):
 	mappings of request-to-function, using the :meth:`~.ResourceDispatch.add` method.
 	Then expect calls to :meth:`~.ResourceDispatch.lookup` that matches the runtime FormRequest to a saved
 	function.
+
+	Mappings are compiled into a route table keyed on the text of the
+	request, i.e. resource name, method name and the presence of each
+	form entry. Lookup is a single probe of the table.
 	'''
 	def __init__(self, form: ReForm, resource: list[Type]):
 		entry_names = form.entry_names()
@@ -201,8 +239,21 @@ class ResourceDispatch(object):
 		entry is a name and a conversion function.
 		'''
 		expected = tuple(s in kv for s in self.entry_names)
-		key = (resource, method, *expected)
-		self.call_frame[key] = (f, kv)
+		key = (resource.__name__.lower(), method.name, *expected)
+		body = UserDefined(resource)
+
+		# Resolve the source of each arg now rather than per-request.
+		args = []
+		for k, c in kv.items():
+			if k == 'header':
+				args.append((k, lambda request: request.header, c, None))
+			elif k == 'http':
+				args.append((k, lambda request: request.http, c, None))
+			elif k == 'body':
+				args.append((k, lambda request: request.body, c, body))
+			else:
+				args.append((k, lambda request, k=k: request.form_entry[k], c, None))
+		self.call_frame[key] = (f, args)
 
 	def lookup(self, request: FormRequest):
 		'''Resolve the function to call based on info in FormRequest.
@@ -212,19 +263,21 @@ class ResourceDispatch(object):
 		matched text to application values, Return function and args.
 		'''
 		try:
-			resource = self.resource_class[request.form_entry['resource']]
-			method = HttpMethod[request.method]
-			expected = tuple(request.form_entry[s] is not None for s in self.entry_names)
-			key = (resource, method, *expected)
+			form_entry = request.form_entry
+			expected = tuple(form_entry[s] is not None for s in self.entry_names)
+			key = (form_entry['resource'], request.method, *expected)
 			call = self.call_frame.get(key, None)
 			if call is None:
+				# Distinguish an unknown resource or method.
+				resource = self.resource_class[form_entry['resource']]
+				method = HttpMethod[request.method]
 				f = cannot_be_dispatched
 				a = {
 					'request': request,
 					'error': 'no matching call signature',
 				}
 				return f, a
-		except (ValueError, IndexError, KeyError) as e:
+		except (ValueError, IndexError, KeyError, TypeError) as e:
 			s = str(e)
 			f = cannot_be_dispatched
 			a = {
@@ -236,16 +289,14 @@ class ResourceDispatch(object):
 		try:
 			f, args = call
 			a = {}
-			for k, c in args.items():
-				if k == 'header':
-					value = request.header if c is None else c(request.header)
-				elif k == 'http':
-					value = request.http if c is None else c(request.http)
-				elif k == 'body':
-					value = request.body if c is None else c(request.body, UserDefined(resource))
+			for k, v, c, body in args:
+				value = v(request)
+				if c is None:
+					pass
+				elif body is None:
+					value = c(value)
 				else:
-					entry = request.form_entry[k]
-					value = entry if c is None else c(entry) 
+					value = c(value, body)
 				a[k] = value
 		except (ValueError, IndexError, KeyError, TypeError) as e:
 			s = str(e)
@@ -269,26 +320,21 @@ class ResourceDispatch(object):
 		if response is not None:
 			layer.send(response, return_address)
 
-# Conversion of messages to on-the-wire blocks, and back again.
-# Sync HTTP request-response, fully typed (HTTP body).
-# Accepted patterns.
-REQUEST_LINE = -1
-EMPTY_LINE = -2
-HEADER_LINE = -3
-BODY_BLOCK = -4
-DISCARD_LINE = -5
-RESPONSE_LINE = -6
-
-# Character sets and constants for FSM.
-HTTP_TEXT = set(ord(c) for c in string.digits) | set(ord(c) for c in string.ascii_letters) | set(ord(c) for c in string.punctuation)
-HTTP_SPACE = set(ord(c) for c in [' ', '\t'])
-HTTP_DIGIT = set(ord(c) for c in string.digits)
-HTTP_PRINTING = HTTP_TEXT | HTTP_SPACE
+# Compiled conversion of query and form arguments,
+# per message.
+ARGUMENT_DECODER = {}
 
-CR = 13		# Carriage return.
-NL = 10		# Form feed.
-CN = 58		# Colon.
+def argument_decoder(message):
+	"""Find or compile the argument conversions for a message. Return a dict of name and function."""
+	decoder = ARGUMENT_DECODER.get(message, None)
+	if decoder is None:
+		schema = message.__art__.schema
+		decoder = {k: compile_argument(t) for k, t in schema.items()}
+		ARGUMENT_DECODER[message] = decoder
+	return decoder
 
+# Conversion of messages to on-the-wire blocks, and back again.
+# Sync HTTP request-response, fully typed (HTTP body).
 # Limits for elements of HTTP.
 METHOD_LENGTH = 10
 REQUEST_LENGTH = 8000
@@ -303,6 +349,28 @@ SERVER_REST_VERSION = 'Layer-Cake-REST-server/1.0'
 
 LARGE_BODY = 256 * 1024
 
+# Streamed bodies are delivered in sections of up
+# to SECTION_SIZE, with at most CHUNK_WINDOW sections
+# awaiting an ack.
+SECTION_SIZE = 64 * 1024
+CHUNK_WINDOW = 8
+
+# Accepted patterns. Text is the printable ASCII characters
+# other than space, i.e. digits, letters and punctuation.
+REQUEST_LINE = re.compile(rb'([\x21-\x7e]{1,%d})[ \t]+([\x21-\x7e]{1,%d})[ \t]+([\x21-\x7e]{1,%d})[ \t]*' % (
+	METHOD_LENGTH, REQUEST_LENGTH, HTTP_LENGTH))
+RESPONSE_LINE = re.compile(rb'([\x21-\x7e]{1,%d})[ \t]+([0-9]{1,8})[ \t]+([\x21-\x7e][\x21-\x7e \t]{0,%d})?' % (
+	METHOD_LENGTH, HTTP_LENGTH - 1))
+HEADER_LINE = re.compile(rb'([\x21-\x7e][\x21-\x39\x3b-\x7e]{0,%d}):[ \t]([\x21-\x7e \t]{1,%d})' % (
+	NAME_LENGTH - 1, VALUE_LENGTH))
+EMPTY_LINE = re.compile(rb'[ \t]*')
+CHUNK_LINE = re.compile(rb'([0-9a-fA-F]{1,8})[ \t]*(?:;[\x20-\x7e\t]*)?')
+
+# Longest line worth buffering.
+LINE_LENGTH = REQUEST_LENGTH + 256
+
+CR = 13		# Carriage return.
+
 # Stream the representation of an HTTP request onto the
 # byte sequence provided.
 def stream_request(encoded_bytes, method=None, request_uri=None, http=None, header=None, body=None):
@@ -320,7 +388,8 @@ def stream_request(encoded_bytes, method=None, request_uri=None, http=None, head
 		request = (f'{method} {request_uri} {http}\r\n'
 			f'User-Agent: {CLIENT_SLASH_VERSION}\r\n')
 
-	if 'Content-Length' not in header:
+	chunked = is_chunked(header)
+	if 'Content-Length' not in header and not chunked:
 		request += f'Content-Length: {content_length}\r\n'
 
 	if 'Content-Type' not in header:
@@ -333,7 +402,11 @@ def stream_request(encoded_bytes, method=None, request_uri=None, http=None, head
 	request += '\r\n'
 
 	encoded_bytes += request.encode('utf-8')
-	if body:
+	if not body:
+		return
+	if chunked:
+		stream_chunk(encoded_bytes, body)
+	else:
 		encoded_bytes += body
 
 # Stream the representation of an HTTP response onto the
@@ -348,7 +421,12 @@ def stream_response(encoded_bytes, http=None, status_code=200, reason_phrase=Non
 		status_code, reason_phrase = faulted_status(status_code)
 
 	server_version = SERVER_SLASH_VERSION if not restful else SERVER_REST_VERSION
-	if body:
+	chunked = is_chunked(header)
+	if chunked:
+		response = (f'{http} {status_code} {reason_phrase}\r\n'
+			f'Date: {date}\r\n'
+			f'Server: {server_version}\r\n')
+	elif body:
 		content_length = len(body)
 		response = (f'{http} {status_code} {reason_phrase}\r\n'
 			f'Date: {date}\r\n'
@@ -367,9 +445,34 @@ def stream_response(encoded_bytes, http=None, status_code=200, reason_phrase=Non
 	response += '\r\n'
 
 	encoded_bytes += response.encode('utf-8')
-	if body:
+	if not body:
+		return
+	if chunked:
+		stream_chunk(encoded_bytes, body)
+	else:
 		encoded_bytes += body
 
+# Stream one section of a chunked body onto the
+# byte sequence provided. Empty is the last chunk.
+def stream_chunk(encoded_bytes, block):
+	n = len(block)
+	if n == 0:
+		encoded_bytes += b'0\r\n\r\n'
+		return
+	encoded_bytes += b'%x\r\n' % (n,)
+	encoded_bytes += block
+	encoded_bytes += b'\r\n'
+
+def is_chunked(header):
+	"""Check for the chunked transfer-encoding in the header. Return a bool."""
+	if not header:
+		return False
+	encoding = header.get('Transfer-Encoding', None)
+	if encoding is None:
+		return False
+	# Chunked is always the final coding.
+	return encoding.rstrip().lower().endswith('chunked')
+
 def faulted_status(error_code):
 	status_code = error_code or 500
 	if status_code < 100:
@@ -391,233 +494,242 @@ def faulted_status(error_code):
 	return status_code, reason
 
 # Inbound requests and outbound responses.
-class ApiServerStream(object):
-	def __init__(self, transport):
+# Input states of a stream.
+START_LINE = 1
+HEADER_LINES = 2
+BODY_BYTES = 3
+STREAM_BYTES = 4
+CHUNK_SIZE_LINE = 5
+CHUNK_DATA = 6
+CHUNK_CRLF = 7
+TRAILER_LINES = 8
+
+class HyperTextStream(object):
+	"""Recover HTTP/1.1 frames from blocks of bytes.
+
+	Lines are located with find() and matched against the accepted
+	patterns, the body is sliced from the buffer by Content-Length. A
+	line that fails to match discards any frame in progress. Derived
+	classes match the start line and convert the frame to a message.
+
+	Where the owning request enables ``stream_body``, a chunked body, or
+	one with a Content-Length over ``large_body``, is streamed. The frame
+	is delivered without its body and is followed by a :class:`~.HttpChunk`
+	per section. Once ``CHUNK_WINDOW`` sections are unacknowledged, recovery
+	stops and the transport is marked as not receiving. Otherwise a chunked
+	body is collected, up to ``large_body``, and the frame delivered whole.
+	Errors in chunk framing raise a ValueError.
+
+	:param transport: the owning connection
+	:type transport: TcpTransport
+	:param large_body: limit on Content-Length or None
+	:type large_body: int
+	"""
+	def __init__(self, transport, large_body=None):
 		self.transport = transport
+		self.large_body = large_body
+		self.stream_body = transport.parent.request.stream_body
 
 		# Specific to input decoding.
-		self.analysis_state = 1
-		self.method = bytearray()
-		self.request = bytearray()
-		self.http = bytearray()
-
-		# Lexical FSMs - REQUEST_LINE.
-		def s1(c):
-			if c in HTTP_TEXT:
-				self.method.append(c)		# GET/POST/...
-				return 2
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s2(c):
-			if c in HTTP_TEXT:
-				n = len(self.method)
-				if n < METHOD_LENGTH:
-					self.method.append(c)	# GET/POST/... (cont)
-					return 2
-				return 10
-			elif c in HTTP_SPACE:
-				return 3
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s3(c):
-			if c in HTTP_SPACE:
-				return 3
-			elif c in HTTP_TEXT:
-				self.request.append(c)		# Request URI.
-				return 4
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s4(c):
-			if c in HTTP_TEXT:
-				n = len(self.request)
-				if n < REQUEST_LENGTH:
-					self.request.append(c)	# Request URI (cont).
-					return 4
-				return 10
-			elif c in HTTP_SPACE:
-				return 5
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s5(c):
-			if c in HTTP_SPACE:
-				return 5
-			elif c in HTTP_TEXT:
-				self.http.append(c)			# HTTP version.
-				return 6
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s6(c):
-			if c in HTTP_TEXT:
-				n = len(self.http)
-				if n < HTTP_LENGTH:
-					self.http.append(c)		# HTTP version (cont).
-					return 6
-				return 10
-			elif c in HTTP_SPACE:
-				return 9
-			elif c == CR:
-				return 8
-			elif c == NL:
-				return REQUEST_LINE			# Shortcut request line.
-			return 10
-
-		def s8(c):
-			if c == NL:
-				return REQUEST_LINE			# Request line.
-			return 10
-
-		def s9(c):
-			if c in HTTP_SPACE:
-				return 9
-			elif c == CR:
-				return 8
-			elif c == NL:
-				return REQUEST_LINE			# Shortcut request line.
-			return 10
-
-		# Failed the proper layout, discard up to next line termination.
-		def s10(c):
-			if c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s11(c):
-			if c == NL:
-				return DISCARD_LINE
-			return 10
-
-		# HEADER_LINE.
-		def s20(c):
-			if c in HTTP_TEXT:
-				self.name.append(c)		# Header name.
-				return 21
-			elif c in HTTP_SPACE:
-				return 40
-			elif c == CR:
-				return 41
-			elif c == NL:
-				return EMPTY_LINE
-			return 10
-
-		def s21(c):
-			if c == CN:					# Colon. MUST check this first.
-				return 22
-			elif c in HTTP_TEXT:
-				n = len(self.name)
-				if n < NAME_LENGTH:
-					self.name.append(c)	# Header name (cont).
-					return 21
-				return 10
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s22(c):
-			if c in HTTP_SPACE:		# Between colon and value.
-				return 23
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s23(c):
-			if c in HTTP_PRINTING:
-				self.value.append(c)	# Header value.
-				return 24
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s24(c):
-			if c in HTTP_PRINTING:
-				n = len(self.value)
-				if n < VALUE_LENGTH:
-					self.value.append(c)	# Header value (cont).
-					return 24
-				return 10
-			elif c in HTTP_SPACE:
-				return 27
-			elif c == CR:
-				return 26
-			elif c == NL:
-				return HEADER_LINE
-			return 10
-
-		def s26(c):
-			if c == NL:
-				return HEADER_LINE
-			return 10
-
-		def s27(c):
-			if c in HTTP_SPACE:
-				return 27
-			elif c == CR:
-				return 26
-			elif c == NL:
-				return HEADER_LINE
-			return 10
-
-		# EMPTY_LINE
-		def s40(c):
-			if c in HTTP_SPACE:
-				return 40
-			elif c == CR:
-				return 41
-			elif c == NL:
-				return EMPTY_LINE
-			return 10
-
-		def s41(c):
-			if c == NL:
-				return EMPTY_LINE
-			return 10
-
-		# BODY_BLOCK
-		def s30(c):
-			self.body.append(c)
-			self.length -= 1
-			if self.length < 1:
-				return BODY_BLOCK
-			return 30
-
-		self.shift = {
-			1: s1, 2: s2, 3: s3, 4: s4, 5: s5,
-			6: s6, 8: s8, 9: s9, 10: s10, 11: s11,
-
-			20: s20, 21: s21, 22: s22, 23: s23,
-			24: s24, 26: s26, 27: s27,
-
-			40: s40, 41: s41,
-
-			30: s30,
-		}
+		self.analysis_state = START_LINE
+		self.buffered = bytearray()
+		self.discarding = False
+		self.header = {}
+		self.body = None
+		self.length = 0
+
+		# Streamed body.
+		self.remaining = 0
+		self.unacked = 0
+
+	def start_line(self, buffered, start, end, cr):
+		"""Match the line at start-end. Return true on success."""
+		return False
+
+	def recover_hyper_text(self):
+		"""Convert the current frame. Return a 3-tuple of message and addresses."""
+		return None, None, None
+
+	def recover_head(self):
+		"""Convert the current frame, less its streamed body. Return a 3-tuple of message and addresses."""
+		return None, None, None
+
+	def recover_section(self, block):
+		transport = self.transport
+		if block:
+			self.unacked += 1
+		return HttpChunk(block), transport.local_termination, transport.return_proxy
+
+	def acknowledge(self):
+		"""Retire the oldest streamed section, resuming input if it was paused."""
+		if self.unacked > 0:
+			self.unacked -= 1
+		transport = self.transport
+		if not transport.receiving and self.unacked < CHUNK_WINDOW:
+			transport.receiving = True
+			transport.resumed = True
+
+	def streamed(self, m):
+		"""Push the chunk messages onto the byte stream. Return true if handled."""
+		if isinstance(m, HttpChunk):
+			stream_chunk(self.transport.encoded_bytes, m.block)
+			return True
+		elif isinstance(m, HttpChunkAck):
+			self.acknowledge()
+			return True
+		return False
+
+	# Complete zero or more messages, using the given block.
+	def recover_message(self, received, sockets):
+		buffered = self.buffered
+		buffered += received
+		scanned = 0
+		try:
+			while True:
+				state = self.analysis_state
+				if state == BODY_BYTES:
+					end = scanned + self.length
+					if end > len(buffered):
+						break
+					self.body = buffered[scanned:end]
+					scanned = end
+					self.analysis_state = START_LINE
+					yield self.recover_hyper_text()
+					continue
+
+				elif state in (STREAM_BYTES, CHUNK_DATA):
+					streaming = self.stream_body
+					if streaming and self.unacked >= CHUNK_WINDOW:
+						self.transport.receiving = False
+						break
+					end = scanned + min(self.remaining, SECTION_SIZE)
+					if end > len(buffered):
+						break
+					block = buffered[scanned:end]
+					scanned = end
+					self.remaining -= len(block)
+					if streaming:
+						yield self.recover_section(block)
+					elif self.body is not None:
+						self.body += block
+						if self.large_body is not None and len(self.body) > self.large_body:
+							self.body = None		# Too large, drop the frame.
+					if self.remaining > 0:
+						continue
+					if state == CHUNK_DATA:
+						self.analysis_state = CHUNK_CRLF
+						continue
+					self.analysis_state = START_LINE
+					yield self.recover_section(bytearray())
+					continue
+
+				nl = buffered.find(b'\n', scanned)
+				if nl == -1:
+					if len(buffered) - scanned > LINE_LENGTH:
+						if state > BODY_BYTES:
+							raise ValueError('chunk framing line too long')
+						scanned = len(buffered)		# Discard up to next line.
+						self.discarding = True
+					break
+				start, end = scanned, nl
+				scanned = nl + 1
+				cr = end > start and buffered[end - 1] == CR
+				if cr:
+					end -= 1
+
+				if self.discarding:
+					self.discarding = False
+					self.analysis_state = START_LINE
+					continue
+
+				if state == CHUNK_SIZE_LINE:
+					match = CHUNK_LINE.fullmatch(buffered, start, end)
+					if match is None:
+						raise ValueError('unexpected chunk size')
+					self.remaining = int(match[1], 16)
+					self.analysis_state = CHUNK_DATA if self.remaining > 0 else TRAILER_LINES
+					continue
+
+				elif state == CHUNK_CRLF:
+					if end > start:
+						raise ValueError('chunk not terminated by CR-LF')
+					self.analysis_state = CHUNK_SIZE_LINE
+					continue
+
+				elif state == TRAILER_LINES:
+					if EMPTY_LINE.fullmatch(buffered, start, end):
+						self.analysis_state = START_LINE
+						if self.stream_body:
+							yield self.recover_section(bytearray())
+						elif self.body is not None:
+							yield self.recover_hyper_text()
+					elif not HEADER_LINE.fullmatch(buffered, start, end):
+						raise ValueError('unexpected chunk trailer')
+					continue		# Trailers are dropped.
+
+				if self.analysis_state == START_LINE:
+					if self.start_line(buffered, start, end, cr):
+						self.analysis_state = HEADER_LINES
+						self.header = {}
+						self.body = None
+						self.length = 0
+					continue
+
+				match = HEADER_LINE.fullmatch(buffered, start, end)
+				if match:
+					self.header[match[1].decode('ascii')] = match[2].decode('ascii')
+					continue
+				self.analysis_state = START_LINE
+				if not EMPTY_LINE.fullmatch(buffered, start, end):
+					continue		# Discard the frame.
+
+				if is_chunked(self.header):
+					self.analysis_state = CHUNK_SIZE_LINE
+					if self.stream_body:
+						yield self.recover_head()
+					else:
+						self.body = bytearray()
+					continue
+
+				s = self.header.get('Content-Length', None)
+				if s:
+					length = int(s)
+					if self.large_body is not None and length > self.large_body:
+						if not self.stream_body:
+							# Discard everything. Should close. Likely
+							# to land in nowheres-ville and fail anyway.
+							continue
+						self.analysis_state = STREAM_BYTES
+						self.remaining = length
+						yield self.recover_head()
+						continue
+					self.body = bytearray()
+					if length > 0:
+						self.analysis_state = BODY_BYTES
+						self.length = length
+						continue
+
+				# Completed frame.
+				yield self.recover_hyper_text()
+		finally:
+			del buffered[:scanned]
+
+class ApiServerStream(HyperTextStream):
+	def __init__(self, transport):
+		HyperTextStream.__init__(self, transport, large_body=LARGE_BODY)
+		self.method = None
+		self.request = None
+		self.http = None
+
+		# Conversion of query and form arguments.
+		self.arguments = CodecJson()
+
+	def start_line(self, buffered, start, end, cr):
+		match = REQUEST_LINE.fullmatch(buffered, start, end)
+		if match is None:
+			return False
+		self.method, self.request, self.http = match.groups()
+		return True
 
 	# Message being sent from HTTP server.
 	# Push the optimal representation of the next message onto the byte stream.
@@ -629,6 +741,9 @@ class ApiServerStream(object):
 		search_subs = self.transport.parent.search_subs
 		restful = search_subs is not None
 
+		if self.streamed(m):
+			return
+
 		content_json = {'Content-Type': 'application/json'}
 		content_text = {'Content-Type': 'plain/text'}
 		if isinstance(m, Faulted):
@@ -680,67 +795,23 @@ class ApiServerStream(object):
 				http=m.http, status_code=m.status_code, reason_phrase=m.reason_phrase,
 				header=m.header, restful=restful)
 
-	# Complete zero or more messages, using the given block.
-	def recover_message(self, received, sockets):
-		for c in received:
-			next = self.shift[self.analysis_state](c)
-			if next > 0:
-				self.analysis_state = next
-				continue
-
-			# Poor man's reduce-goto.
-			if next == REQUEST_LINE:
-				self.analysis_state = 20
-				self.name = bytearray()
-				self.value = bytearray()
-				self.header = {}
-				self.body = None
-				self.length = 0
-				continue
-			elif next == HEADER_LINE:
-				name = self.name.decode('ascii')
-				value = self.value.decode('ascii')
-				self.header[name] = value
-				self.analysis_state = 20
-				self.name = bytearray()
-				self.value = bytearray()
-				continue
-			elif next == EMPTY_LINE:
-				s = self.header.get('Content-Length', None)
-				if s:
-					self.length = int(s)
-					if self.length > LARGE_BODY:
-						# Discard everything. Should close. Likely
-						# to land in nowheres-ville and fail anyway.
-						self.analysis_state = 1
-						self.method = bytearray()
-						self.request = bytearray()
-						self.http = bytearray()
-						continue
-					self.body = bytearray()
-					if self.length > 0:
-						self.analysis_state = 30
-						continue
-			elif next == BODY_BLOCK:
-				pass
-			else:
-				# Discard line,
-				self.analysis_state = 1
-				self.method = bytearray()
-				self.request = bytearray()
-				self.http = bytearray()
-				continue
-
-			body, to_address, return_address = self.recover_hyper_text()
-
-			# Completed frame.
-			yield body, to_address, return_address
+	# An HTTP request with a streamed body. Pass the raw
+	# request, no conversion is possible without the body.
+	def recover_head(self):
+		transport = self.transport
+		method = self.method.decode('ascii')
+		request = self.request.decode('ascii')
+		http = self.http.decode('ascii')
 
-			# Restart.
-			self.analysis_state = 1
-			self.method = bytearray()
-			self.request = bytearray()
-			self.http = bytearray()
+		search_subs = transport.parent.search_subs
+		if search_subs:
+			search, subs = search_subs
+			match = search.fullmatch(request)
+			form_entry = match.groupdict() if match else dict.fromkeys(subs)
+			message = FormRequest(method, request, form_entry, http, self.header, None)
+		else:
+			message = HttpRequest(method=method, request_uri=request, http=http, header=self.header)
+		return message, transport.local_termination, transport.return_proxy
 
 	# An HTTP request has been received by an HTTP server.
 	# Recover the best-possible message and forward to receiver.
@@ -769,7 +840,7 @@ class ApiServerStream(object):
 				search, subs = search_subs
 				match = search.fullmatch(request)
 				if match:
-					form_entry = {s: match[s] for s in subs}
+					form_entry = match.groupdict()
 					message = FormRequest(method, request, form_entry, http, header, body)
 					return message, to_address, return_address
 				raise ValueError(f'request URI does not match form')
@@ -791,11 +862,11 @@ class ApiServerStream(object):
 				if not default_to_request:
 					raise ValueError(f'unknown and defaulting to HTTP requests disabled')
 			elif question != -1:
-				schema = tom.__art__.schema
+				decoder = argument_decoder(tom)
 				message = tom()
 				a = query.split('&')
 				try:
-					c = CodecJson()
+					c = self.arguments
 					for kv in a:
 						if not kv:
 							continue
@@ -806,11 +877,11 @@ class ApiServerStream(object):
 						v = kv[equals + 1:]
 						q = unquote_plus(v)
 
-						t = schema.get(k, None)
-						if t is None:
+						f = decoder.get(k, None)
+						if f is None:
 							raise ValueError(f'unknown key "{k}" in "{name}" query')
-						d = decode_argument(c, q, t)
-						setattr(message, k, d)
+						d = f(c, q)
+						object.__setattr__(message, k, d)
 				except CodecError as e:
 					s = str(e)
 					raise ValueError(f'no conversion for "{k}" ({s})')
@@ -819,7 +890,7 @@ class ApiServerStream(object):
 				return message, to_address, return_address
 
 			elif content_type == 'application/x-www-form-urlencoded':
-				schema = tom.__art__.schema
+				decoder = argument_decoder(tom)
 				message = tom()
 				if body:
 					# Breakout the flat form into a key-value dict.
@@ -827,7 +898,7 @@ class ApiServerStream(object):
 					a = d.split('&')
 
 					try:
-						c = CodecJson()
+						c = self.arguments
 						for kv in a:
 							equals = kv.find('=')
 							if equals < 0:
@@ -836,12 +907,12 @@ class ApiServerStream(object):
 							v = kv[equals + 1:]
 							q = unquote_plus(v)
 
-							t = schema.get(k, None)
-							if t is None:
+							f = decoder.get(k, None)
+							if f is None:
 								raise ValueError(f'unknown key "{k}" in "{name}" x-www-form')
 
-							d = decode_argument(c, q, t)
-							setattr(message, k, d)
+							d = f(c, q)
+							object.__setattr__(message, k, d)
 					except CodecError as e:
 						s = str(e)
 						raise ValueError(f'no conversion for "{k}" ({s})')
@@ -887,11 +958,61 @@ class INITIAL: pass
 class READY: pass
 
 class ApiClientSession(Point, StateMachine):
-	def __init__(self, proxy_address=None, **kv):
+	"""Correlate HTTP requests and responses over a single connection.
+
+	Requests are queued and sent in order, with up to ``pipelining`` on
+	the wire at any one time. Each response is matched to the oldest
+	request on the wire. Pipelining beyond 1 requires a server that
+	responds in the order of the requests, as per HTTP/1.1.
+
+	A request sent with ``Transfer-Encoding: chunked`` is followed by
+	its :class:`~.HttpChunk` messages. No other request is sent until
+	the empty chunk. Chunks of a streamed response are passed to the
+	sender of the request, and acks from the sender passed back.
+
+	:param proxy_address: the connection
+	:param pipelining: maximum requests awaiting a response
+	"""
+	def __init__(self, proxy_address=None, pipelining: int=1, **kv):
 		Point.__init__(self)
 		StateMachine.__init__(self, INITIAL)
 		self.proxy_address = proxy_address
+		self.pipelining = max(1, pipelining or 1)
 		self.pending = deque()
+		self.sent = 0				# Number of pending on the wire.
+		self.uploading = None		# Sender of an unfinished chunked request.
+		self.streaming = None		# Sender of the latest request to get a response.
+
+	def send_pending(self):
+		pending = self.pending
+		while self.uploading is None and self.sent < self.pipelining and self.sent < len(pending):
+			m, t, r, chunks = pending[self.sent]
+			self.send(cast_to(m, t), self.proxy_address)
+			self.sent += 1
+			if chunks is None:
+				continue
+			for c in chunks:
+				self.send(c, self.proxy_address)
+			if not chunks or chunks[-1].block:
+				self.uploading = r
+
+	def upload(self, message):
+		"""Pass a chunk of a request body to the wire, or hold it until the request is sent."""
+		r = self.return_address
+		if self.uploading is not None and self.uploading[-1] == r[-1]:
+			self.send(message, self.proxy_address)
+			if not message.block:
+				self.uploading = None
+				self.send_pending()
+			return
+		for p in reversed(self.pending):
+			m, t, a, chunks = p
+			if a[-1] == r[-1]:
+				if chunks is not None and (not chunks or chunks[-1].block):
+					chunks.append(message)
+					return
+				break
+		self.warning(f'chunk from local client has no matching request')
 
 def ApiClientSession_INITIAL_Start(self, message):
 	return READY
@@ -900,24 +1021,30 @@ def ApiClientSession_READY_Unknown(self, message):
 	# A message passing through, either a response from the
 	# remote end or another request from a local object.
 	if self.return_address[-1] == self.proxy_address[-1]:	# Response from remote.
-		if self.pending:									# Yes there is a matching request.
-			m, t, r = self.pending.popleft()
+		if isinstance(message, HttpChunk):					# Section of a streamed response.
+			if self.streaming is not None:
+				self.send(message, self.streaming)
+		elif self.sent:										# Yes there is a matching request.
+			m, t, r, chunks = self.pending.popleft()
+			self.sent -= 1
+			self.streaming = r
 			c = cast_to(message, self.received_type)
 			self.send(c, r)									# Send response to original client.
-			if self.pending:								# A waiting request?
-				m, t, r = self.pending[0]
-				c = cast_to(m, t)
-				self.send(m, self.proxy_address)
+			self.send_pending()								# Any waiting requests.
 		else:
 			#t = tof(message)
 			self.warning(f'message "tof" from HTTP server has no matching request')
+	elif isinstance(message, HttpChunkAck):					# Local client has processed a chunk.
+		self.send(message, self.proxy_address)
+	elif isinstance(message, HttpChunk):					# Section of a streamed request.
+		self.upload(message)
 	elif len(self.pending) > PENDING_REQUESTS:
 		self.reply(HttpResponse(status_code=400, reason_phrase='Client Error', body='Request queue overflow'))
 	else:
-		mtr = (message, self.received_type, self.return_address)				# Request from local client.
+		chunks = [] if isinstance(message, HttpRequest) and is_chunked(message.header) else None
+		mtr = [message, self.received_type, self.return_address, chunks]	# Request from local client.
 		self.pending.append(mtr)							# Remember.
-		if len(self.pending) == 1:						# Nothing pending.
-			self.send(message, self.proxy_address)
+		self.send_pending()
 	return READY
 
 def ApiClientSession_READY_Stop(self, message):
@@ -936,232 +1063,29 @@ bind(ApiClientSession, API_CLIENT_SESSION_DISPATCH, thread='api-client-session')
 
 # 
 #
-class ApiClientStream(object):
+class ApiClientStream(HyperTextStream):
 	def __init__(self, transport):
-		self.transport = transport
+		HyperTextStream.__init__(self, transport)
 
-		# Specific to input decoding.
-		self.analysis_state = 1
+		# Conversion of form arguments.
+		self.arguments = CodecNoop()
 
 		# Response.
-		self.http = bytearray()
-		self.code = bytearray()
-		self.reason = bytearray()
-		# Header.
-		self.name = bytearray()
-		self.value = bytearray()
-		self.header = {}
-		# Body.
-		self.body = None
-
-		# RESPONSE_LINE.
-		def s1(c):
-			if c in HTTP_TEXT:
-				self.http.append(c)		# HTTP/...
-				return 2
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s2(c):
-			if c in HTTP_TEXT:
-				n = len(self.http)
-				if n < METHOD_LENGTH:
-					self.http.append(c)	# HTTP/...
-					return 2
-				return 10
-			elif c in HTTP_SPACE:
-				return 3
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s3(c):
-			if c in HTTP_SPACE:
-				return 3
-			elif c in HTTP_DIGIT:
-				self.code.append(c)		# Response code.
-				return 4
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s4(c):
-			if c in HTTP_DIGIT:
-				n = len(self.code)
-				if n < 8:
-					self.code.append(c)	# Response code.
-					return 4
-				return 10
-			elif c in HTTP_SPACE:
-				return 5
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s5(c):
-			if c in HTTP_SPACE:
-				return 5
-			elif c in HTTP_PRINTING:
-				self.reason.append(c)		# Reason phrase.
-				return 7
-			elif c == CR:
-				return 8
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s7(c):
-			if c in HTTP_PRINTING:
-				n = len(self.reason)
-				if n < HTTP_LENGTH:
-					self.reason.append(c)	# Reason phrase.
-					return 7
-				return 10
-			elif c == CR:
-				return 8
-			elif c == NL:
-				return RESPONSE_LINE			# Shortcut response line.
-			return 10
-
-		def s8(c):
-			if c == NL:
-				return RESPONSE_LINE			# Response line.
-			return 10
-
-		# Failed the proper layout, discard up to next line termination.
-		def s10(c):
-			if c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s11(c):
-			if c == NL:
-				return DISCARD_LINE
-			return 10
-
-		# HEADER_LINE.
-		def s20(c):
-			if c in HTTP_TEXT:
-				self.name.append(c)		# Header name.
-				return 21
-			elif c in HTTP_SPACE:
-				return 40
-			elif c == CR:
-				return 41
-			elif c == NL:
-				return EMPTY_LINE
-			return 10
-
-		def s21(c):
-			if c == CN:		# Colon. Check this first.
-				return 22
-			elif c in HTTP_TEXT:
-				n = len(self.name)
-				if n < NAME_LENGTH:
-					self.name.append(c)	# Header name.
-					return 21
-				return 10
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s22(c):
-			if c in HTTP_SPACE:		# Between colon and value.
-				return 23
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s23(c):
-			if c in HTTP_PRINTING:
-				self.value.append(c)	# Header value.
-				return 24
-			elif c == CR:
-				return 11
-			elif c == NL:
-				return DISCARD_LINE
-			return 10
-
-		def s24(c):
-			if c in HTTP_PRINTING:
-				n = len(self.value)
-				if n < VALUE_LENGTH:
-					self.value.append(c)	# Header value.
-					return 24
-				return 10
-			elif c in HTTP_SPACE:
-				return 27
-			elif c == CR:
-				return 26
-			elif c == NL:
-				return HEADER_LINE
-			return 10
-
-		def s26(c):
-			if c == NL:
-				return HEADER_LINE
-			return 10
-
-		def s27(c):
-			if c in HTTP_SPACE:
-				return 27
-			elif c == CR:
-				return 26
-			elif c == NL:
-				return HEADER_LINE
-			return 10
-
-		# EMPTY_LINE
-		def s40(c):
-			if c in HTTP_SPACE:
-				return 40
-			elif c == CR:
-				return 41
-			elif c == NL:
-				return EMPTY_LINE
-			return 10
-
-		def s41(c):
-			if c == NL:
-				return EMPTY_LINE
-			return 10
-
-		# BODY_BLOCK
-		def s30(c):
-			self.body.append(c)
-			self.length -= 1
-			if self.length < 1:
-				return BODY_BLOCK
-			return 30
-
-		self.shift = {
-			1: s1, 2: s2, 3: s3, 4: s4, 5: s5,
-			7: s7, 8: s8,
-
-			10: s10, 11: s11,
-
-			20: s20, 21: s21, 22: s22, 23: s23,
-			24: s24, 26: s26, 27: s27,
-
-			40: s40, 41: s41,
-
-			30: s30,
-		}
+		self.http = None
+		self.code = None
+		self.reason = None
+
+	def start_line(self, buffered, start, end, cr):
+		match = RESPONSE_LINE.fullmatch(buffered, start, end)
+		if match is None:
+			return False
+		reason = match[3]
+		if reason is None:
+			if not cr:			# Empty reason needs the full CR-LF.
+				return False
+			reason = b''
+		self.http, self.code, self.reason = match[1], match[2], reason
+		return True
 
 	# Message being sent from HTTP client.
 	# Push the optimal representation of the next message onto the byte stream.
@@ -1172,6 +1096,9 @@ class ApiClientStream(object):
 		encoded_bytes = transport.encoded_bytes
 		http_client = transport.parent.request.http_client
 		layer_cake_json = transport.parent.request.layer_cake_json
+		if self.streamed(m):
+			return
+
 		tom = type(m)
 		art = tom.__art__
 
@@ -1193,7 +1120,7 @@ class ApiClientStream(object):
 			schema = tom.__art__.schema
 			ks = []
 			try:
-				c = CodecNoop()
+				c = self.arguments
 				for k, t in schema.items():
 					# Form representation of null is to omit.
 					d = getattr(m, k, None)
@@ -1217,59 +1144,15 @@ class ApiClientStream(object):
 			header={'Content-Type': content_type},
 			body=body)
 
-	# Complete zero or more messages, consuming the given block.
-	def recover_message(self, received, sockets):
-		for c in received:
-			next = self.shift[self.analysis_state](c)
-			if next > 0:
-				self.analysis_state = next
-				continue
-
-			# Poor man's reduce-goto.
-			if next == RESPONSE_LINE:
-				self.analysis_state = 20
-				self.name = bytearray()
-				self.value = bytearray()
-				self.header = {}
-				self.body = None
-				self.length = 0
-				continue
-			elif next == HEADER_LINE:
-				name = self.name.decode('ascii')
-				value = self.value.decode('ascii')
-				self.header[name] = value
-				self.analysis_state = 20
-				self.name = bytearray()
-				self.value = bytearray()
-				continue
-			elif next == EMPTY_LINE:
-				s = self.header.get('Content-Length', None)
-				if s:
-					self.length = int(s)
-					self.body = bytearray()
-					if self.length > 0:
-						self.analysis_state = 30
-						continue
-			elif next == BODY_BLOCK:
-				pass
-			else:
-				# Discard line,
-				self.analysis_state = 1
-				self.http = bytearray()
-				self.code = bytearray()
-				self.reason = bytearray()
-				continue
-
-			body, to_address, return_address = self.recover_hyper_text()
-
-			# Completed frame.
-			yield body, to_address, return_address
-
-			# Restart.
-			self.analysis_state = 1
-			self.http = bytearray()
-			self.code = bytearray()
-			self.reason = bytearray()
+	# An HTTP response with a streamed body.
+	def recover_head(self):
+		transport = self.transport
+		http = self.http.decode('ascii')
+		code = int(self.code.decode('ascii'))
+		reason = self.reason.decode('ascii')
+		message = HttpResponse(http=http, status_code=code, reason_phrase=reason,
+			header=self.header)
+		return message, transport.local_termination, transport.return_proxy
 
 	# HTTP response has been received by this client.
 	# Generate the optimal message and forward to receiver.
@@ -0,0 +1,236 @@
+# Author: Scott Woods <scott.18.ansar@gmail.com>
+# MIT License
+#
+# Copyright (c) 2025 Scott Woods
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Spread HTTP requests across a pool of client connections.
+
+An object that opens several connections to the same HTTP server
+and passes each request to the least-busy connection. Combined with
+pipelining on each connection, this removes the strict one-at-a-time
+exchange of a single :class:`~.ApiClientSession`.
+"""
+__docformat__ = 'restructuredtext'
+
+from collections import deque
+
+from .virtual_memory import *
+from .convert_type import *
+from .message_memory import *
+from .ip_networking import *
+from .virtual_point import *
+from .point_runtime import *
+from .point_machine import *
+from .bind_type import *
+from .listen_connect import *
+from .http import *
+from .http import PENDING_REQUESTS
+
+__all__ = [
+	'ApiClientPool',
+]
+
+#
+class INITIAL: pass
+class READY: pass
+class CLEARING: pass
+
+class ApiClientPool(Point, StateMachine):
+	"""
+	Pool of HTTP client connections to a single server.
+
+	Requests sent to this object are passed to the connection with
+	the fewest outstanding requests, up to the pipelining limit of each
+	connection. Beyond that, requests are held until a response arrives.
+	Responses are sent back to the original sender and, on each
+	connection, are matched to requests in the order they were sent.
+
+	With ``stream_body``, chunks of a streamed response are passed to the
+	sender of the request and acks passed back to the connection. Streaming of
+	request bodies is not supported; send those to a connection
+	opened with :func:`~.connect`.
+
+	Outstanding requests on a lost connection are answered with a 503
+	:class:`~.HttpResponse`. The pool terminates when there are no
+	connections left, returning the last :class:`~.Closed` or
+	:class:`~.NotConnected`, or on a :class:`~.Stop`.
+
+	:param requested_ipp: host and port to connect to
+	:param connections: number of connections in the pool
+	:param pipelining: maximum requests awaiting a response, per connection
+	:param encrypted: enable encryption
+	:param http_client: leading part of the outgoing request URI
+	:param layer_cake_json: is the remote server a layer-cake server
+	:param send_size: maximum bytes per send, defaults to TCP_SEND
+	:param stream_body: deliver chunked response bodies as chunks
+	"""
+	def __init__(self, requested_ipp: HostPort=None, connections: int=2, pipelining: int=1,
+			encrypted: bool=False, http_client: str='/', layer_cake_json: bool=False, send_size: int=None,
+			stream_body: bool=False):
+		Point.__init__(self)
+		StateMachine.__init__(self, INITIAL)
+		self.requested_ipp = requested_ipp
+		self.connections = max(1, connections)
+		self.pipelining = max(1, pipelining)
+		self.encrypted = encrypted
+		self.http_client = http_client
+		self.layer_cake_json = layer_cake_json
+		self.send_size = send_size
+		self.stream_body = stream_body
+
+		self.connecting = 0
+		self.session = {}			# Return addresses in request order, per connection.
+		self.waiting = deque()		# Requests not yet passed to a connection.
+		self.streaming = {}			# Latest sender to get a response, per connection.
+		self.downloading = {}		# Connection of streamed response, per sender.
+
+	def dispatch(self):
+		session = self.session
+		waiting = self.waiting
+		while waiting and session:
+			a, sent = min(session.items(), key=lambda s: len(s[1]))
+			if len(sent) >= self.pipelining:
+				break
+			m, t, r = waiting.popleft()
+			self.send(cast_to(m, t), a)
+			sent.append(r)
+
+	def unavailable(self, returns, note):
+		for r in returns:
+			self.send(HttpResponse(status_code=503, reason_phrase='Service Unavailable', body=note), r)
+
+	def lost(self, note):
+		"""Remove the connection at the return address, failing its requests. Return true if none left."""
+		a = self.return_address
+		sent = self.session.pop(a, None)
+		r = self.streaming.pop(a, None)
+		if r is not None and self.downloading.get(r, None) == a:
+			del self.downloading[r]
+		if sent:
+			self.unavailable(sent, note)
+		if self.session or self.connecting > 0:
+			return False
+		self.unavailable((r for m, t, r in self.waiting), note)
+		self.waiting.clear()
+		return True
+
+	def response(self, message):
+		"""Pass a response to the oldest request on this connection. Return false if not a response."""
+		a = self.return_address
+		sent = self.session.get(a, None)
+		if sent is None:
+			return False
+		if isinstance(message, HttpChunk):
+			r = self.streaming.get(a, None)
+			if r is None:
+				return True
+			self.downloading[r] = a
+			self.send(message, r)
+		elif sent:
+			r = sent.popleft()
+			self.streaming[a] = r
+			self.send(cast_to(message, self.received_type), r)
+		else:
+			self.warning(f'response from HTTP server has no matching request')
+		return True
+
+def ApiClientPool_INITIAL_Start(self, message):
+	for i in range(self.connections):
+		connect(self, self.requested_ipp, encrypted=self.encrypted,
+			http_client=self.http_client, layer_cake_json=self.layer_cake_json,
+			send_size=self.send_size, pipelining=self.pipelining, stream_body=self.stream_body)
+	self.connecting = self.connections
+	return READY
+
+def ApiClientPool_READY_Connected(self, message):
+	self.connecting -= 1
+	self.session[self.return_address] = deque()
+	self.dispatch()
+	return READY
+
+def ApiClientPool_READY_NotConnected(self, message):
+	self.connecting -= 1
+	if self.lost(str(message)):
+		self.complete(message)
+	return READY
+
+def ApiClientPool_READY_Closed(self, message):
+	if self.lost('connection closed'):
+		self.complete(message)
+	return READY
+
+def ApiClientPool_READY_Unknown(self, message):
+	if self.response(message):
+		self.dispatch()
+	elif isinstance(message, HttpChunkAck):
+		a = self.downloading.get(self.return_address, None)
+		if a is not None:
+			self.send(message, a)
+	elif isinstance(message, HttpChunk):
+		self.warning(f'streamed request body not supported by pool')
+	elif len(self.waiting) > PENDING_REQUESTS:
+		self.reply(HttpResponse(status_code=400, reason_phrase='Client Error', body='Request queue overflow'))
+	else:
+		self.waiting.append((message, self.received_type, self.return_address))
+		self.dispatch()
+	return READY
+
+def ApiClientPool_READY_Stop(self, message):
+	if not self.session and self.connecting < 1:
+		self.complete(Aborted())
+	for a in self.session.keys():
+		self.send(Close(), a)
+	return CLEARING
+
+def ApiClientPool_CLEARING_Connected(self, message):
+	self.connecting -= 1
+	self.session[self.return_address] = deque()
+	self.send(Close(), self.return_address)
+	return CLEARING
+
+def ApiClientPool_CLEARING_NotConnected(self, message):
+	self.connecting -= 1
+	if self.lost('pool stopped'):
+		self.complete(Aborted())
+	return CLEARING
+
+def ApiClientPool_CLEARING_Closed(self, message):
+	if self.lost('pool stopped'):
+		self.complete(Aborted())
+	return CLEARING
+
+def ApiClientPool_CLEARING_Unknown(self, message):
+	if not self.response(message):
+		self.reply(HttpResponse(status_code=503, reason_phrase='Service Unavailable', body='pool stopped'))
+	return CLEARING
+
+API_CLIENT_POOL_DISPATCH = {
+	INITIAL: (
+		(Start,), ()
+	),
+	READY: (
+		(Connected, NotConnected, Closed, Unknown, Stop), ()
+	),
+	CLEARING: (
+		(Connected, NotConnected, Closed, Unknown), ()
+	),
+}
+
+bind(ApiClientPool, API_CLIENT_POOL_DISPATCH, thread='api-client-pool')
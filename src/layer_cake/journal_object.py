@@ -0,0 +1,304 @@
+# Author: Scott Woods <scott.18.ansar@gmail.com>
+# MIT License
+#
+# Copyright (c) 2025 Scott Woods
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Storage of maps as a journal of changes.
+
+An alternative to the one-file-per-entry storage of :class:`~.Folder`. The
+:class:`~.Journal` class appends a line for every addition, update or removal
+to a single file and recovers the map with one sequential read. The journal
+is rewritten with only the current entries, i.e. compacted, once the lines
+that have been overtaken outnumber the current entries.
+
+.. autoclass:: Journal
+   :members: store, recover, add, update, remove, clear, compact
+   :member-order: bysource
+"""
+
+__docformat__ = 'restructuredtext'
+
+__all__ = [
+	'Journal',
+]
+
+import os
+
+from .virtual_memory import *
+from .message_memory import *
+from .convert_type import *
+from .make_message import *
+from .virtual_codec import *
+from .json_codec import *
+
+#
+#
+COMPACT_MINIMUM = 1024		# Overtaken lines before considering a compaction.
+
+SET = b'+'
+CLEAR = b'-'
+TAB = b'\t'
+NEWLINE = b'\n'
+
+class Journal(object):
+	"""Store and recover a map of application values, using a single file.
+
+	Every change is appended as a line, i.e. an operation, the name of the
+	entry and its encoding. Names follow the same rules as those of
+	:class:`~.Folder`, less any tab or newline characters. An index of
+	current entries is held in memory.
+
+	:param path: location of the journal in the filesystem
+	:param tip: type expression for the content
+	:type tip: :ref:`tip<type-reference>`
+	:param encoding: selection of representation, defaults to ``CodecJson``
+	:type encoding: class
+	:param keys_names: a key-composer function and a name-composer function
+	:type keys_names: 2-tuple of functions
+	:param sync: force each change to the disk before returning, defaults to ``False``
+	"""
+	def __init__(self, path: str, tip=None, encoding=None, keys_names=None, sync: bool=False):
+		self.path = path
+
+		if tip is None:
+			self.file_type = None
+		elif isinstance(tip, Portable):
+			self.file_type = tip
+		elif hasattr(tip, '__art__'):
+			self.file_type = UserDefined(tip)
+		else:
+			self.file_type = lookup_type(tip)
+
+		self.encoding = encoding or CodecJson
+		self.keys_names = keys_names
+		self.sync = sync
+
+		self.codec = self.encoding(pretty_format=False)
+		self.index = None			# Offset of current entries, by name.
+		self.overtaken = 0			# Lines no longer relevant.
+		self.appending = None
+
+	def key(self, item):
+		keys_names = self.keys_names
+		if keys_names is None:
+			raise ValueError(f'key/name functions not set for "{self.path}" (key)')
+		return keys_names[0](item)
+
+	def name(self, item):
+		keys_names = self.keys_names
+		if keys_names is None:
+			raise ValueError(f'key/name functions not set for "{self.path}" (name)')
+		return keys_names[1](item)
+
+	def encode(self, item):
+		expression = self.file_type
+		if expression is None:
+			if not is_message(item):
+				raise CodecUsageError(f'encoding of unregistered message to journal "{self.path}"')
+			expression = UserDefined(item.__class__)
+		return self.codec.encode(item, expression).encode('utf-8')
+
+	def scan(self):
+		"""Read the journal from start to end. Return the latest encoding of each entry.
+
+		A final line without a newline is the sign of an interrupted
+		write. It is cut from the journal.
+		"""
+		index = {}
+		latest = {}
+		overtaken = 0
+		offset = 0
+		try:
+			with open(self.path, 'rb') as f:
+				for line in f:
+					if not line.endswith(NEWLINE):
+						break
+					if line[:1] == SET:
+						_, name, encoding = line.split(TAB, 2)
+						if name in index:
+							overtaken += 1
+						index[name] = offset
+						latest[name] = encoding
+					elif line[:1] == CLEAR:
+						name = line[2:-1]
+						if index.pop(name, None) is not None:
+							overtaken += 1
+						latest.pop(name, None)
+						overtaken += 1
+					else:
+						raise ValueError(f'unexpected journal line at offset {offset} of "{self.path}"')
+					offset += len(line)
+		except FileNotFoundError:
+			pass
+		else:
+			if offset < os.path.getsize(self.path):
+				os.truncate(self.path, offset)
+
+		self.index = index
+		self.overtaken = overtaken
+		return latest
+
+	def append(self, line):
+		if self.index is None:
+			self.scan()
+		if self.appending is None:
+			self.appending = open(self.path, 'ab')
+		f = self.appending
+		offset = f.tell()
+		f.write(line)
+		f.flush()
+		if self.sync:
+			os.fsync(f.fileno())
+		return offset
+
+	def set(self, name, item):
+		b = name.encode('utf-8')
+		line = SET + TAB + b + TAB + self.encode(item) + NEWLINE
+		offset = self.append(line)
+		if b in self.index:
+			self.overtaken += 1
+		self.index[b] = offset
+		self.compact_as_needed()
+
+	def clear_name(self, name):
+		b = name.encode('utf-8')
+		self.append(CLEAR + TAB + b + NEWLINE)
+		if self.index.pop(b, None) is not None:
+			self.overtaken += 1
+		self.overtaken += 1
+		self.compact_as_needed()
+
+	def close(self):
+		"""Release the open journal, if any."""
+		if self.appending is not None:
+			self.appending.close()
+			self.appending = None
+
+	def rewrite(self, lines):
+		# Replace the journal with the given
+		# lines, safely.
+		self.close()
+		folder = os.path.dirname(self.path)
+		if folder:
+			os.makedirs(folder, exist_ok=True)
+		temporary = self.path + '.tmp'
+		index = {}
+		offset = 0
+		with open(temporary, 'wb') as f:
+			for name, line in lines:
+				f.write(line)
+				index[name] = offset
+				offset += len(line)
+			f.flush()
+			if self.sync:
+				os.fsync(f.fileno())
+		os.replace(temporary, self.path)
+		self.index = index
+		self.overtaken = 0
+
+	def compact(self):
+		"""Rewrite the journal with only the current entries."""
+		latest = self.scan()
+		self.rewrite((name, SET + TAB + name + TAB + encoding) for name, encoding in latest.items())
+
+	def compact_as_needed(self):
+		if self.overtaken > COMPACT_MINIMUM and self.overtaken > len(self.index):
+			self.compact()
+
+	def store(self, values: dict):
+		"""Store a ``dict`` of values as the entire content of the journal.
+
+		:param values: a collection of application values
+		"""
+		def lines():
+			for v in values.values():
+				b = self.name(v).encode('utf-8')
+				yield b, SET + TAB + b + TAB + self.encode(v) + NEWLINE
+		self.rewrite(lines())
+
+	def recover(self):
+		"""Recover application values from the journal.
+
+		A generator function that yields a sequence of tuples that
+		allow the caller to process an entire map with a clean loop.
+		Only the latest encoding of each entry is decoded.
+
+		:return: a sequence of 2-tuples, 0) key and 1) the value
+		:rtype: tuple
+		"""
+		self.close()
+		latest = self.scan()
+		codec = self.codec
+		for name, encoding in latest.items():
+			r = codec.decode(encoding.decode('utf-8'), self.file_type)
+			if self.keys_names is None:
+				k = None
+			else:
+				k = self.key(r)
+			yield k, r
+
+	def add(self, values: dict, item):
+		"""Add a value, both to a ``dict`` of values and to the journal.
+
+		:param values: a collection of application values
+		:param item: the value to be added
+		:type item: :ref:`tip<type-reference>`
+		"""
+		key = self.key(item)
+		name = self.name(item)
+		if key in values:
+			raise ValueError(f'name "{name}" already present (add)')
+		self.set(name, item)
+		values[key] = item
+
+	def update(self, values: dict, item):
+		"""Update a value, both in a ``dict`` of values and in the journal.
+
+		:param values: a collection of application values
+		:param item: the value to be updated
+		:type item: :ref:`tip<type-reference>`
+		"""
+		key = self.key(item)
+		name = self.name(item)
+		if key not in values:
+			raise ValueError(f'name "{name}" not an existing entry (update)')
+		self.set(name, item)
+		values[key] = item
+
+	def remove(self, values: dict, item):
+		"""Remove a value, both from a ``dict`` of values and from the journal.
+
+		:param values: a collection of application values
+		:param item: the value to be removed
+		:type item: :ref:`tip<type-reference>`
+		"""
+		key = self.key(item)
+		name = self.name(item)
+		self.clear_name(name)
+		del values[key]
+
+	def clear(self, values: dict):
+		"""Remove all values, both from a ``dict`` of values and from the journal.
+
+		:param values: a collection of application values
+		"""
+		self.rewrite(())
+		values.clear()
@@ -28,8 +28,10 @@ import queue
 import threading
 import socket
 import select
+import selectors
 import re
 import uuid
+from collections import deque
 from nacl.public import PrivateKey, PublicKey, Box
 from enum import Enum
 from datetime import datetime
@@ -43,6 +45,7 @@ from .message_memory import *
 from .convert_type import *
 from .virtual_codec import *
 from .json_codec import *
+from .binary_codec import *
 from .virtual_runtime import *
 from .virtual_point import *
 from .point_runtime import *
@@ -97,15 +100,22 @@ class ListenForStream(object):
 	:param encrypted: enable encryption
 	:param http_server: list of classes
 	:param default_to_request: default to :class:`~.HttpRequest`
+	:param send_size: maximum bytes per send on accepted transports
+	:param binary: accept offers of the binary codec
+	:param stream_body: deliver large and chunked HTTP bodies as chunks
 	"""
 	def __init__(self, lid: UUID=None, requested_ipp: HostPort=None, encrypted: bool=False,
-			http_server: list[Type]=None, uri_form: ReForm=None, default_to_request: bool=True):
+			http_server: list[Type]=None, uri_form: ReForm=None, default_to_request: bool=True,
+			send_size: int=None, binary: bool=False, stream_body: bool=False):
 		self.lid = lid
 		self.requested_ipp = requested_ipp or HostPort()
 		self.encrypted = encrypted
 		self.http_server = http_server or []
 		self.uri_form = uri_form
 		self.default_to_request = default_to_request
+		self.send_size = send_size
+		self.binary = binary
+		self.stream_body = stream_body
 
 class ConnectStream(object):
 	"""
@@ -116,14 +126,23 @@ class ConnectStream(object):
 	:param keep_alive: monitor the connection
 	:param http_client: inserted as the path in the request URI
 	:param layer_cake_json: enable **layer-cake** JSON body
+	:param send_size: maximum bytes per send on the transport
+	:param binary: offer the binary codec to the remote
+	:param pipelining: maximum HTTP requests awaiting a response
+	:param stream_body: deliver chunked HTTP bodies as chunks
 	"""
 	def __init__(self, requested_ipp: HostPort=None, encrypted: bool=False, keep_alive: bool=False,
-			http_client: str=None, layer_cake_json: bool=False):
+			http_client: str=None, layer_cake_json: bool=False, send_size: int=None, binary: bool=False,
+			pipelining: int=1, stream_body: bool=False):
 		self.requested_ipp = requested_ipp or HostPort()
 		self.encrypted = encrypted
 		self.keep_alive = keep_alive
 		self.http_client = http_client
 		self.layer_cake_json = layer_cake_json
+		self.send_size = send_size
+		self.binary = binary
+		self.pipelining = pipelining
+		self.stream_body = stream_body
 
 class StopListening(object):
 	def __init__(self, lid: UUID=None):
@@ -345,10 +364,16 @@ TCP_SEND = 4096
 UDP_RECV = 4096
 UDP_SEND = 4096
 
+# Upper limit on the blocks passed to a single
+# scatter/gather send.
+SEND_VECTOR = 64
+SEND_MSG = hasattr(socket.socket, 'sendmsg')
+
 # Security/reliability behaviours.
 #
 NUMBER_OF_DIGITS = (7 * 3) + 2
 GIANT_FRAME = 1048576
+FRAME_DIGITS = b'0123456789,'
 
 #
 #
@@ -366,12 +391,19 @@ BOOK = MapOf(Unicode(),Address())
 #
 #
 class Relay(object):
-	def __init__(self, block: bytearray=None, address_book: dict[str, Address]=None):
+	def __init__(self, block: bytearray=None, address_book: dict[str, Address]=None, binary: bool=False):
 		self.block = block
 		self.address_book = address_book
+		self.binary = binary
 
 bind(Relay)
 
+def utf8(s):
+	return s.encode('utf-8')
+
+def utf8_text(b):
+	return b.decode('utf-8')
+
 # Conversion of messages to on-the-wire blocks, and back again.
 # The default, fully typed, async, bidirectional messaging.
 class MessageStream(object):
@@ -384,53 +416,7 @@ class MessageStream(object):
 		self.size_len = []
 		self.frame_size = 0
 		self.frame_byte = bytearray()
-
-		# Inbound FSM processing of a frame.
-		def s1(c):
-			if c in b'0123456789,':
-				nd = len(self.size_byte)
-				if nd < NUMBER_OF_DIGITS:
-					self.size_byte.append(c)
-					return 1
-				raise OverflowError(f'unlikely frame size with {nd} digits')
-			elif c == 10:	# ord('\n')
-				a = self.size_byte.split(b',')
-				if len(a) != 3:
-					raise ValueError(f'unexpected dimension')
-				for b in a:
-					if not b or not b.isdigit():
-						raise ValueError(f'mangled frame dimensions')
-				s0 = int(a[0])
-				s1 = int(a[1])
-				s2 = int(a[2])
-				self.size_len = [s0, s1, s2]
-				if s0 > s2 or (s0 + s1) > s2:
-					raise ValueError(f'unlikely frame offsets')
-				self.jump_size = s2
-				if self.jump_size > GIANT_FRAME:
-					raise OverflowError(f'oversize frame of {self.jump_size} bytes')
-				elif self.jump_size == 0:
-					return 3
-				return 2
-			raise ValueError(f'frame with unexpected {c} in digits')
-
-		def s2(c):
-			self.frame_byte.append(c)
-			self.jump_size -= 1
-			if self.jump_size == 0:
-				return 3
-			return 2
-
-		def s3(c):
-			if c == 10:
-				return 0
-			raise ValueError(f'unexpected {c} at end-of-frame')
-
-		self.shift = {
-			1: s1,
-			2: s2,
-			3: s3,
-		}
+		self.jump_size = 0
 
 	# Push a message onto the byte stream.
 	def	message_to_block(self, mtr):
@@ -438,7 +424,15 @@ class MessageStream(object):
 		encoded_bytes = self.transport.encoded_bytes
 		tunnel = False
 		key_box = self.transport.key_box
-		codec = self.transport.codec
+		binary = self.transport.binary
+
+		# A relayed body stays in the codec it arrived in,
+		# except where the remote cannot decode it.
+		if isinstance(m, Relay) and m.binary != binary:
+			if m.binary:
+				m = CodecBinary().decode(m.block, Any(), address_book=m.address_book)
+			else:
+				binary = False
 
 		# Types significant to streaming.
 		# Be nice to move DH detection elsewhere.
@@ -457,59 +451,83 @@ class MessageStream(object):
 			public_bytes = self.transport.private_key.public_key.encode()
 			m.public_key = bytearray(public_bytes)
 
-		# Bring the parts together.
-		# 1. Header
-		h = Header(t, r, tunnel)
-		e = codec.encode(h, HEADING)
-		b0 = e.encode('utf-8')
-		n0 = len(b0)
-
-		# 2. Message body - 1 of following 3.
+		# Bring the parts together. The header is last to be
+		# encoded as the body decides the codec of the frame.
+		# 1. Message body - 1 of following 3.
 		if tunnel:
 			# b1 = m.block
 			b1 = m[0]
-			n1 = len(b1)
-			s = codec.encode({}, BOOK)
+			address_book = {}
 		elif isinstance(m, Relay):
 			b1 = m.block
-			n1 = len(b1)
-			s = codec.encode(m.address_book, BOOK)
+			address_book = m.address_book
 		else:
-			address_book = {}
-			e = codec.encode(m, Any(), address_book=address_book)
-			b1 = e.encode('utf-8')
-			n1 = len(b1)
-			s = codec.encode(address_book, BOOK)
+			b1 = None
+			if not binary:
+				try:
+					address_book = {}
+					b1 = utf8(self.transport.codec.encode(m, Any(), address_book=address_book))
+				except CodecRuntimeError:
+					# Materials that JSON cannot carry, e.g. an Incognito
+					# from a binary peer. Every frame declares its own
+					# codec so this one frame goes as binary.
+					binary = True
+			if b1 is None:
+				address_book = {}
+				b1 = self.transport.binary_codec.encode(m, Any(), address_book=address_book)
+		n1 = len(b1)
+
+		if binary:
+			codec = self.transport.binary_codec
+			to_bytes = bytes
+		else:
+			codec = self.transport.codec
+			to_bytes = utf8
+
+		# 2. Header
+		h = Header(t, r, tunnel)
+		b0 = to_bytes(codec.encode(h, HEADING))
+		n0 = len(b0)
 
 		# 3. Mutated addresses.
-		b2 = s.encode('utf-8')
+		b2 = to_bytes(codec.encode(address_book, BOOK))
 
-		# Combine into 1 and optionally encrypt.
-		b0 += b1
-		b0 += b2
+		# Combine into 1 only for encryption. Otherwise
+		# the parts go onto the transport as they are.
 		if key_box:
-			b0 = key_box.encrypt(b0)
-		n3 = len(b0)
+			b0 = key_box.encrypt(b''.join((b0, b1, b2)))
+			n3 = len(b0)
+			part = (b0,)
+		else:
+			n3 = n0 + n1 + len(b2)
+			part = (b0, b1, b2)
 
 		# Put frame on the transport.
-		n = f'{n0},{n1},{n3}'
+		n = f'{n0},{n1},{n3}\n'
 		encoded_bytes += n.encode('ascii')
-		encoded_bytes += b'\n'
-		encoded_bytes += b0
+		for p in part:
+			encoded_bytes += p
 		encoded_bytes += b'\n'
 
 	# Complete zero or more messages, using the given block.
 	def recover_message(self, received, sockets):
 		# Need a loop here because of encryption handshaking.
-		codec = self.transport.codec
 		proxy_address = self.transport.proxy_address
 		diffie_hellman = self.transport.diffie_hellman
 
 		for h, b_, a in self.recover_frame(received):
-			s = h.decode('utf-8')
-			header = codec.decode(s, HEADING)
-			s = a.decode('utf-8')
-			address_book = codec.decode(s, BOOK)
+			# Every frame declares its own codec. A JSON
+			# header always starts with a brace.
+			binary = h[:1] != b'{'
+			if binary:
+				codec = self.transport.binary_codec
+				from_bytes = bytes
+			else:
+				codec = self.transport.codec
+				from_bytes = utf8_text
+
+			header = codec.decode(from_bytes(h), HEADING)
+			address_book = codec.decode(from_bytes(a), BOOK)
 
 			to_address = header.to_address
 			return_address = header.return_address
@@ -519,12 +537,11 @@ class MessageStream(object):
 				body = cast_to(body, bytearray_type)
 
 			elif len(header.to_address) > 1:	# Passing through. Just received and headed back out.
-				body = Relay(b_, address_book)
+				body = Relay(b_, address_book, binary)
 
 			else:
 				# Need to recover the fully-typed message.
-				s = b_.decode('utf-8')
-				body = codec.decode(s, Any(), address_book=address_book)
+				body = codec.decode(from_bytes(b_), Any(), address_book=address_book)
 
 				#for address, path in space:
 				#	poke(body, address, path)
@@ -547,6 +564,15 @@ class MessageStream(object):
 				elif isinstance(body, KeepAlive):
 					sockets.send(OpenKeep(body, return_address), proxy_address)
 					continue
+				elif isinstance(body, OfferBinary):
+					request = self.transport.parent.request
+					if isinstance(self.transport.parent, TcpServer) and request.binary:
+						self.transport.binary = True
+						sockets.send(AcceptBinary(), proxy_address)
+					continue
+				elif isinstance(body, AcceptBinary):
+					self.transport.binary = True
+					continue
 				else:
 					pass	# Normal application messaging.
 
@@ -554,17 +580,36 @@ class MessageStream(object):
 
 	# Pull zero or more frames from the given block.
 	def recover_frame(self, received):
-		key_box = self.transport.key_box
-		for c in received:
-			next = self.shift[self.analysis_state](c)
-			if next:
-				self.analysis_state = next
+		view = memoryview(received)
+		size = len(received)
+		i = 0
+		while i < size:
+			if self.analysis_state == 1:
+				i = self.recover_dimensions(received, i, size)
+				continue
+
+			elif self.analysis_state == 2:
+				# Bulk copy of as much payload as this block holds.
+				n = min(self.jump_size, size - i)
+				at = self.frame_size - self.jump_size
+				self.frame_byte[at:at + n] = view[i:i + n]
+				self.jump_size -= n
+				i += n
+				if self.jump_size == 0:
+					self.analysis_state = 3
 				continue
 
-			# Completed frame.
-			f = bytes(self.frame_byte)
+			c = received[i]
+			i += 1
+			if c != 10:
+				raise ValueError(f'unexpected {c} at end-of-frame')
+
+			# Completed frame. Key may have arrived
+			# with an earlier frame in the same block.
+			f = self.frame_byte
+			key_box = self.transport.key_box
 			if key_box:
-				f = key_box.decrypt(f)
+				f = key_box.decrypt(bytes(f))
 
 			# Breakout parts and yield.
 			n0 = self.size_len[0]
@@ -579,23 +624,118 @@ class MessageStream(object):
 			self.frame_size = 0
 			self.frame_byte = bytearray()
 
+	def recover_dimensions(self, received, i, size):
+		# Scan for the end of the n0,n1,n3 line. Never look
+		# further than the remaining allowance of digits.
+		nd = len(self.size_byte)
+		limit = min(size, i + NUMBER_OF_DIGITS - nd + 1)
+		e = received.find(b'\n', i, limit)
+		digits = received[i:limit] if e < 0 else received[i:e]
+		if digits.translate(None, FRAME_DIGITS):
+			raise ValueError(f'frame with unexpected {digits} in digits')
+		nd += len(digits)
+		if nd > NUMBER_OF_DIGITS:
+			raise OverflowError(f'unlikely frame size with {nd} digits')
+		self.size_byte += digits
+		if e < 0:
+			return limit
+
+		a = self.size_byte.split(b',')
+		if len(a) != 3:
+			raise ValueError(f'unexpected dimension')
+		for b in a:
+			if not b or not b.isdigit():
+				raise ValueError(f'mangled frame dimensions')
+		s0 = int(a[0])
+		s1 = int(a[1])
+		s2 = int(a[2])
+		self.size_len = [s0, s1, s2]
+		if s0 > s2 or (s0 + s1) > s2:
+			raise ValueError(f'unlikely frame offsets')
+		if s2 > GIANT_FRAME:
+			raise OverflowError(f'oversize frame of {s2} bytes')
+
+		# Frame space allocated once, filled by slices.
+		self.frame_size = s2
+		self.frame_byte = bytearray(s2)
+		self.jump_size = s2
+		self.analysis_state = 3 if s2 == 0 else 2
+		return e + 1
+
+# Outbound bytes for a transport. Blocks are held as they were
+# appended and sent from an offset, i.e. never copied or re-sliced
+# into a new buffer after encoding.
+class OutboundBytes(object):
+	def __init__(self):
+		self.block = deque()
+		self.offset = 0		# Already sent from block[0].
+		self.size = 0
+
+	def __iadd__(self, b):
+		if b:
+			self.block.append(b)
+			self.size += len(b)
+		return self
+
+	def __len__(self):
+		return self.size
+
+	def send(self, s, limit):
+		# Gather views onto the leading blocks, up to limit.
+		vector = []
+		n = 0
+		for b in self.block:
+			if n >= limit or len(vector) >= SEND_VECTOR:
+				break
+			v = memoryview(b)
+			if not vector and self.offset:
+				v = v[self.offset:]
+			if n + len(v) > limit:
+				v = v[:limit - n]
+			vector.append(v)
+			n += len(v)
+
+		if not vector:
+			return 0
+		if SEND_MSG:
+			sent = s.sendmsg(vector)
+		else:
+			sent = s.send(vector[0])
+		vector = None
+		self.consume(sent)
+		return sent
+
+	def consume(self, n):
+		self.size -= n
+		n += self.offset
+		while self.block:
+			b = len(self.block[0])
+			if n < b:
+				break
+			self.block.popleft()
+			n -= b
+		self.offset = n
+
 # Generic section of all network messaging.
 class TcpTransport(object):
 	def __init__(self, messaging_type, parent, controller_address, opened):
-		self.messaging = messaging_type(self)
 		self.parent = parent
+		self.messaging = messaging_type(self)
 		self.controller_address = controller_address
 		self.return_proxy = None
 		self.local_termination = None
 		self.proxy_address = None
 
 		self.codec = None
+		self.binary_codec = None
+		self.binary = False			# Outbound frames in the binary codec.
 
 		self.pending = []			# Messages not yet in the loop.
 		self.lock = threading.RLock()		# Safe sharing and empty detection.
 		self.messages_to_encode = deque()
 
-		self.encoded_bytes = bytearray()
+		self.encoded_bytes = OutboundBytes()
+		self.send_size = parent.request.send_size or TCP_SEND
 
 		self.diffie_hellman = None
 		self.private_key = None
@@ -604,12 +744,16 @@ class TcpTransport(object):
 		self.opened = opened
 		self.closing = None
 
+		self.receiving = True		# Cleared by messaging to hold input.
+		self.resumed = False		# Set by messaging to release held input.
+
 	def set_routing(self, return_proxy, local_termination, proxy_address):
 		# Define addresses for message forwarding.
 		# return_proxy ........ address that response should go back to.
 		# local_termination ... address of default target, actor or session.
 		# proxy_address ...... source address of connection updates, session or proxy.
 		self.codec = CodecJson(return_proxy=return_proxy, local_termination=local_termination)
+		self.binary_codec = CodecBinary(return_proxy=return_proxy, local_termination=local_termination)
 		self.return_proxy = return_proxy
 		self.local_termination = local_termination
 		self.proxy_address = proxy_address
@@ -641,17 +785,14 @@ class TcpTransport(object):
 		t = self.queue_to_block()
 		if t == 0:
 			return False
-		n = t if t <= TCP_SEND else TCP_SEND
-		chunk = self.encoded_bytes[:n]
-		n = s.send(chunk)
+		n = self.encoded_bytes.send(s, self.send_size)
 		if n:
-			self.encoded_bytes = self.encoded_bytes[n:]
 			return True
 		return False
 
 	def queue_to_block(self):
 		encoded_bytes = self.encoded_bytes
-		while len(encoded_bytes) < TCP_SEND:
+		while len(encoded_bytes) < self.send_size:
 			if len(self.messages_to_encode) == 0:
 				added = self.drain(self.messages_to_encode)
 				if added == 0:
@@ -871,6 +1012,17 @@ class Hellman(object):
 bind(Diffie, copy_before_sending=False)
 bind(Hellman, copy_before_sending=False)
 
+# Negotiation of the binary codec. Offered by the
+# connecting end and accepted, or ignored, by the
+# listening end. Only offered where the application
+# asks for it, i.e. connect(..., binary=True), as an
+# older remote sees the offer as an Incognito.
+class OfferBinary(object): pass
+class AcceptBinary(object): pass
+
+bind(OfferBinary, copy_before_sending=False, execution_trace=False, message_trail=False)
+bind(AcceptBinary, copy_before_sending=False, execution_trace=False, message_trail=False)
+
 
 
 # Signals from the network represented
@@ -966,8 +1118,7 @@ def ControlChannel_ListenForStream(self, control, mr):
 	listening = Listening(m, listening_ipp=listening_ipp, controller_address=r)
 
 	self.networking[server] = TcpServer(server, m, listening, r, named_type, search_subs)
-	self.receiving.append(server)
-	self.faulting.append(server)
+	self.engine.register(server)
 
 	self.lid[m.lid] = server
 
@@ -998,10 +1149,13 @@ def open_stream(self, parent, s, opened):
 		ending = close_ending(proxy_address)
 		session_address = self.create(ApiClientSession,
 			controller_address=controller_address, proxy_address=proxy_address,
+			pipelining=parent.request.pipelining,
 			object_ending=ending)
 		transport.set_routing(proxy_address, session_address, session_address)
 	else:
 		transport.set_routing(proxy_address, controller_address, proxy_address)
+		if isinstance(parent, TcpClient) and parent.request.binary:
+			self.send(OfferBinary(), proxy_address)
 
 	self.networking[s] = transport
 	return transport, proxy_address
@@ -1043,9 +1197,7 @@ def ControlChannel_ConnectStream(self, control, mr):
 			pending = TcpClient(client, m, None, r)
 
 			self.networking[client] = pending
-			self.receiving.append(client)
-			self.sending.append(client)
-			self.faulting.append(client)
+			self.engine.register(client, sending=True)
 			return
 
 	except (socket.herror, socket.gaierror, socket.error) as e:
@@ -1065,9 +1217,7 @@ def ControlChannel_ConnectStream(self, control, mr):
 	connected.proxy_address = proxy_address
 
 	self.networking[client] = transport
-	self.receiving.append(client)
-	self.sending.append(client)
-	self.faulting.append(client)
+	self.engine.register(client, sending=True)
 
 	if m.encrypted:
 		self.trace(f'Connected (encrypted) to "{requested_ipp}", at local address "{opened_ipp}"')
@@ -1126,12 +1276,7 @@ def ControlChannel_Bump(self, control, mr):
 		# by the remote and the notification to the proxy arrives behind
 		# the bump.
 		return
-	try:
-		self.sending.index(m.s)
-		return
-	except ValueError:
-		pass
-	self.sending.append(m.s)
+	self.engine.interest(m.s, sending=True)
 
 def ControlChannel_Shutdown(self, control, mr):
 	m, r = mr
@@ -1176,9 +1321,7 @@ def TcpServer_ReceiveBlock(self, server, s):
 		return
 		
 	transport, proxy_address = open_stream(self, server, accepted, None)
-	self.receiving.append(accepted)
-	self.sending.append(accepted)
-	self.faulting.append(accepted)
+	self.engine.register(accepted, sending=True)
 
 	opened_ipp = HostPort(hap[0], hap[1])
 
@@ -1315,21 +1458,38 @@ def clear_out_session(self, transport, s, reason=None, note=None, error_code=Non
 	self.forward(c, transport.controller_address, transport.proxy_address)
 	self.clear_out(s, TcpTransport)
 
+# Hold or release input according to the messaging, e.g. a
+# window of streamed HTTP chunks. Held input is not read from
+# the socket. On release, complete any buffered messages.
+def flow_control(self, transport, s):
+	if transport.resumed:
+		transport.resumed = False
+		self.engine.resume(s)
+		try:
+			transport.receive_a_message(b'', self)
+		except (CodecError, OverflowError, ValueError) as e:
+			self.warning(f'Cannot receive_a_message ({e})')
+			c = Close(message=None, reason=EndOfTransport.INBOUND_STREAMING, note=str(e))
+			close_by_socket(transport, c, s)
+			return
+	if not transport.receiving:
+		self.engine.pause(s)
+
 def TcpTransport_ReadyToSend(self, transport, s):
 	try:
-		if transport.send_a_block(s):
-			return
+		sent = transport.send_a_block(s)
 	except (CodecError, OverflowError, ValueError) as e:
 		self.warning(f'cannot send_a_block ({e})')
 		c = Close(message=None, reason=EndOfTransport.OUTBOUND_STREAMING, note=str(e))
 		close_by_socket(transport, c, s)
 		return
 
+	flow_control(self, transport, s)
+	if sent:
+		return
+
 	# Had nothing to send.
-	try:
-		self.sending.remove(s)
-	except ValueError:
-		pass
+	self.engine.interest(s, sending=False)
 
 # A network transport for the purpose of exchanging
 # messages between machines.
@@ -1347,6 +1507,8 @@ def TcpTransport_ReceiveBlock(self, transport, s):
 			self.warning(f'Cannot receive_a_message ({e})')
 			c = Close(message=None, reason=EndOfTransport.INBOUND_STREAMING, note=str(e))
 			close_by_socket(transport, c, s)
+			return
+		flow_control(self, transport, s)
 		return
 
 	except socket.error as e:
@@ -1416,6 +1578,155 @@ class SocketChannel(object):
 # need it to inject messages into loop.
 bind(SocketChannel, not_portable=True, copy_before_sending=False)
 
+# Readiness engines. Each holds the sockets known to ListenConnect
+# along with their interest in sending, and produces the same
+# readable, writable and faulted lists for dispatch through the
+# SELECT_TABLE.
+class SelectEngine(object):
+	"""Readiness by select.select(), rebuilt on every pass. Portable."""
+	def __init__(self):
+		self.receiving = []
+		self.sending = []
+		self.faulting = []
+		self.paused = set()
+
+	def register(self, s, sending=False):
+		self.receiving.append(s)
+		self.faulting.append(s)
+		if sending:
+			self.sending.append(s)
+
+	def pause(self, s):
+		if s in self.paused:
+			return
+		try:
+			self.receiving.remove(s)
+		except ValueError:
+			return
+		self.paused.add(s)
+
+	def resume(self, s):
+		if s not in self.paused:
+			return
+		self.paused.discard(s)
+		self.receiving.append(s)
+
+	def interest(self, s, sending=False):
+		try:
+			i = self.sending.index(s)
+		except ValueError:
+			i = None
+		if sending and i is None:
+			self.sending.append(s)
+		elif not sending and i is not None:
+			del self.sending[i]
+
+	def unregister(self, s):
+		self.paused.discard(s)
+		for a in (self.receiving, self.sending, self.faulting):
+			try:
+				a.remove(s)
+			except ValueError:
+				pass
+
+	def wait(self):
+		return select.select(self.receiving, self.sending, self.faulting)
+
+	def close(self):
+		pass
+
+class SelectorsEngine(object):
+	"""Readiness by the best available selector, e.g. epoll or kqueue.
+
+	Interest is registered once per socket and modified only when
+	the wish to send changes. Errors are reported by the selector as
+	readable and writable, so there is never a faulted list. A paused
+	socket with no wish to send has no events and is held aside as
+	dormant, until there is interest again.
+	"""
+	def __init__(self):
+		self.selector = selectors.DefaultSelector()
+		self.paused = set()
+		self.dormant = set()
+
+	def register(self, s, sending=False):
+		events = selectors.EVENT_READ
+		if sending:
+			events |= selectors.EVENT_WRITE
+		self.selector.register(s, events)
+
+	def update(self, s, receiving, sending):
+		events = selectors.EVENT_READ if receiving else 0
+		if sending:
+			events |= selectors.EVENT_WRITE
+		if s in self.dormant:
+			if events:
+				self.dormant.discard(s)
+				self.selector.register(s, events)
+			return
+		try:
+			key = self.selector.get_key(s)
+		except (KeyError, ValueError):
+			return
+		if events == 0:
+			self.selector.unregister(s)
+			self.dormant.add(s)
+		elif key.events != events:
+			self.selector.modify(s, events)
+
+	def sending(self, s):
+		if s in self.dormant:
+			return False
+		try:
+			key = self.selector.get_key(s)
+		except (KeyError, ValueError):
+			return False
+		return bool(key.events & selectors.EVENT_WRITE)
+
+	def interest(self, s, sending=False):
+		self.update(s, s not in self.paused, sending)
+
+	def pause(self, s):
+		if s in self.paused:
+			return
+		self.paused.add(s)
+		self.update(s, False, self.sending(s))
+
+	def resume(self, s):
+		if s not in self.paused:
+			return
+		self.paused.discard(s)
+		self.update(s, True, self.sending(s))
+
+	def unregister(self, s):
+		self.paused.discard(s)
+		if s in self.dormant:
+			self.dormant.discard(s)
+			return
+		try:
+			self.selector.unregister(s)
+		except (KeyError, ValueError):
+			pass
+
+	def wait(self):
+		R, S = [], []
+		for key, events in self.selector.select():
+			if events & selectors.EVENT_READ:
+				R.append(key.fileobj)
+			if events & selectors.EVENT_WRITE:
+				S.append(key.fileobj)
+		return R, S, []
+
+	def close(self):
+		self.selector.close()
+
+# Windows reports a failed connect in the exceptional
+# list only. Stay with the engine that sees it.
+if PLATFORM_SYSTEM == 'Windows':
+	SOCKETS_ENGINE = SelectEngine
+else:
+	SOCKETS_ENGINE = SelectorsEngine
+
 #
 SELECT_TABLE = {
 	# Handling of inbound control messages.
@@ -1461,10 +1772,9 @@ class ListenConnect(Threaded, Stateless):
 			self.accepted: ControlChannel(self.accepted),	# Receives 1-byte BUMPs.
 		}
 
-		# Active socket lists for select.
-		self.receiving = [self.accepted]
-		self.sending = []
-		self.faulting = self.receiving + self.sending
+		# Active sockets and their interest in readiness.
+		self.engine = SOCKETS_ENGINE()
+		self.engine.register(self.accepted)
 
 		self.lid = {}
 
@@ -1493,18 +1803,7 @@ class ListenConnect(Threaded, Stateless):
 			del self.lid[f]
 
 		del self.networking[s]
-		try:
-			self.receiving.remove(s)
-		except ValueError:
-			pass
-		try:
-			self.sending.remove(s)
-		except ValueError:
-			pass
-		try:
-			self.faulting.remove(s)
-		except ValueError:
-			pass
+		self.engine.unregister(s)
 		s.close()
 		return t
 
@@ -1514,7 +1813,7 @@ def ListenConnect_Start(self, message):
 	self.send(self.channel, self.parent_address)
 
 	while self.running or len(self.networking) > 1:
-		R, S, F = select.select(self.receiving, self.sending, self.faulting)
+		R, S, F = self.engine.wait()
 
 		for r in R:
 			try:
@@ -1549,6 +1848,7 @@ def ListenConnect_Start(self, message):
 				continue
 			j(self, a, f)
 
+	self.engine.close()
 	control_close(self.lac)
 	self.complete(Ack())
 
@@ -1568,7 +1868,8 @@ AddOn(create_sockets, stop_sockets)
 
 # Interface to the engine.
 def listen(self: Point, requested_ipp: HostPort, encrypted: bool=False,
-			http_server: list[Type]=None, uri_form: ReForm=None, default_to_request: bool=True):
+			http_server: list[Type]=None, uri_form: ReForm=None, default_to_request: bool=True,
+			send_size: int=None, binary: bool=False, stream_body: bool=False):
 	"""
 	Establishes a network presence at the specified IP
 	address and port number. Returns UUID.
@@ -1578,16 +1879,21 @@ def listen(self: Point, requested_ipp: HostPort, encrypted: bool=False,
 	:param encrypted: enable encryption
 	:param http_server: enable HTTP with list of expected requests
 	:param default_to_request: enable default conversion into HttpRequests
+	:param send_size: maximum bytes per send, defaults to TCP_SEND
+	:param binary: accept offers of the binary codec
+	:param stream_body: deliver large and chunked HTTP bodies as :class:`~.HttpChunk` messages
 	:rtype: UUID
 	"""
 	lid = uuid.uuid4()
 	ls = ListenForStream(lid=lid, requested_ipp=requested_ipp, encrypted=encrypted,
-		http_server=http_server, uri_form=uri_form, default_to_request=default_to_request)
+		http_server=http_server, uri_form=uri_form, default_to_request=default_to_request,
+		send_size=send_size, binary=binary, stream_body=stream_body)
 	TS.channel.send(ls, self.object_address)
 	return lid
 
 def connect(self: Point, requested_ipp: HostPort, encrypted: bool=False, keep_alive: bool=False,
-			http_client: str=None, layer_cake_json: bool=False):
+			http_client: str=None, layer_cake_json: bool=False, send_size: int=None, binary: bool=False,
+			pipelining: int=1, stream_body: bool=False):
 	"""
 	Initiates a network connection to the specified IP
 	address and port number.
@@ -1598,8 +1904,18 @@ def connect(self: Point, requested_ipp: HostPort, encrypted: bool=False, keep_al
 	:param keep_alive: enable keep-alives
 	:param http_client: leading part of the outgoing request URI
 	:param layer_cake_json: is the remote server a layer-cake server
+	:param send_size: maximum bytes per send, defaults to TCP_SEND
+	:param binary: offer the binary codec, falling back to JSON
+	:param pipelining: maximum HTTP requests awaiting a response
+	:param stream_body: deliver chunked HTTP bodies as :class:`~.HttpChunk` messages
+
+	The binary offer is a message of its own, sent as the transport opens. A
+	remote built without the binary codec receives it as an :class:`~.Incognito`,
+	so ``binary`` is for peers known to be running this version.
 	"""
-	cs = ConnectStream(requested_ipp=requested_ipp, encrypted=encrypted, keep_alive=keep_alive, http_client=http_client, layer_cake_json=layer_cake_json)
+	cs = ConnectStream(requested_ipp=requested_ipp, encrypted=encrypted, keep_alive=keep_alive, http_client=http_client,
+		layer_cake_json=layer_cake_json, send_size=send_size, binary=binary, pipelining=pipelining,
+		stream_body=stream_body)
 	TS.channel.send(cs, self.object_address)
 
 def stop_listening(self: Point, lid: UUID):
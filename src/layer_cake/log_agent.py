@@ -25,7 +25,11 @@
 """
 __docformat__ = 'restructuredtext'
 
+from time import time
+from enum import Enum
+
 from .virtual_point import *
+from .message_pump import *
 from .virtual_runtime import *
 from .point_runtime import *
 from .point_machine import *
@@ -33,12 +37,78 @@ from .bind_type import *
 
 __all__ = [
 	'PEAK_BEFORE_BLOCKING',
+	'LogOverflow',
 	'LogAgent',
 ]
 
 #
 #
 PEAK_BEFORE_BLOCKING = 1024 * 64
+DROP_REPORT = 10.0						# Seconds between reports of dropped logs.
+CHATTY_TAG = set(t for t in USER_TAG if tag_to_log(t).value <= USER_LOG.OBJECT.value)	# First to go.
+
+class LogOverflow(Enum):
+	"""
+	Enumeration of the behaviours when logs arrive faster than they can be written.
+
+	* BLOCK - the logging thread waits for space
+	* DROP_OLDEST - the oldest pending log is discarded
+	* DROP_DEBUG - object, trace and debug logs are refused early, then the oldest is discarded
+	"""
+	BLOCK = 0
+	DROP_OLDEST = 1
+	DROP_DEBUG = 2
+
+class LogMailbox(Mailbox):
+	"""A mailbox that discards logs rather than blocking, according to policy.
+
+	Messages other than logs, e.g. Stop, are always accepted. A count
+	of discarded logs is kept by tag.
+
+	:param maxsize: number of messages to hold
+	:type maxsize: int
+	:param overflow: what to do when full
+	:type overflow: LogOverflow
+	"""
+	def __init__(self, maxsize=PEAK_BEFORE_BLOCKING, overflow=LogOverflow.BLOCK):
+		Mailbox.__init__(self, maxsize=maxsize)
+		self.overflow = overflow
+		self.reserve = maxsize * 3 // 4		# Kept for the more significant logs.
+		self.dropped = {}
+
+	def drop(self, log):
+		self.dropped[log.tag] = self.dropped.get(log.tag, 0) + 1
+
+	def put(self, mtr, block=True):
+		"""Append the triplet, or discard a log. Raise Full when over the limit in blocking mode and not blocking."""
+		if self.overflow == LogOverflow.BLOCK or self.maxsize < 1:
+			Mailbox.put(self, mtr, block)
+			return
+
+		m = mtr[0]
+		with self.lock:
+			incoming = self.incoming
+			if isinstance(m, PointLog):
+				level = len(incoming) + len(self.batch)
+				if self.overflow == LogOverflow.DROP_DEBUG and level >= self.reserve:
+					if m.tag in CHATTY_TAG:
+						self.drop(m)
+						return
+				if level >= self.maxsize:
+					if incoming and isinstance(incoming[0][0], PointLog):
+						self.drop(incoming.popleft()[0])
+					else:
+						self.drop(m)
+						return
+			incoming.append(mtr)
+			if len(incoming) == 1:
+				self.arrived.notify()
+
+	def take_dropped(self):
+		"""Collect the counts of discarded logs and start afresh. Return a dict."""
+		with self.lock:
+			dropped, self.dropped = self.dropped, {}
+		return dropped
 
 class LogAgent(Threaded, Stateless):
 	"""
@@ -58,7 +128,10 @@ class LogAgent(Threaded, Stateless):
 	A part of delivering on those promises is the custom initialization
 	of the underlying Queue object. It is set to blocking of upstream
 	sources and the size of the Queue is set to a generous, custom
-	value.
+	value. An overflow policy other than ``BLOCK`` replaces the blocking
+	with the discarding of logs, so that a slow disk cannot stall the
+	threads that are logging. The number of discarded logs is reported
+	as a warning, at most every ``DROP_REPORT`` seconds and at the end.
 
 	Note the complete disabling of all logging for ``LogAgent``. It
 	doesnt make much sense for the logger to log to itself and
@@ -67,12 +140,42 @@ class LogAgent(Threaded, Stateless):
 	send would fail - at best.
 	"""
 
-	def __init__(self, method):
+	def __init__(self, method, overflow=LogOverflow.BLOCK):
 		Threaded.__init__(self, blocking=True, maximum_size=PEAK_BEFORE_BLOCKING)
 		Stateless.__init__(self)
+		self.message_queue = LogMailbox(maxsize=PEAK_BEFORE_BLOCKING, overflow=overflow)
+		self.reported = time()
 		self.method = method
+		self.flush = getattr(method, 'flush', None)
 		self.tap = []
 
+	def flush_method(self):
+		# Give a buffering method the chance to
+		# write out pending lines.
+		if self.flush is None:
+			return
+		try:
+			self.flush()
+		except Exception as e:
+			s = str(e)
+
+	def report_dropped(self):
+		# Log the number of logs that did not
+		# make it, by tag.
+		self.reported = time()
+		dropped = self.message_queue.take_dropped()
+		if not dropped:
+			return
+		total = sum(dropped.values())
+		detail = ', '.join(f'{t.value} {n}' for t, n in dropped.items())
+		log = PointLog(stamp=self.reported, tag=USER_TAG.WARNING,
+			address=self.object_address, name=self.__art__.name,
+			text=f'Dropped {total} logs ({detail})')
+		try:
+			self.method(log)
+		except Exception as e:
+			s = str(e)
+
 def LogAgent_Start(self, message):
 	pass
 
@@ -82,6 +185,10 @@ def LogAgent_PointLog(self, message):
 	except Exception as e:
 		s = str(e)
 		return
+	if self.message_queue.dropped and message.stamp - self.reported >= DROP_REPORT:
+		self.report_dropped()
+	if self.message_queue.empty():
+		self.flush_method()
 
 def LogAgent_RedirectLog(self, message):
 	redirect = message.redirect
@@ -89,7 +196,9 @@ def LogAgent_RedirectLog(self, message):
 		redirect.from_previous(self.method)
 	except AttributeError:
 		pass
+	self.flush_method()
 	self.method = redirect
+	self.flush = getattr(redirect, 'flush', None)
 
 def LogAgent_OpenTap(self, message):
 	self.tap.append(self.return_address)
@@ -108,6 +217,8 @@ def LogAgent_Enquiry(self, message):
 	self.reply(Ack())
 
 def LogAgent_Stop(self, message):
+	self.report_dropped()
+	self.flush_method()
 	self.complete()
 
 def LogAgent_int(self, message):
@@ -120,6 +231,8 @@ def LogAgent_dict_str_int(self, message):
 	self.complete()
 
 def LogAgent_Stop(self, message):
+	self.report_dropped()
+	self.flush_method()
 	self.complete()
 
 LOG_AGENT_DISPATCH = (Start,
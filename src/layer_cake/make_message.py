@@ -206,7 +206,7 @@ def fake(t):
 		schema = element.__art__.schema
 		d = element()
 		for k, v in schema.items():
-			setattr(d, k, fake(v))
+			object.__setattr__(d, k, fake(v))
 		return d
 	elif isinstance(t, PointerTo):
 		return fake(t.element)
@@ -45,6 +45,7 @@ logging.
 .. autofunction:: default_none
 
 .. autofunction:: bind_message
+.. autofunction:: copy_message
 
 .. autofunction:: is_message
 .. autofunction:: is_message_class
@@ -54,7 +55,10 @@ logging.
 __docformat__ = 'restructuredtext'
 
 import typing
+import functools
 import uuid
+from copy import deepcopy
+from collections import deque
 from datetime import MINYEAR, datetime, timedelta
 from enum import Enum
 from .virtual_memory import *
@@ -66,6 +70,7 @@ from .virtual_runtime import *
 __all__ = [
 	'MessageError',
 	'MessageRegistrationError',
+	'MessageImmutableError',
 	'TypeTrack',
 	'correct_track',
 
@@ -109,6 +114,7 @@ __all__ = [
 	'compile_schema',
 
 	'bind_message',
+	'copy_message',
 	'equal_to',
 ]
 
@@ -135,6 +141,23 @@ class MessageRegistrationError(MessageError):
 			return f'cannot register "{self.name}" ({self.reason})'
 		return f'registration failed ({self.reason})'
 
+class MessageImmutableError(MessageError, AttributeError):
+	"""An attempt to change a message registered as immutable.
+
+	:param name: the name of the class
+	:param member: the name of the member
+	"""
+
+	def __init__(self, name: str, member: str):
+		"""Refer to class."""
+		self.name = name
+		self.member = member
+		super().__init__(member)
+
+	def __str__(self):
+		"""Compose a readable diagnostic."""
+		return f'cannot change "{self.name}.{self.member}" (immutable)'
+
 # Holds nested names that would be helpful in the event
 # of an error.
 class TypeTrack(Exception):
@@ -499,16 +522,73 @@ def compile_schema(message, explicit_schema):
 			r[k] = t
 	return r
 
+# Immutable messages. Assignments are refused once the
+# constructor has completed. The library assigns members
+# of new instances (e.g. decoding) with object.__setattr__.
+FROZEN = '__frozen__'
+
+def freeze_constructor(cls):
+	"""Wrap the constructor of the given class, freezing instances of exactly that class."""
+	init = cls.__init__
+
+	# Instances of a subclass are frozen by the
+	# wrapper of the subclass, i.e. after all the
+	# constructors have run.
+	def __init__(self, *args, **kw):
+		init(self, *args, **kw)
+		if type(self) is cls:
+			object.__setattr__(self, FROZEN, True)
+
+	functools.update_wrapper(__init__, init)
+	cls.__init__ = __init__
+
+def freeze_message(message):
+	"""Wrap the constructor and assignment of the given class, for immutability."""
+	def __setattr__(self, name, value):
+		if self.__dict__.get(FROZEN, False):
+			raise MessageImmutableError(type(self).__name__, name)
+		object.__setattr__(self, name, value)
+
+	def __delattr__(self, name):
+		if self.__dict__.get(FROZEN, False):
+			raise MessageImmutableError(type(self).__name__, name)
+		object.__delattr__(self, name)
+
+	# Subclasses share the runtime, i.e. are also
+	# passed without copying. Freeze them too.
+	original = message.__dict__.get('__init_subclass__', None)
+
+	def __init_subclass__(cls, **kw):
+		if original is not None:
+			original.__func__(cls, **kw)
+		else:
+			super(message, cls).__init_subclass__(**kw)
+		freeze_constructor(cls)
+
+	def existing(cls):
+		for s in cls.__subclasses__():
+			freeze_constructor(s)
+			existing(s)
+
+	freeze_constructor(message)
+	existing(message)
+	message.__setattr__ = __setattr__
+	message.__delattr__ = __delattr__
+	message.__init_subclass__ = classmethod(__init_subclass__)
+
 #
 def bind_message(message,
 		message_trail: bool=True, execution_trace: bool=True,
 		copy_before_sending: bool=True, not_portable: bool=False,
+		immutable: bool=False,
 		**object_schema):
 	"""
 	Set the type information and runtime controls for the given message type.
 
 	Values assigned in this function affect the behaviour for all instances of
-	the given type.
+	the given type. Instances of an immutable message cannot be changed after
+	construction and are passed to receivers without copying. Members are
+	shared rather than frozen, i.e. containers should be treated as read-only.
 
 	:param message: class to be registered as a message
 	:type message: :ref:`message<lc-message>`
@@ -516,21 +596,154 @@ def bind_message(message,
 	:param execution_trace: enable log when message is received
 	:param copy_before_sending: enable copying of message before each send
 	:param not_portable: disable serialization/transfer, e.g. of a file handle
+	:param immutable: refuse changes after construction and share on send
 	:param object_schema: explicit type declarations by name
 	:rtype: None
 	"""
 	rt = Runtime(message.__name__, message.__module__,
 		message_trail=message_trail,
 		execution_trace=execution_trace,
-		copy_before_sending=copy_before_sending,
-		not_portable=not_portable)
+		copy_before_sending=copy_before_sending and not immutable,
+		not_portable=not_portable,
+		immutable=immutable)
 
 	setattr(message, '__art__', rt)
 	if not not_portable:
 		rt.schema = compile_schema(message, object_schema)
-	
+	if immutable and not getattr(message.__init__, '__frozen__', False):
+		freeze_message(message)
+		message.__init__.__frozen__ = True
+
 	install_portable(UserDefined(message))
 
+# Copying of messages before sending. Functions are generated
+# from the schema, replacing the generic deepcopy. Types that
+# may involve shared or circular references (pointers, words
+# and any) are still passed to deepcopy.
+NOT_PLAIN = (PointerTo, Word, Any)
+
+def is_plain(t, bread):
+	"""Is type `t` free of pointers, words and nested Any."""
+	if isinstance(t, NOT_PLAIN):
+		return False
+	if isinstance(t, (VectorOf, ArrayOf, SetOf, DequeOf)):
+		return is_plain(t.element, bread)
+	if isinstance(t, MapOf):
+		return is_plain(t.key, bread) and is_plain(t.value, bread)
+	if isinstance(t, UserDefined):
+		message = t.element
+		if message in bread:
+			return True
+		bread.add(message)
+		schema = message.__art__.schema
+		if schema is None:
+			return False
+		return all(is_plain(v, bread) for v in schema.values())
+	return True
+
+def compile_copy(t):
+	"""Generate a function that copies a value of type `t`, or None where no copy is needed."""
+	if isinstance(t, Block):
+		def copy(p):
+			if p.__class__ is not bytearray:
+				return deepcopy(p)
+			return bytearray(p)
+
+	elif isinstance(t, (VectorOf, ArrayOf, DequeOf, SetOf)):
+		b = t.__class__
+		if b is DequeOf:
+			expected = deque
+		elif b is SetOf:
+			expected = set
+		else:
+			expected = list
+		e = compile_copy(t.element)
+		if e is None:
+			def copy(p):
+				if p.__class__ is not expected:
+					return deepcopy(p)
+				return expected(p)
+		else:
+			def copy(p):
+				if p.__class__ is not expected:
+					return deepcopy(p)
+				return expected(None if y is None else e(y) for y in p)
+
+	elif isinstance(t, MapOf):
+		v = compile_copy(t.value)
+		if v is None:
+			def copy(p):
+				if p.__class__ is not dict:
+					return deepcopy(p)
+				return dict(p)
+		else:
+			def copy(p):
+				if p.__class__ is not dict:
+					return deepcopy(p)
+				return {k: None if y is None else v(y) for k, y in p.items()}
+
+	elif isinstance(t, UserDefined):
+		def copy(p):
+			if not is_message(p):
+				return deepcopy(p)
+			return copy_message(p)
+
+	else:
+		return None		# Immutable python values.
+	return copy
+
+def compile_message_copy(message):
+	"""Generate a function that copies an instance of the registered class."""
+	rt = message.__art__
+	if rt.immutable:
+		def copy(p):
+			return p
+		return copy
+
+	if rt.schema is None or not is_plain(UserDefined(message), set()):
+		return deepcopy
+
+	member = []
+	for k, t in rt.schema.items():
+		f = compile_copy(t)
+		if f is not None:
+			member.append((k, f))
+	named = set(rt.schema.keys())
+
+	def copy(p):
+		d = getattr(p, '__dict__', None)
+		if d is None:
+			return deepcopy(p)
+		c = p.__class__.__new__(p.__class__)
+		d = d.copy()
+		for k, f in member:
+			v = d.get(k, None)
+			if v is not None:
+				d[k] = f(v)
+		# Nothing is known about members outside the
+		# schema, e.g. added by a subclass.
+		for k in d.keys() - named:
+			d[k] = deepcopy(d[k])
+		c.__dict__.update(d)
+		return c
+	return copy
+
+def copy_message(m):
+	"""Produce an independent copy of a registered message, ready for sending.
+
+	Immutable messages are returned as they are.
+
+	:param m: an instance of a registered class
+	:type m: :ref:`message<lc-message>`
+	:return: a copy of m, or m
+	"""
+	rt = m.__art__
+	f = rt.copy
+	if f is None:
+		f = compile_message_copy(m.__class__)
+		rt.copy = f
+	return f(m)
+
 # This should not need be needed (Incognito) as they are never
 # on-the-wire. But registration needed for dispatching within
 # encode/decode process.
@@ -28,7 +28,8 @@ synchronous channels, and the 2 different machine types.
 """
 __docformat__ = 'restructuredtext'
 
-from queue import Queue, Full, Empty
+import threading
+from queue import Full, Empty
 from collections import deque
 
 from .virtual_memory import *
@@ -38,12 +39,78 @@ from .point_runtime import *
 
 __all__ = [
 	'PEAK_BEFORE_DROPPED',
+	'Mailbox',
 	'Pump',
 ]
 
 PEAK_BEFORE_DROPPED = 16384
 GRACE_PERIOD = 5
 
+# Replacement for the system queue. Senders append to one deque
+# and the receiver swaps it out for a private deque, taking the lock
+# once per batch rather than once per message.
+class Mailbox(object):
+	"""Batched, thread-safe buffering of [message, to, return] triplets.
+
+	Any number of threads may put. A single thread gets, i.e. the
+	thread assigned to the owning object. Pending triplets include those
+	drained but not yet taken, for the purposes of the maximum size.
+
+	:param maxsize: number of messages to hold, or 0 for no limit
+	:type maxsize: int
+	"""
+	def __init__(self, maxsize=PEAK_BEFORE_DROPPED):
+		self.maxsize = maxsize
+		self.lock = threading.Lock()
+		self.arrived = threading.Condition(self.lock)
+		self.drained = threading.Condition(self.lock)
+		self.incoming = deque()		# Appended by senders.
+		self.batch = deque()		# Popped by the receiver.
+
+	def put(self, mtr, block=True):
+		"""Append the triplet. Raise Full when over the limit and not blocking."""
+		with self.lock:
+			incoming = self.incoming
+			if self.maxsize > 0:
+				while len(incoming) + len(self.batch) >= self.maxsize:
+					if not block:
+						raise Full
+					self.drained.wait()
+					incoming = self.incoming
+			incoming.append(mtr)
+			if len(incoming) == 1:
+				self.arrived.notify()
+
+	def get(self):
+		"""Return the next triplet, draining all arrivals when the batch is empty."""
+		batch = self.batch
+		if not batch:
+			with self.lock:
+				self.drained.notify_all()
+				while not self.incoming:
+					self.arrived.wait()
+				self.batch, self.incoming = self.incoming, batch
+				batch = self.batch
+		return batch.popleft()
+
+	def get_nowait(self):
+		"""Return the next triplet. Raise Empty when there are none."""
+		if not self.batch:
+			with self.lock:
+				if not self.incoming:
+					raise Empty
+		return self.get()
+
+	def empty(self):
+		return not self.batch and not self.incoming
+
+	def clear(self):
+		"""Discard all pending triplets."""
+		with self.lock:
+			self.incoming.clear()
+			self.batch.clear()
+			self.drained.notify_all()
+
 # The buffering between senders and receivers. Firstly this is a
 # wrapper around the system queue. Then there are several flavours
 # of access to that wrapper. One style about sync access and the
@@ -61,7 +128,7 @@ class Pump(object):
 	def __init__(self, blocking=False, maximum_size=PEAK_BEFORE_DROPPED):
 		"""Construct an instance of pump."""
 		self.blocking = blocking
-		self.message_queue = Queue(maxsize=maximum_size)
+		self.message_queue = Mailbox(maxsize=maximum_size)
 		self.thread_function = None
 		self.assigned_thread = None
 
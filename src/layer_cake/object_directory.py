@@ -31,6 +31,9 @@ import sys
 from datetime import datetime
 import uuid
 import re
+import string
+from bisect import bisect_left
+from collections import deque
 from .get_local_ip import get_local_ip
 
 from .general_purpose import *
@@ -266,6 +269,39 @@ class ClearListings(object):
 
 bind(ClearListings)
 
+# Versioned exchange of listings with a parent directory. On
+# connecting, a child offers its identity, version and digest.
+# The parent answers with the version it holds for that child
+# and the child sends the changes since then.
+class DirectorySync(object):
+	def __init__(self, directory_id: UUID=None, version: int=0, digest: str=None, reconnect_delay: float=0.0):
+		self.directory_id = directory_id
+		self.version = version
+		self.digest = digest
+		self.reconnect_delay = reconnect_delay
+
+class DirectorySynced(object):
+	def __init__(self, version: int=0):
+		self.version = version
+
+# Changes to the listings of a child directory, up to and
+# including the given version. A full delta replaces all
+# listings held for the child.
+class DirectoryDelta(object):
+	def __init__(self, version: int=0, full: bool=False,
+			published: list[Published]=None, subscribed: list[Subscribed]=None,
+			subscribers: set[UUID]=None, publishers: set[UUID]=None):
+		self.version = version
+		self.full = full
+		self.published = published or []
+		self.subscribed = subscribed or []
+		self.subscribers = subscribers or set()
+		self.publishers = publishers or set()
+
+bind(DirectorySync)
+bind(DirectorySynced)
+bind(DirectoryDelta)
+
 # Custom message from route to loadable library process.
 class OpenLibrary(object):
 	def __init__(self, published_id: UUID=None, subscribed_id: UUID=None):
@@ -991,6 +1027,276 @@ ROUTE_IN_PROCESS_DISPATCH = {
 
 bind(RouteInProcess, ROUTE_IN_PROCESS_DISPATCH)
 
+# Matching of subscriber searches and published names.
+META = set('.^$*+?{}[]\\|()')
+QUANTIFIER = set('*+?{')
+ESCAPED = set(string.punctuation + ' ')
+
+def alternation(search):
+	"""Detect a top-level branch, i.e. a "|" outside any group or set. Return a bool."""
+	depth = 0
+	i, n = 0, len(search)
+	while i < n:
+		c = search[i]
+		if c == '\\':
+			i += 2
+			continue
+		if c == '[':
+			i += 1
+			if i < n and search[i] == '^':
+				i += 1
+			if i < n and search[i] == ']':
+				i += 1
+			while i < n and search[i] != ']':
+				i += 2 if search[i] == '\\' else 1
+		elif c == '(':
+			depth += 1
+		elif c == ')':
+			depth -= 1
+		elif c == '|' and depth == 0:
+			return True
+		i += 1
+	return False
+
+def literal_prefix(search):
+	"""Extract the text that every full match of a search must start with.
+
+	Scanning stops at the first construct that is not a plain or escaped
+	character, and a character is dropped if it is quantified. Return the
+	prefix and a bool, true if the prefix is the whole search.
+	"""
+	prefix = []
+	i, n = 0, len(search)
+	while i < n:
+		c = search[i]
+		if c == '\\':
+			if i + 1 >= n or search[i + 1] not in ESCAPED:
+				break
+			c = search[i + 1]
+			j = i + 2
+		elif c in META:
+			break
+		else:
+			j = i + 1
+		if j < n and search[j] in QUANTIFIER:
+			break
+		prefix.append(c)
+		i = j
+	else:
+		return ''.join(prefix), True
+
+	if alternation(search):
+		return '', False
+	return ''.join(prefix), False
+
+class SearchIndex(object):
+	"""Match subscriber searches and published names.
+
+	A search that is plain text is held in a table of exact names. Any other
+	search is filed under the literal text that all of its matches start
+	with. Published names are kept in order, so that the names starting with
+	a given text are a contiguous range. A regular expression is only run
+	against a name that shares its literal prefix.
+	"""
+	def __init__(self):
+		self.exact = {}			# Name to set of plain searches.
+		self.prefixed = {}		# Prefix to dict of search and machine.
+		self.length = {}		# Prefix length to number of prefixes.
+		self.search = {}		# Search to prefix, plain-ness and machine.
+		self.name = []			# Published names, in order.
+
+	def add_search(self, search, machine):
+		if search in self.search:
+			return
+		prefix, plain = literal_prefix(search)
+		self.search[search] = (prefix, plain, machine)
+		if plain:
+			self.exact.setdefault(prefix, set()).add(search)
+			return
+		p = self.prefixed.get(prefix, None)
+		if p is None:
+			p = {}
+			self.prefixed[prefix] = p
+			n = len(prefix)
+			self.length[n] = self.length.get(n, 0) + 1
+		p[search] = machine
+
+	def remove_search(self, search):
+		c = self.search.pop(search, None)
+		if c is None:
+			return
+		prefix, plain, machine = c
+		if plain:
+			e = self.exact[prefix]
+			e.discard(search)
+			if not e:
+				del self.exact[prefix]
+			return
+		p = self.prefixed[prefix]
+		p.pop(search, None)
+		if not p:
+			del self.prefixed[prefix]
+			n = len(prefix)
+			self.length[n] -= 1
+			if self.length[n] == 0:
+				del self.length[n]
+
+	def add_name(self, name):
+		i = bisect_left(self.name, name)
+		if i < len(self.name) and self.name[i] == name:
+			return
+		self.name.insert(i, name)
+
+	def remove_name(self, name):
+		i = bisect_left(self.name, name)
+		if i < len(self.name) and self.name[i] == name:
+			del self.name[i]
+
+	def searches(self, name):
+		"""Generate the searches that match the name."""
+		e = self.exact.get(name, None)
+		if e:
+			yield from e
+		for n in self.length.keys():
+			if n > len(name):
+				continue
+			p = self.prefixed.get(name[:n], None)
+			if p is None:
+				continue
+			for search, machine in p.items():
+				if machine.fullmatch(name):
+					yield search
+
+	def names(self, search):
+		"""Generate the published names that match the search."""
+		c = self.search.get(search, None)
+		if c is None:
+			return
+		prefix, plain, machine = c
+		name = self.name
+		i = bisect_left(name, prefix)
+		if plain:
+			if i < len(name) and name[i] == prefix:
+				yield prefix
+			return
+		while i < len(name):
+			k = name[i]
+			if not k.startswith(prefix):
+				break
+			if machine.fullmatch(k):
+				yield k
+			i += 1
+
+# Versioned listings passed between directories.
+JOURNAL_LIMIT = 8192
+SYNC_BEFORE_FALLBACK = 5.0		# Seconds to wait on a parent that may not sync.
+
+def listing_digest(ids):
+	"""Combine a collection of listing ids into a short, order-free value. Return a hex string."""
+	d = 0
+	for i in ids:
+		d ^= i.int
+	return f'{d:032x}'
+
+class ListingJournal(object):
+	"""The listings passed up to a parent directory, and a numbered record of changes.
+
+	Every listing added or cleared moves the version on by one. A bounded
+	record of recent changes allows the net difference between an earlier
+	version and now to be recovered, without shipping every listing.
+
+	:param limit: maximum number of changes kept
+	:type limit: int
+	"""
+	def __init__(self, limit=JOURNAL_LIMIT):
+		self.version = 0
+		self.listing = {}				# Current, by id.
+		self.change = deque()			# Version, id and listing (None if cleared).
+		self.limit = limit
+
+	def record(self, i, listing, kind):
+		self.version += 1
+		self.change.append((self.version, i, listing, kind))
+		if len(self.change) > self.limit:
+			self.change.popleft()
+
+	def add(self, listing):
+		if isinstance(listing, Published):
+			i, kind = listing.published_id, Published
+		else:
+			i, kind = listing.subscribed_id, Subscribed
+		if i in self.listing:
+			return False
+		self.listing[i] = listing
+		self.record(i, listing, kind)
+		return True
+
+	def clear(self, subscribers, publishers):
+		"""Remove the listed ids. Return the sets of subscribers and publishers actually held."""
+		s = {i for i in subscribers if i in self.listing}
+		p = {i for i in publishers if i in self.listing}
+		for i in s:
+			self.listing.pop(i)
+			self.record(i, None, Subscribed)
+		for i in p:
+			self.listing.pop(i)
+			self.record(i, None, Published)
+		return s, p
+
+	def digest(self):
+		return listing_digest(self.listing.keys())
+
+	def full(self):
+		published = [v for v in self.listing.values() if isinstance(v, Published)]
+		subscribed = [v for v in self.listing.values() if isinstance(v, Subscribed)]
+		return published, subscribed
+
+	def since(self, version):
+		"""Net changes after the given version. Return a 4-tuple of lists and sets, or None."""
+		change = self.change
+		if version < 1 or version > self.version:
+			return None
+		if version < self.version and (not change or change[0][0] > version + 1):
+			return None			# Gone from the record.
+
+		published, subscribed = [], []
+		subscribers, publishers = set(), set()
+		seen = set()
+		for v, i, listing, kind in reversed(change):
+			if v <= version:
+				break
+			if i in seen:
+				continue		# Latest change wins.
+			seen.add(i)
+			if listing is not None:
+				a = published if kind is Published else subscribed
+				a.append(listing)
+			elif kind is Published:
+				publishers.add(i)
+			else:
+				subscribers.add(i)
+		return published, subscribed, subscribers, publishers
+
+class ChildDirectory(object):
+	"""The listings received from a directory below, by its identity.
+
+	:param directory_id: unique id of the child directory
+	:type directory_id: UUID
+	"""
+	def __init__(self, directory_id):
+		self.directory_id = directory_id
+		self.version = 0
+		self.subscribed = set()
+		self.published = set()
+		self.retain = GRACE_BEFORE_CLEARANCE
+		self.expiry = None
+
+def transient(closed):
+	"""Is this a loss of connection that a child directory will recover from. Return a bool."""
+	if closed.reason == EndOfTransport.WENT_STALE:
+		return True
+	return closed.reason == EndOfTransport.INBOUND_STREAMING and bool(closed.error_code)
+
 #
 def find_route(route, routing):
 	for r in routing:
@@ -1077,6 +1383,13 @@ class ObjectDirectory(Threaded, StateMachine):
 		self.accepted = {}				# Remember who connects from below and what they provide.
 		self.pending_enquiry = set()
 
+		# Versioned exchange of listings, up and down.
+		self.journal = ListingJournal()
+		self.synced = False				# Parent has answered the sync.
+		self.legacy = False				# Parent does not sync, send whole listings.
+		self.child = {}					# Synced directories below, by connection.
+		self.retained = {}				# Listings of lost directories, by id.
+
 		# Keep the db clean.
 		self.unique_publish = {}
 		self.unique_subscribe = {}
@@ -1088,6 +1401,7 @@ class ObjectDirectory(Threaded, StateMachine):
 		# For quick matching.
 		self.published_name = {}
 		self.subscribed_search = {}
+		self.search_index = SearchIndex()
 
 		# Routed listings.
 		self.routed_publish = {}
@@ -1192,6 +1506,7 @@ class ObjectDirectory(Threaded, StateMachine):
 
 		lp = (listing, publish)
 		self.published_name[name] = lp
+		self.search_index.add_name(name)
 		self.listed_publisher[listing.published_id] = lp
 
 		if origin is not None:
@@ -1225,6 +1540,7 @@ class ObjectDirectory(Threaded, StateMachine):
 			s = {}
 			sr = [s, r]
 			self.subscribed_search[search] = sr
+			self.search_index.add_search(search, r)
 		else:
 			s = sr[0]
 
@@ -1245,22 +1561,14 @@ class ObjectDirectory(Threaded, StateMachine):
 
 	def find_subscribers(self, published: Published):
 		# Turn a search into a flat list of matching subscribers.
-		for k, v in self.subscribed_search.items():
-			m = v[1].fullmatch(published.name)
-			if m:
-				for s in v[0].values():
-					yield s[0]
+		for k in list(self.search_index.searches(published.name)):
+			for s in self.subscribed_search[k][0].values():
+				yield s[0]
 
 	def find_publishers(self, subscribed: Subscribed):
 		# Turn a search into a flat list of matching publishers.
-		sr = self.subscribed_search.get(subscribed.search, None)
-		if sr is None:
-			return
-		machine = sr[1]
-		for k, lp in self.published_name.items():
-			m = machine.fullmatch(k)
-			if m:
-				yield lp[0]
+		for k in list(self.search_index.names(subscribed.search)):
+			yield self.published_name[k][0]
 
 	def create_route(self, subscriber: Subscribed, publisher: Published):
 		self.console(f'Route', name=publisher.name, scope=self.directory_scope, encrypted=publisher.encrypted)
@@ -1344,6 +1652,9 @@ class ObjectDirectory(Threaded, StateMachine):
 				continue
 			a, m = subscribed
 			a.pop(s, None)
+			if not a:
+				self.subscribed_search.pop(search, None)
+				self.search_index.remove_search(search)
 
 			self.console(f'Cleared subscribed "{search}"[{self.directory_scope}]')
 
@@ -1369,6 +1680,7 @@ class ObjectDirectory(Threaded, StateMachine):
 
 			# Remove from the matching machinery.
 			self.published_name.pop(name, None)
+			self.search_index.remove_name(name)
 
 			self.console(f'Cleared published "{name}"[{self.directory_scope}]')
 
@@ -1508,20 +1820,136 @@ class ObjectDirectory(Threaded, StateMachine):
 		return False
 
 	def send_up(self, listing):
-		if isinstance(self.connected, Connected):
-			if listing.scope.value < self.directory_scope.value:
+		if isinstance(listing, Published):
+			self.pass_up([listing], [])
+		else:
+			self.pass_up([], [listing])
+
+	def pass_up(self, published, subscribed):
+		# Record the listings bound for the parent and
+		# send them on, if in sync.
+		scope = self.directory_scope.value
+		published = [p for p in published if p.scope.value < scope and self.journal.add(p)]
+		subscribed = [s for s in subscribed if s.scope.value < scope and self.journal.add(s)]
+		if not published and not subscribed:
+			return
+		if not isinstance(self.connected, Connected):
+			return
+		if self.legacy:
+			for listing in published + subscribed:
 				self.send(listing, self.connected.proxy_address)
+		elif self.synced:
+			delta = DirectoryDelta(version=self.journal.version, published=published, subscribed=subscribed)
+			self.send(delta, self.connected.proxy_address)
+
+	def clear_up(self, subscribers, publishers):
+		s, p = self.journal.clear(subscribers, publishers)
+		if not s and not p:
+			return
+		if not isinstance(self.connected, Connected):
+			return
+		if self.legacy:
+			self.send(ClearListings(s, p), self.connected.proxy_address)
+		elif self.synced:
+			delta = DirectoryDelta(version=self.journal.version, subscribers=s, publishers=p)
+			self.send(delta, self.connected.proxy_address)
 
 	def push_up(self):
-		published = [v[0] for k, v in self.published_name.items() if v[0].scope.value < self.directory_scope.value]
-		subscribed = []
-		for k, v in self.subscribed_search.items():
-			for t in v[0].values():
-				if t[0].scope.value < self.directory_scope.value:
-					subscribed.append(t[0])
+		# Offer the current state of listings to the parent.
+		j = self.journal
+		sync = DirectorySync(directory_id=self.unique_id, version=j.version, digest=j.digest(),
+			reconnect_delay=self.reconnect_delay or 0.0)
+		self.send(sync, self.connected.proxy_address)
+		self.start(T3, SYNC_BEFORE_FALLBACK)
+
+	def push_legacy(self):
+		# Parent has not answered the sync. Assume an
+		# earlier version and send the whole table.
+		self.legacy = True
+		published, subscribed = self.journal.full()
 		if published or subscribed:
 			self.send(PublishedDirectory(published, subscribed), self.connected.proxy_address)
 
+	def add_listings(self, published, subscribed, sub, pub):
+		# Bulk add of listings from below, routing as needed. Return
+		# the lists of those added.
+		highest = None
+		added_published = []
+		for p in published:
+			if p.scope.value > self.directory_scope.value:
+				continue
+			if not self.add_publisher(p, pub, None):
+				continue
+			added_published.append(p)
+			if highest is None or p.scope.value < highest.scope.value:
+				highest = p
+			for s in self.find_subscribers(p):
+				self.create_route(s, p)
+
+		highest is not None and self.auto_connect(highest)
+
+		added_subscribed = []
+		for s in subscribed:
+			if s.scope.value > self.directory_scope.value:
+				continue
+			if not self.add_subscriber(s, sub, None):
+				continue
+			added_subscribed.append(s)
+			if highest is None or s.scope.value < highest.scope.value:
+				highest = s
+			for p in self.find_publishers(s):
+				self.create_route(s, p)
+
+		highest is not None and self.auto_connect(highest)
+		return added_published, added_subscribed
+
+	def clear_child(self, sub, pub, subscribers, publishers):
+		# Remove listings that originated from a directory below.
+		subscribers = subscribers & sub
+		publishers = publishers & pub
+		if not subscribers and not publishers:
+			return
+		sub -= subscribers
+		pub -= publishers
+		self.clear_listings(subscribers, publishers)
+		self.clear_up(subscribers, publishers)
+
+	def release_retained(self, published, subscribed):
+		# Listings from below that collide with those held for a
+		# lost directory, e.g. after a restart, replace them.
+		names = {p.name for p in published}
+		searches = {s.search for s in subscribed}
+		listed = {p.published_id for p in published} | {s.subscribed_id for s in subscribed}
+		for r in self.retained.values():
+			publishers = {i for i in r.published - listed if i in self.listed_publisher
+				and self.listed_publisher[i][0].name in names}
+			subscribers = {i for i in r.subscribed - listed if i in self.listed_subscriber
+				and self.listed_subscriber[i][0].search in searches}
+			if not publishers and not subscribers:
+				continue
+			self.console(f'Released listings of lost directory', directory_id=r.directory_id)
+			self.clear_child(r.subscribed, r.published, subscribers, publishers)
+			r.version = 0		# Full resend if it does come back.
+
+	def retain_child(self, child):
+		# Hold the listings of a lost directory for a
+		# period, expecting a reconnect.
+		child.expiry = clock_now() + child.retain
+		self.retained[child.directory_id] = child
+		self.start(T2, min(r.expiry for r in self.retained.values()) - clock_now())
+
+	def expire_retained(self):
+		now = clock_now()
+		for k, r in list(self.retained.items()):
+			if r.expiry > now:
+				continue
+			del self.retained[k]
+			self.console(f'Expired listings of lost directory', directory_id=k)
+			self.clear_listings(r.subscribed, r.published)
+			self.clear_up(r.subscribed, r.published)
+		if self.retained:
+			self.start(T2, min(r.expiry for r in self.retained.values()) - now)
+
 	def get_directory(self, client_address):
 		argv = sys.argv
 		if argv[0].rfind('python') == -1:
@@ -1606,6 +2034,8 @@ def ObjectDirectory_READY_NotListening(self, message):
 
 def ObjectDirectory_READY_Connected(self, message):
 	self.connected = message
+	self.synced = False
+	self.legacy = False
 	self.push_up()
 	if self.directory_opened:
 		self.send(DirectoryOpened(), self.directory_opened)
@@ -1636,15 +2066,105 @@ def ObjectDirectory_READY_Closed(self, message):
 	if isinstance(self.connected, Connected):
 		if self.return_address == self.connected.proxy_address:
 			self.connected = message
+			self.synced = False
 			self.start(T1, self.reconnect_delay)
 			return READY
 
-	p = self.accepted.pop(self.return_address[-1], None)
+	k = self.return_address[-1]
+	p = self.accepted.pop(k, None)
 	if p is None:
 		return READY
+	child = self.child.pop(k, None)
+	if child is not None and transient(message) and (p[1] or p[2]):
+		self.retain_child(child)
+		return READY
 	self.clear_listings(p[1], p[2])
-	if isinstance(self.connected, Connected) and (p[1] or p[2]):
-		self.send(ClearListings(p[1], p[2]), self.connected.proxy_address)
+	self.clear_up(p[1], p[2])
+	return READY
+
+def ObjectDirectory_READY_T2(self, message):
+	self.expire_retained()
+	return READY
+
+def ObjectDirectory_READY_T3(self, message):
+	if isinstance(self.connected, Connected) and not self.synced and not self.legacy:
+		self.push_legacy()
+	return READY
+
+def ObjectDirectory_READY_DirectorySync(self, message):
+	k = self.return_address[-1]
+	p = self.accepted.get(k, None)
+	if p is None:
+		return READY
+	a, sub, pub = p
+
+	# Resume the listings of a lost directory, or of
+	# one that has reconnected before the loss was noticed.
+	child = self.retained.pop(message.directory_id, None)
+	if child is None:
+		for c, r in self.child.items():
+			if r.directory_id == message.directory_id:
+				self.child.pop(c)
+				b = self.accepted.get(c, None)
+				if b is not None:
+					self.accepted[c] = [b[0], set(), set()]
+				child = r
+				break
+		else:
+			child = ChildDirectory(message.directory_id)
+	sub |= child.subscribed
+	pub |= child.published
+	child.subscribed, child.published = sub, pub
+	child.retain = message.reconnect_delay * 2 + GRACE_BEFORE_CLEARANCE
+	child.expiry = None
+	self.child[k] = child
+
+	held = child.version
+	if held > message.version:
+		held = 0
+	elif held == message.version and listing_digest(sub | pub) != message.digest:
+		held = 0
+	self.reply(DirectorySynced(version=held))
+	return READY
+
+def ObjectDirectory_READY_DirectorySynced(self, message):
+	if self.legacy:
+		return READY
+	self.cancel(T3)
+	j = self.journal
+	if message.version != j.version:
+		d = j.since(message.version)
+		if d is None:
+			published, subscribed = j.full()
+			delta = DirectoryDelta(version=j.version, full=True, published=published, subscribed=subscribed)
+		else:
+			published, subscribed, subscribers, publishers = d
+			delta = DirectoryDelta(version=j.version, published=published, subscribed=subscribed,
+				subscribers=subscribers, publishers=publishers)
+		self.reply(delta)
+	self.synced = True
+	return READY
+
+def ObjectDirectory_READY_DirectoryDelta(self, message):
+	k = self.return_address[-1]
+	p = self.accepted.get(k, None)
+	if p is None:
+		return READY
+	a, sub, pub = p
+
+	if message.full:
+		listed = {l.subscribed_id for l in message.subscribed} | {l.published_id for l in message.published}
+		self.clear_child(sub, pub, sub - listed, pub - listed)
+	self.clear_child(sub, pub, message.subscribers, message.publishers)
+
+	if self.retained:
+		self.release_retained(message.published, message.subscribed)
+	published, subscribed = self.add_listings(message.published, message.subscribed, sub, pub)
+	self.pass_up(published, subscribed)
+
+	child = self.child.get(k, None)
+	if child is not None:
+		child.version = message.version
 	return READY
 
 def ObjectDirectory_READY_Enquiry(self, message):
@@ -1702,6 +2222,7 @@ def ObjectDirectory_READY_HostPort(self, message):
 	self.console(f'Published[{self.directory_scope}]', name=listing.name, listening=message)
 	
 	self.published_name[listing.name] = (listing, publish)
+	self.search_index.add_name(listing.name)
 	self.listed_publisher[listing.published_id] = (listing, publish)
 
 	unique_publish = publish.name
@@ -1776,39 +2297,15 @@ def ObjectDirectory_READY_Subscribed(self, message):
 
 def ObjectDirectory_READY_PublishedDirectory(self, message):
 	a, sub, pub = self.accepted[self.return_address[-1]]
-	highest = None
-	for p in message.published:
-		if p.scope.value > self.directory_scope.value:
-			continue
-		if not self.add_publisher(p, pub, None):
-			continue
-		if highest is None or p.scope.value < highest.scope.value:
-			highest = p
-		for s in self.find_subscribers(p):
-			self.create_route(s, p)
-
-	highest is not None and self.auto_connect(highest)
-
-	for s in message.subscribed:
-		if s.scope.value > self.directory_scope.value:
-			continue
-		if not self.add_subscriber(s, sub, None):
-			continue
-		if highest is None or s.scope.value < highest.scope.value:
-			highest = s
-		for p in self.find_publishers(s):
-			self.create_route(s, p)
-
-	highest is not None and self.auto_connect(highest)
-
-	if isinstance(self.connected, Connected):
-		self.push_up()
+	if self.retained:
+		self.release_retained(message.published, message.subscribed)
+	published, subscribed = self.add_listings(message.published, message.subscribed, sub, pub)
+	self.pass_up(published, subscribed)
 	return READY
 
 def ObjectDirectory_READY_ClearListings(self, message):
 	self.clear_listings(message.subscribers, message.publishers)
-	if isinstance(self.connected, Connected):
-		self.send(message, self.connected.proxy_address)
+	self.clear_up(message.subscribers, message.publishers)
 	return READY
 
 def ObjectDirectory_READY_ClearPublished(self, message):
@@ -1816,8 +2313,7 @@ def ObjectDirectory_READY_ClearPublished(self, message):
 	publishers = set([message.published_id])
 	self.clear_listings(subscribers, publishers)
 	self.reply(PublishedCleared(name=message.name, scope=message.scope, published_id=message.published_id, note=message.note))
-	if isinstance(self.connected, Connected):
-		self.send(ClearListings(subscribers, publishers), self.connected.proxy_address)
+	self.clear_up(subscribers, publishers)
 	return READY
 
 def ObjectDirectory_READY_ClearSubscribed(self, message):
@@ -1825,8 +2321,7 @@ def ObjectDirectory_READY_ClearSubscribed(self, message):
 	publishers = set()
 	self.clear_listings(subscribers, publishers)
 	self.reply(SubscribedCleared(search=message.search, scope=message.scope, subscribed_id=message.subscribed_id, note=message.note))
-	if isinstance(self.connected, Connected):
-		self.send(ClearListings(subscribers, publishers), self.connected.proxy_address)
+	self.clear_up(subscribers, publishers)
 	return READY
 
 def ObjectDirectory_READY_ClearSubscriberRoute(self, message):
@@ -2002,8 +2497,9 @@ OBJECT_DIRECTORY_DISPATCH = {
 	READY: (
 		(Listening, NotListening,
 		Connected, NotConnected,
-		T1,
+		T1, T2, T3,
 		Accepted, Closed,
+		DirectorySync, DirectorySynced, DirectoryDelta,
 		Enquiry,
 		PublishAs, SubscribeTo, HostPort,
 		Published, Subscribed,
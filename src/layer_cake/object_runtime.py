@@ -82,7 +82,7 @@ bind_point(QuietChannel, lifecycle=False, message_trail=False, execution_trace=F
 # A non-logging channel.
 root_lock = threading.RLock()
 
-def start_up(logs=log_to_nowhere):
+def start_up(logs=log_to_nowhere, log_overflow=LogOverflow.BLOCK):
 	"""Start the async runtime. Return the root object.
 
 	This is the function that actually creates the threads and objects
@@ -94,6 +94,8 @@ def start_up(logs=log_to_nowhere):
 
 	:param logs: an object expecting to receive log objects
 	:type logs: a callable object
+	:param log_overflow: behaviour when logs arrive faster than they are written
+	:type log_overflow: LogOverflow
 	:rtype: channel
 	"""
 	global root_lock
@@ -109,7 +111,7 @@ def start_up(logs=log_to_nowhere):
 			root = nowhere.create(QuietChannel)
 
 			PB.root = root
-			VP.log_address = root.create(LogAgent, logs)
+			VP.log_address = root.create(LogAgent, logs, overflow=log_overflow)
 			VP.timer_address = root.create(CountdownTimer)
 			#VP.test_address = root.create(TestRecord)
 			VP.circuit_address = root.create(timer_circuit, VP.timer_address)
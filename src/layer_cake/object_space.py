@@ -27,6 +27,7 @@
 __docformat__ = 'restructuredtext'
 
 import threading
+import itertools
 
 from .virtual_memory import *
 from .message_pump import *
@@ -51,32 +52,33 @@ class Completion(Exception):
 # THE BIG BANG STARTS HERE.
 # Core async object management.
 # Safe serial ids, type library, active objects and messaging.
-serial_number = 1
-serial_lock = threading.RLock()
+serial_number = itertools.count(1)
 
 def get_next_id():
 	"""Thread-safe increment of serial id, return the original value.
 
-	Used during object creation for assignment of unique ids.
+	Used during object creation for assignment of unique ids. A
+	next() on the count is a single operation, i.e. there is no lock.
 
 	Returns:
 
 	a previously unused, unique Ansar address, suitable for use as a
 	send destination.
 	"""
-	global serial_number, serial_lock
-	try:
-		serial_lock.acquire()
-		next = serial_number
-		serial_number += 1
-	finally:
-		serial_lock.release()
-	return (next,)
+	return (next(serial_number),)
 
-#
-#
-object_map  = {}
-object_lock = threading.RLock()
+# The object table is split into shards, selected by id. Lookups
+# are single dict operations and take no lock, i.e. a send never
+# waits on a create or destroy. Changes and OpenAddress hold the
+# lock of one shard.
+OBJECT_SHARDS = 64
+
+class ObjectShard(object):
+	def __init__(self):
+		self.lock = threading.RLock()
+		self.table = {}
+
+object_shard = [ObjectShard() for _ in range(OBJECT_SHARDS)]
 
 def create_an_object(object_type, object_ending, parent_address, args, kw_args):
 	"""
@@ -103,7 +105,6 @@ def create_an_object(object_type, object_ending, parent_address, args, kw_args):
 	a 2-tuple of an Ansar address and an async object instance. The
 	former being the unique id for the latter.
 	"""
-	global object_map, object_lock
 	address = get_next_id()
 	try:
 		created = object_type(*args, **kw_args)
@@ -128,11 +129,10 @@ def create_an_object(object_type, object_ending, parent_address, args, kw_args):
 		created.queue_address = assigned_queue.object_address
 	created.parent_address = parent_address
 
-	try:
-		object_lock.acquire()
-		object_map[address[-1]] = created
-	finally:
-		object_lock.release()
+	i = address[-1]
+	shard = object_shard[i % OBJECT_SHARDS]
+	with shard.lock:
+		shard.table[i] = created
 	return address, created
 
 def destroy_an_object(address):
@@ -146,15 +146,10 @@ def destroy_an_object(address):
 
 	Nothing.
 	"""
-	global object_map, object_lock
-	try:
-		object_lock.acquire()
-		try:
-			del object_map[address[-1]]
-		except KeyError:
-			pass
-	finally:
-		object_lock.release()
+	i = address[-1]
+	shard = object_shard[i % OBJECT_SHARDS]
+	with shard.lock:
+		shard.table.pop(i, None)
 
 def find_object(address):
 	"""
@@ -176,34 +171,23 @@ def find_object(address):
 	an async object instance or None, if the underlying object no longer
 	exists.
 	"""
-	global object_map, object_lock
-	try:
-		object_lock.acquire()
-		try:
-			matched = object_map[address[-1]]
-		except KeyError:
-			return None
-	finally:
-		object_lock.release()
-	return matched
+	i = address[-1]
+	return object_shard[i % OBJECT_SHARDS].table.get(i, None)
 
 # Class for safe access to the object underlying an address.
 # Used with real caution.
 class OpenAddress:
 	def __init__(self, address, *args, **kwargs):
 		self.object_address = address
+		i = address[-1]
+		self.shard = object_shard[i % OBJECT_SHARDS]
 
 	def __enter__(self, *args, **kwargs):
-		global object_map, object_lock
-		object_lock.acquire()
-		try:
-			return object_map[self.object_address[-1]]
-		except KeyError:
-			return None
+		self.shard.lock.acquire()
+		return self.shard.table.get(self.object_address[-1], None)
 
 	def __exit__(self, exc_type=None, exc_value=None, traceback=None):
-		global object_map, object_lock
-		object_lock.release()
+		self.shard.lock.release()
 		if (exc_type is not None):
 			return False
 		return True
@@ -247,20 +231,18 @@ def send_a_message(message, to_address, return_address):
 
 	Nothing.
 	"""
-	global object_map, object_lock
-	try:
-		object_lock.acquire()
-		try:
-			to_object = object_map[to_address[-1]]
-			if to_object.queue_address[-1] == to_address[-1]:	  # Dont need to lookup self.
-				queue_object = to_object
-			else:
-				queue_object = object_map[to_object.queue_address[-1]]
-			queue_object.put([message, to_address, return_address])
-		except KeyError:			# No-such-address is not an error.
-			pass
-	finally:
-		object_lock.release()
+	i = to_address[-1]
+	to_object = object_shard[i % OBJECT_SHARDS].table.get(i, None)
+	if to_object is None:			# No-such-address is not an error.
+		return
+	q = to_object.queue_address[-1]
+	if q == i:						# Dont need to lookup self.
+		queue_object = to_object
+	else:
+		queue_object = object_shard[q % OBJECT_SHARDS].table.get(q, None)
+		if queue_object is None:
+			return
+	queue_object.put([message, to_address, return_address])
 
 #
 #
@@ -273,9 +255,8 @@ def set_queue(object_type, queue_address):
 	global type_map, type_lock
 	try:
 		type_lock.acquire()
-		try:
-			queue = object_map[queue_address[-1]]
-		except KeyError:
+		queue = find_object(queue_address)
+		if queue is None:
 			return
 		type_map[object_type] = queue
 	finally:
@@ -27,6 +27,8 @@
 """
 __docformat__ = 'restructuredtext'
 
+import random
+from enum import Enum
 from collections import deque
 
 from .general_purpose import *
@@ -50,6 +52,7 @@ from .get_response import *
 __all__ = [
 	'JoinSpool',
 	'LeaveSpool',
+	'SpoolDispatch',
 	'ObjectSpool',
 ]
 
@@ -75,11 +78,85 @@ class CLEARING: pass
 class SPOOLING: pass
 
 SPOOL_SPAN = 32
+LATENCY_WEIGHT = 0.25		# Contribution of the latest response to a worker's latency.
+
+class SpoolDispatch(Enum):
+	"""
+	Enumeration of the methods for selecting a worker.
+
+	* FIFO - the worker that has been available longest
+	* LEAST_OUTSTANDING - the worker with the fewest requests underway
+	* LEAST_LATENCY - the worker with the lowest expected response time
+	* TWO_CHOICES - the less loaded of two workers chosen at random
+	"""
+	FIFO = 0
+	LEAST_OUTSTANDING = 1
+	LEAST_LATENCY = 2
+	TWO_CHOICES = 3
+
+class SpoolWorker(object):
+	"""Load and performance of a member of the spool.
+
+	:param address: the worker object
+	:type address: Address
+	"""
+	def __init__(self, address):
+		self.address = address
+		self.outstanding = 0
+		self.latency = None			# Moving average of response times.
+
+	def responded(self, span):
+		if self.latency is None:
+			self.latency = span
+		else:
+			self.latency += LATENCY_WEIGHT * (span - self.latency)
+
+	def load(self):
+		# Fewest requests, then quickest. Unknown
+		# latency is zero, to get a first sample.
+		return self.outstanding, self.latency or 0.0
+
+	def expected(self):
+		# Time until a new request could be complete.
+		return (self.latency or 0.0) * (self.outstanding + 1)
+
+def fifo_worker(self):
+	return self.idle_object[0]
+
+def least_outstanding(self):
+	available = [self.worker[a] for a in set(self.idle_object)]
+	w = min(available, key=SpoolWorker.load)
+	return w.address
+
+def least_latency(self):
+	available = [self.worker[a] for a in set(self.idle_object)]
+	w = min(available, key=SpoolWorker.expected)
+	return w.address
+
+def two_choices(self):
+	available = list(set(self.idle_object))
+	if len(available) > 2:
+		available = random.sample(available, 2)
+	w = min((self.worker[a] for a in available), key=SpoolWorker.load)
+	return w.address
+
+SELECT_WORKER = {
+	SpoolDispatch.FIFO: fifo_worker,
+	SpoolDispatch.LEAST_OUTSTANDING: least_outstanding,
+	SpoolDispatch.LEAST_LATENCY: least_latency,
+	SpoolDispatch.TWO_CHOICES: two_choices,
+}
 
 class ObjectSpool(Point, StateMachine):
 	"""
 	Distribute messages across a pool of computing resources.
 
+	Each worker may have a number of requests underway at once, as
+	set by the worker concurrency. Requests that cannot be passed on
+	immediately are queued. The queue is closed to further requests
+	while the request at its head has been waiting longer than the
+	queue wait, if set.
+
 	:param object_type: type of asynchronous object
 	:type object_type: :ref:`object type<lc-object-type>`
 	:param args: positional arguments to pass on object creation
@@ -89,11 +166,16 @@ class ObjectSpool(Point, StateMachine):
 	:param responsiveness: expected performance before imposing busy state
 	:param busy_pass_rate: rate of messages processed in busy state, as a denominator
 	:param stand_down: delay in seconds before restart of terminated object
+	:param dispatch: method of selecting a worker
+	:param worker_concurrency: number of requests each worker may have underway
+	:param queue_wait: seconds a request may wait in the queue before imposing busy state
 	:param settings: named arguments to pass on object creation
 	"""
 	def __init__(self, object_type, *args, role_name: str=None,
 			object_count: int=8, size_of_queue: int=None,
-			responsiveness: float=5.0, busy_pass_rate: int=10, stand_down: float=30.0, **settings):
+			responsiveness: float=5.0, busy_pass_rate: int=10, stand_down: float=30.0,
+			dispatch: SpoolDispatch=SpoolDispatch.FIFO, worker_concurrency: int=1, queue_wait: float=None,
+			**settings):
 		Point.__init__(self)
 		StateMachine.__init__(self, INITIAL)
 		self.object_type = object_type
@@ -104,11 +186,16 @@ class ObjectSpool(Point, StateMachine):
 		self.responsiveness = responsiveness
 		self.busy_pass_rate = busy_pass_rate
 		self.stand_down = stand_down
+		self.dispatch = dispatch
+		self.worker_concurrency = worker_concurrency
+		self.queue_wait = queue_wait
 		self.settings = settings
 
-		self.idle_object = deque()
+		self.select_worker = SELECT_WORKER[dispatch]
+		self.worker = {}				# Load and performance, by address.
+		self.idle_object = deque()		# An entry for each request a worker can take.
 		self.pending_request = deque()
-		self.working_object = {}
+		self.working_object = {}		# Requests underway, by worker.
 		self.span = deque()
 		self.total_span = 0.0
 		self.average = 0.0
@@ -119,6 +206,18 @@ class ObjectSpool(Point, StateMachine):
 		else:
 			self.no_response = responsiveness * 5.0
 
+	def join_worker(self, a):
+		self.worker[a] = SpoolWorker(a)
+		self.idle_object.extend([a] * self.worker_concurrency)
+
+	def leave_worker(self, a):
+		# Forget the worker and stop anything underway.
+		if self.worker.pop(a, None) is None:
+			return
+		self.idle_object = deque(i for i in self.idle_object if i != a)
+		for r in self.working_object.pop(a, ()):
+			self.send(Stop(), r)
+
 	def submit_request(self, message, forward_response, return_address, presented):
 		if self.responsiveness is None:
 			pass
@@ -130,19 +229,31 @@ class ObjectSpool(Point, StateMachine):
 				self.send(Busy(f'message rejected by spool (average response time {self.average:.2f})'), return_address)
 				return
 
-		idle = self.idle_object.popleft()
+		idle = self.select_worker(self)
+		self.idle_object.remove(idle)
+		w = self.worker[idle]
+		w.outstanding += 1
 		r = self.create(GetResponse, message, idle, seconds=self.no_response)
-		self.working_object[idle] = r
-		self.on_return(r, forward_response, idle=idle, return_address=return_address, started=presented)
+		self.working_object.setdefault(idle, set()).add(r)
+		self.on_return(r, forward_response, idle=idle, request=r, return_address=return_address, started=presented, dispatched=clock_now())
+
+	def submit_pending(self):
+		# Pass on queued requests while there
+		# are workers to take them.
+		while self.pending_request and self.idle_object:
+			message, return_address, presented = self.pending_request.popleft()
+			self.submit_request(message, forward_response, return_address, presented)
 
 def ObjectSpool_INITIAL_Start(self, message):
 	oc = self.object_count
 	sos = self.size_of_queue
 	r = self.responsiveness
 	sd = self.stand_down
+	wc = self.worker_concurrency
+	qw = self.queue_wait
 
-	if oc < 1 or (sos is not None and sos < 1) or (r is not None and r < 0.5) or (sd is not None and sd < 2.0):
-		self.complete(Faulted(f'unexpected parameters (count={oc}, size={sos}, responsiveness={r}), stand_down={sd})'))
+	if oc < 1 or (sos is not None and sos < 1) or (r is not None and r < 0.5) or (sd is not None and sd < 2.0) or wc < 1 or (qw is not None and qw <= 0.0):
+		self.complete(Faulted(f'unexpected parameters (count={oc}, size={sos}, responsiveness={r}), stand_down={sd}, concurrency={wc}, queue_wait={qw})'))
 
 	if self.object_type is None:
 		return SPOOLING
@@ -159,21 +270,27 @@ def ObjectSpool_INITIAL_Start(self, message):
 			r = i
 			a = self.create(self.object_type, *self.args, **self.settings)
 		self.assign(a, r)
-		self.idle_object.append(a)
+		self.join_worker(a)
 
 	return SPOOLING
 
 def forward_response(self, value, kv):
 	# Completion of a request/responsesequence.
-	# Record the idle process.
-	self.working_object.pop(kv.idle, None)
-	self.idle_object.append(kv.idle)
+	# Record the available worker, unless it has
+	# left the spool.
+	t = clock_now()
+	w = self.worker.get(kv.idle, None)
+	if w is not None:
+		self.working_object.get(kv.idle, set()).discard(kv.request)
+		w.outstanding -= 1
+		w.responded(t - kv.dispatched)
+		self.idle_object.append(kv.idle)
 
 	# Update the performance metric. Dont include
 	# timeouts as they happen for reasons like dropped
 	# connections and skew the stats for a long time.
 	if not isinstance(value, TimedOut):
-		span = clock_now() - kv.started
+		span = t - kv.started
 		self.total_span += span
 		self.span.append(span)
 		while len(self.span) > SPOOL_SPAN:
@@ -184,37 +301,21 @@ def forward_response(self, value, kv):
 	# Deliver reponse to the original client.
 	m = cast_to(value, self.returned_type)
 	self.send(m, kv.return_address)
-	if not self.pending_request:
-		return
-	message, return_address, presented = self.pending_request.popleft()
 
-	# There is a request-to-go and an available process.
-	self.submit_request(message, forward_response, return_address, presented)
+	# There may be a request-to-go and an available process.
+	self.submit_pending()
 
 def ObjectSpool_SPOOLING_JoinSpool(self, message):
-	self.idle_object.append(message.worker_address)
-	if not self.pending_request:
-		return SPOOLING
-	message, return_address, presented = self.pending_request.popleft()
+	self.join_worker(message.worker_address)
 
-	# There is a request-to-go and an available process.
-	self.submit_request(message, forward_response, return_address, presented)
+	# There may be a request-to-go and an available process.
+	self.submit_pending()
 	return SPOOLING
 
 def ObjectSpool_SPOOLING_LeaveSpool(self, message):
-	a = message.worker_address
-
 	# Its either idle, or its waiting on
-	# an active request.
-	try:
-		self.idle_object.remove(a)
-		return SPOOLING
-	except ValueError:
-		pass
-
-	p = self.working_object.pop(a, None)
-	if p is not None:
-		self.send(Stop(), p)
+	# active requests.
+	self.leave_worker(message.worker_address)
 	return SPOOLING
 
 def ObjectSpool_SPOOLING_Unknown(self, message):
@@ -228,6 +329,11 @@ def ObjectSpool_SPOOLING_Unknown(self, message):
 			self.reply(TemporarilyUnavailable(text=text))
 			return SPOOLING
 		len_pending = len(self.pending_request)
+		if self.queue_wait is not None and len_pending:
+			waited = t - self.pending_request[0][2]
+			if waited > self.queue_wait:
+				self.reply(Busy(f'message rejected by spool (queue wait {waited:.2f})'))
+				return SPOOLING
 		if self.size_of_queue is None or len_pending < self.size_of_queue:
 			self.pending_request.append((m, self.return_address, t))
 			return SPOOLING
@@ -248,6 +354,7 @@ def ObjectSpool_SPOOLING_Returned(self, message):
 		return SPOOLING
 
 	self.trace(f'Spool process termination', returned_value=message_to_tag(message.message))
+	self.leave_worker(self.return_address)
 
 	stand_down = self.stand_down
 	if stand_down is None:
@@ -262,7 +369,8 @@ def ObjectSpool_SPOOLING_Returned(self, message):
 		else:
 			a = self.create(self.object_type, *self.args, **self.settings)
 		self.assign(a, role_name)
-		self.idle_object.append(a)
+		self.join_worker(a)
+		self.submit_pending()
 
 	# Run a no-op with the desired timeout.
 	a = self.create(Delay, seconds=seconds)
@@ -54,6 +54,7 @@ from .general_purpose import *
 from .command_line import *
 from .command_startup import *
 from .object_runtime import *
+from .log_agent import *
 from .object_logs import *
 from .rolling_log import *
 from .platform_system import *
@@ -356,7 +357,7 @@ def object_home(executable, home_role, resource_path, sticky=False):
 
 	logs, files_in_folder = open_logs(home_role, log_storage)
 	if files_in_folder:
-		logs = RollingLog(role.logs.path, files_in_folder=files_in_folder)
+		logs = RollingLog(role.logs.path, files_in_folder=files_in_folder, buffered=True)
 
 	rolling = isinstance(logs, RollingLog)
 	if sticky or rolling:
@@ -476,8 +477,12 @@ def run_object(home, object_type, word, args, logs, locking):
 			raise Incomplete(f)
 		ps()
 
-		# Start the async runtime.
-		root = start_up(logs)
+		# Start the async runtime. Logging to disk must
+		# never hold up the threads doing the work.
+		if isinstance(logs, RollingLog):
+			root = start_up(logs, log_overflow=LogOverflow.DROP_DEBUG)
+		else:
+			root = start_up(logs)
 
 		# Exclusive access to disk-based resources.
 		if locking or isinstance(logs, RollingLog):
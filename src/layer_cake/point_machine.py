@@ -50,6 +50,26 @@ state_message = re.compile('(?P<state>[A-Z][A-Z0-9]*(_[A-Z0-9]+)*)_(?P<message>[
 
 unknown = portable_to_signature(UserDefined(Unknown))
 
+def dispatch_key(message):
+	"""Split the message and produce the key for handler lookup. Return a 4-tuple.
+
+	Registered messages are keyed by their runtime, where the portable
+	is also cached. Everything else, i.e. the results of a cast, is keyed
+	by signature.
+
+	:param message: the received message
+	:type message: instance of a registered class or 2-tuple
+	"""
+	a = getattr(message, '__art__', None)
+	if a is not None:
+		p = a.dispatch
+		if p is None:
+			p = lookup_signature(a.path)
+			a.dispatch = p
+		return message, p, a, a
+	m, p, a = un_cast(message)
+	return m, p, a, portable_to_signature(p)
+
 class Stateless(Machine):
 	"""Base for simple machines that maintain no formal state.
 
@@ -61,19 +81,23 @@ class Stateless(Machine):
 
 	def transition(self, message):
 		art = self.__art__
+		m, p, a, k = dispatch_key(message)
+		resolved = art.resolved
+		try:
+			return m, p, a, resolved[k]	# Previously resolved.
+		except KeyError:
+			pass
+
 		shift, messaging = art.value
-		m, p, a = un_cast(message)
-		s = portable_to_signature(p)
-		f = shift.get(s, None)			# Explicit match.
-		if f:
-			return m, p, a, f
-
-		if a:
-			for c, f in messaging.items():
+		f = shift.get(portable_to_signature(p), None)	# Explicit match.
+		if f is None and a:
+			for c, b in messaging.items():
 				if isinstance(m, c):		# Base-derived match.
-					return m, p, a, f
-
-		f = shift.get(unknown, None)	# Catch-all.
+					f = b
+					break
+		if f is None:
+			f = shift.get(unknown, None)	# Catch-all.
+		resolved[k] = f
 		return m, p, a, f
 
 	def received(self, queue, message, return_address):
@@ -131,25 +155,29 @@ class StateMachine(Machine):
 
 	def transition(self, state, message):
 		art = self.__art__
+		m, p, a, k = dispatch_key(message)
+		resolved = art.resolved
+		try:
+			return m, p, a, resolved[(state, k)]	# Previously resolved.
+		except KeyError:
+			pass
+
 		shift, messaging = art.value
-		m, p, a = un_cast(message)
-		s = portable_to_signature(p)
 		shifted = shift.get(state, None)
 		if shifted is None:
 			raise ValueError(f'machine "{art.path}" shifted to nowhere')
 
-		f = shifted.get(s, None)				# Explicit match.
-		if f:
-			return m, p, a, f
-
-		if a:
+		f = shifted.get(portable_to_signature(p), None)	# Explicit match.
+		if f is None and a:
 			messaged = messaging.get(state, None)
 			if messaged:
-				for c, f in messaged.items():
+				for c, b in messaged.items():
 					if isinstance(m, c):			# Base-derived match.
-						return m, p, a, f
-
-		f = shifted.get(unknown, None)			# Catch-all.
+						f = b
+						break
+		if f is None:
+			f = shifted.get(unknown, None)			# Catch-all.
+		resolved[(state, k)] = f
 		return m, p, a, f
 
 	def received(self, queue, message, return_address):
@@ -32,16 +32,21 @@ the end. Oldest files are deleted as necessary.
 __docformat__ = 'restructuredtext'
 
 import os
+import io
 import time
 import re
+from bisect import bisect_left
 
 from .folder_object import *
 from .convert_memory import *
+from .virtual_runtime import *
 from collections import deque
 
 __all__ = [
 	'LINES_IN_FILE',
 	'FILES_IN_FOLDER',
+	'FLUSH_INTERVAL',
+	'FLUSH_BYTES',
 	'RollingLog',
 	'read_log',
 	'rewind_log',
@@ -54,16 +59,55 @@ naming_convention = re.compile(YMDTHMSF)
 
 LINES_IN_FILE = 16384
 FILES_IN_FOLDER = 512
+FLUSH_INTERVAL = 1.0		# Seconds that lines may wait in a buffer.
+FLUSH_BYTES = 1024 * 64		# Bytes that may wait.
+INDEX_LINES = 256			# Lines between entries in the time index.
+INDEX_EXTENSION = '.index'
+TAIL_BLOCK = 1024 * 16
+
+URGENT_TAG = (USER_TAG.FAULT, USER_TAG.WARNING)
 
 class RollingLog(object):
+	"""Write logs to a rolling series of files.
+
+	Each file is accompanied by a sparse index of times and byte
+	offsets, one entry every ``INDEX_LINES`` lines, for the benefit
+	of :func:`~.read_log`.
+
+	In buffered mode lines are held in the file buffer until there are
+	enough bytes, enough time has passed or a fault or warning arrives. A
+	call to :meth:`~.RollingLog.flush` writes out anything pending, e.g.
+	at shutdown. Otherwise every line is flushed as it is written.
+
+	:param path: folder of log files
+	:type path: str
+	:param lines_in_file: lines before starting a new file
+	:type lines_in_file: int
+	:param files_in_folder: files before deleting the oldest
+	:type files_in_folder: int
+	:param buffered: enable batching of writes
+	:type buffered: bool
+	:param flush_interval: seconds that lines may wait, buffered mode
+	:type flush_interval: float
+	:param flush_bytes: bytes that may wait, buffered mode
+	:type flush_bytes: int
 	"""
-	"""
-	def __init__(self, path, lines_in_file=None, files_in_folder=None):
+	def __init__(self, path, lines_in_file=None, files_in_folder=None,
+		buffered=False, flush_interval=None, flush_bytes=None):
 		self.path = path
 		self.folder = Folder(path, re=YMDTHMSF, decorate_names=False)
 		self.lines_in_file = lines_in_file or LINES_IN_FILE
 		self.files_in_folder = files_in_folder or FILES_IN_FOLDER
+		self.buffered = buffered
+		self.flush_interval = flush_interval or FLUSH_INTERVAL
+		self.flush_bytes = flush_bytes or FLUSH_BYTES
 		self.lines = 0
+		self.offset = 0					# Bytes in the current file.
+		self.indexed = None				# Index of the current file.
+		self.pending = 0				# Bytes written but not flushed.
+		self.flushed = None				# Time of last flush.
+		self.second = None				# Whole second and its text.
+		self.second_text = None
 
 		flat = []
 		for f in self.folder.matching():
@@ -71,7 +115,7 @@ class RollingLog(object):
 			iso = iso.replace('c', ':')
 			iso = iso.replace('p', '.')
 			a = [
-				f,
+				os.path.join(self.folder.path, f),
 				text_to_world(iso),
 			]
 			flat.append(a)
@@ -81,11 +125,14 @@ class RollingLog(object):
 		self.opened, _ = self.open_file(time.time())
 
 	def log_time(self, t):
-		second = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))
-		fraction = '%.3f' % (t,)
-		fraction = fraction[-3:]
-		lt = '%s.%s' % (second, fraction)
-		return lt
+		# Formatting of the seconds is cached, i.e. it
+		# only changes once per second.
+		s = int(t)
+		if s != self.second:
+			self.second = s
+			self.second_text = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))
+		fraction = f'{t:.3f}'[-3:]
+		return f'{self.second_text}.{fraction}'
 
 	def open_file(self, t):
 		lt = self.log_time(t)
@@ -93,46 +140,79 @@ class RollingLog(object):
 		hcp = hcp.replace(':', 'c')
 		hcp = hcp.replace('.', 'p')
 		path = os.path.join(self.folder.path, hcp)
-		f = open(path, 'w')
+		if self.buffered:
+			f = open(path, 'w', buffering=self.flush_bytes, encoding='utf-8', newline='\n')
+		else:
+			f = open(path, 'w', encoding='utf-8', newline='\n')
+		self.indexed = open(path + INDEX_EXTENSION, 'w')
 		self.manifest.append([path, t])
 		while len(self.manifest) > self.files_in_folder:
 			a = self.manifest.popleft()
 			os.remove(a[0])
+			try:
+				os.remove(a[0] + INDEX_EXTENSION)
+			except FileNotFoundError:
+				pass
 		self.lines = 0
+		self.offset = 0
+		self.pending = 0
+		self.flushed = t
 		return f, lt
 
 	def close_file(self, opened):
 		opened.close()
+		self.indexed.close()
+		self.pending = 0
+
+	def flush(self):
+		"""Write out any pending lines. Return nothing."""
+		if self.pending:
+			self.opened.flush()
+			self.indexed.flush()
+			self.pending = 0
+		self.flushed = time.time()
 
 	def __call__(self, log):
-		"""
-		"""
+		"""Add the log to the current file, moving on to a new file as needed. Return the line."""
+		t = log.stamp
 		if self.lines < self.lines_in_file:
-			lt = self.log_time(log.stamp)
+			lt = self.log_time(t)
 		else:
 			self.close_file(self.opened)
-			self.opened, lt = self.open_file(log.stamp)
+			self.opened, lt = self.open_file(t)
 
 		name = log.name.split('.')[-1]
 		state = log.state
 		if state is None:
-			line = '%s %s <%08x>%s - %s\n' % (lt, log.tag.value, log.address[-1], name, log.text)
+			line = f'{lt} {log.tag.value} <{log.address[-1]:08x}>{name} - {log.text}\n'
 		else:
-			line = '%s %s <%08x>%s[%s] - %s\n' % (lt, log.tag.value, log.address[-1], name, state, log.text)
+			line = f'{lt} {log.tag.value} <{log.address[-1]:08x}>{name}[{state}] - {log.text}\n'
+		if self.lines % INDEX_LINES == 0:
+			self.indexed.write(f'{lt} {self.offset}\n')
 		self.opened.write(line)
-		self.opened.flush()
-
 		self.lines += 1
+		n = len(line) if line.isascii() else len(line.encode('utf-8'))
+		self.offset += n
+
+		if not self.buffered:
+			self.opened.flush()
+			if self.lines % INDEX_LINES == 1:
+				self.indexed.flush()
+			return line
+
+		self.pending += n
+		if self.pending >= self.flush_bytes or log.tag in URGENT_TAG or t - self.flushed >= self.flush_interval:
+			self.opened.flush()
+			self.indexed.flush()
+			self.pending = 0
+			self.flushed = t
 		return line
 	#def __close__(self):
 	#	"Proper termination of file-based logging."
 	#	pass
 
-def read_log(logs, begin, end, count):
-	'''Coroutine that accepts a log folder, range and yields lines.'''
-
-	# Get the collection of files and their
-	# timestamps.
+def log_files(logs):
+	"""Scan the folder for log files. Return a list of [path, datetime] in time order."""
 	folder = Folder(logs.path, re=YMDTHMSF, decorate_names=False)
 	rolling = []
 	for f in folder.matching():
@@ -145,10 +225,91 @@ def read_log(logs, begin, end, count):
 			d,
 		]
 		rolling.append(a)
+	rolling.sort(key=lambda m: m[1])
+	return rolling
+
+def read_index(path):
+	"""Load the time index of a log file. Return a list of times and a list of byte offsets."""
+	times, offsets = [], []
+	try:
+		with open(path + INDEX_EXTENSION, 'r') as f:
+			for line in f:
+				t, _, o = line.partition(' ')
+				try:
+					d = text_to_world(t)
+					o = int(o)
+				except (ConversionDecodeError, ValueError):
+					break		# Cut short.
+				times.append(d)
+				offsets.append(o)
+	except FileNotFoundError:
+		pass
+	return times, offsets
+
+def seek_offset(path, begin):
+	"""Find a place in the log file that is safely before the given time. Return a byte offset."""
+	times, offsets = read_index(path)
+	# Step back an extra entry, allowing for
+	# lines slightly out of time order.
+	i = bisect_left(times, begin) - 2
+	if i < 0:
+		return 0
+	return offsets[i]
+
+def stamp_floor(d):
+	"""Render the time in the form of a log stamp, truncated to milliseconds. Return str."""
+	d = d.astimezone(UTC)
+	return f'{d:%Y-%m-%dT%H:%M:%S}.{d.microsecond // 1000:03d}'
+
+def log_lines(path, offset=0, before=None):
+	"""Generate the timestamp and text of each line, from the given byte offset.
+
+	Lines with a stamp that sorts before the given text are passed
+	over without conversion.
+	"""
+	with open(path, 'rb') as b:
+		b.seek(offset)
+		with io.TextIOWrapper(b, encoding='utf-8') as f:
+			for line in f:
+				# convert stamp 2023-01-03T19:23:51
+				i = line.index(' ')
+				t = line[:i]
+				if before is not None and t < before:
+					continue
+				d = text_to_world(t)
+				yield d, line
+
+def tail_lines(path, n):
+	"""Read the last lines of a log file, working backwards from the end. Return a list of str."""
+	if n < 1:
+		return []
+	with open(path, 'rb') as f:
+		position = f.seek(0, os.SEEK_END)
+		block = b''
+		while position > 0 and block.count(b'\n') <= n:
+			size = min(TAIL_BLOCK, position)
+			position -= size
+			f.seek(position)
+			block = f.read(size) + block
+
+	lines = block.decode('utf-8', errors='replace').split('\n')
+	last = lines.pop()		# Empty or partial.
+	lines = [l.rstrip('\r') + '\n' for l in lines]
+	if last:
+		lines.append(last)
+	if position > 0:
+		lines = lines[1:]	# Started mid-line.
+	return lines[-n:]
+
+def read_log(logs, begin, end, count):
+	'''Coroutine that accepts a log folder, range and yields lines.'''
+
+	# Get the collection of files and their
+	# timestamps.
+	rolling = log_files(logs)
 
 	if len(rolling) < 1:	   # Early exit if nothing there.
 		return
-	rolling.sort(key=lambda m: m[1])		# Put them in order.
 
 	if end is not None and end < rolling[0][1]:	 # Timeframe before all records.
 		return
@@ -158,13 +319,13 @@ def read_log(logs, begin, end, count):
 	def get_file():
 		# Slide up to the file with the "nearest"
 		# timestamp, i.e. the one before the file
-		# that is after.
+		# that is after. Then use the index to skip
+		# most of the lines before begin.
 		n = len(rolling)
 		if begin < rolling[0][1]:
 			i = 0
 		elif begin >= rolling[-1][1]:
-			yield rolling[-1][0]
-			return
+			i = n - 1
 		else:
 			for i in range(n - 1):
 				if rolling[i + 1][1] > begin:
@@ -172,28 +333,19 @@ def read_log(logs, begin, end, count):
 
 		# Yield the sequence of files starting
 		# at i.
-		for j in range(i, len(rolling)):
-			yield rolling[j][0]
-
-	def get_line(r):
-		# Open and close the presented file. Yield
-		# each line from the file along with the
-		# timestamp in usable form.
-		with open(r, 'r') as f:
-			for line in f:
-				# convert stamp 2023-01-03T19:23:51
-				i = line.index(' ')
-				t = line[:i]
-				d = text_to_world(t)
-				yield d, line
+		yield rolling[i][0], seek_offset(rolling[i][0], begin)
+		for j in range(i + 1, n):
+			yield rolling[j][0], 0
+
+	before = stamp_floor(begin)
 
 	# 3 variants on the querying of a log,
 	# 1) from <begin> to <end>,
 	# 2) from <begin> for <count> and
 	# 3) from <begin> to end-of-log.
 	if end is not None:
-		for r in get_file():
-			for d, l in get_line(r):
+		for r, o in get_file():
+			for d, l in log_lines(r, o, before):
 				if d < begin:
 					continue
 				if d < end:
@@ -201,8 +353,8 @@ def read_log(logs, begin, end, count):
 				else:
 					return
 	elif count is not None:
-		for r in get_file():
-			for d, l in get_line(r):
+		for r, o in get_file():
+			for d, l in log_lines(r, o, before):
 				if d < begin:
 					continue
 				if count == 0:
@@ -210,8 +362,8 @@ def read_log(logs, begin, end, count):
 				count -= 1
 				yield d, l
 	else:
-		for r in get_file():
-			for d, l in get_line(r):
+		for r, o in get_file():
+			for d, l in log_lines(r, o, before):
 				if d < begin:
 					continue
 				yield d, l
@@ -220,48 +372,26 @@ def rewind_log(logs, tail, end, count):
 	'''Coroutine that accepts a log folder, range and yields lines.'''
 
 	# Get the collection of files and their
-	# timestamps.
-	folder = Folder(logs.path, re=YMDTHMSF, decorate_names=False)
-	rolling = []
-	for f in folder.matching():
-		iso = f.replace('h', '-')
-		iso = iso.replace('c', ':')
-		iso = iso.replace('p', '.')
-		d = text_to_world(iso)
-		a = [
-			os.path.join(folder.path, f),
-			d,
-		]
-		rolling.append(a)
+	# timestamps, latest first.
+	rolling = log_files(logs)
 
 	if len(rolling) < 1:	   # Early exit if nothing there.
 		return
-	rolling.sort(key=lambda m: m[1], reverse=True)
+	rolling.reverse()
 
 	if end is not None and end < rolling[0][1]:	 # Timeframe before all records.
 		return
 
-	def get_file():
-		for r in rolling:
-			yield r[0]
-
-	def get_line(r):
-		with open(r, 'r') as f:
-			for line in f:
-				# convert stamp 2023-01-03T19:23:51
-				i = line.index(' ')
-				t = line[:i]
-				d = text_to_world(t)
-				yield d, line
-
 	def get_ending(n):
+		# Work back from the end of the latest
+		# file until there are enough lines.
 		ending = []
-		for r in get_file():
-			q = deque()
-			for dl in get_line(r):
-				q.append(dl)
-				if len(q) > n:
-					q.popleft()
+		for r in rolling:
+			q = []
+			for line in tail_lines(r[0], n):
+				i = line.index(' ')
+				d = text_to_world(line[:i])
+				q.append((d, line))
 			ending.append(q)
 			n -= len(q)
 			if n == 0:
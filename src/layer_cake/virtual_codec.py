@@ -62,6 +62,7 @@ __docformat__ = 'restructuredtext'
 
 import base64
 import uuid
+import itertools
 import sys
 import types
 from datetime import datetime, timedelta
@@ -253,25 +254,8 @@ def p2w_enumeration(c, p, t):
 class NotFound(object): pass
 
 def p2w_message(c, p, t):
-	message = t.element
-	rt = message.__art__
-	schema = rt.schema
-
-	w = {}
-	for k, v in schema.items():
-		c.walking_stack.append(k)
-
-		# Ensure the matching pop happens.
-		def get_put():
-			m = getattr(p, k, NotFound)
-			if m is NotFound:
-				return
-			elif m is None:
-				if is_structural(v):
-					raise ValueError(f'null structure')
-			w[k] = python_to_word(c, m, v)
-		get_put()
-		c.walking_stack.pop()
+	plan = message_plan(t.element)
+	w = plan.encode(c, p)
 	return w
 
 def p2w_array(c, p, t):
@@ -630,39 +614,8 @@ def w2p_enumeration(c, w, t):
 	return p
 
 def w2p_message(c, w, t):
-	u = t.element
-	rt = t.element.__art__
-	schema = rt.schema
-	# Use the full set of names from the schema
-	# to pull named values from the dict. If the
-	# name is not present this is assumed to be a
-	# case of skipping the encode of null values.
-	# Also the scenario enforced by the version
-	# slicing.
-	p = u()
-	for k, v in schema.items():
-		c.walking_stack.append(k)
-
-		def get_put():
-			d = w.get(k, NotFound)
-			if d is NotFound:		# Expected by schema, not present. Ignore.
-				return
-			elif d is None:
-				if is_structural(v):
-					raise ValueError(f'null structure')
-				return
-
-			def patch(p, k, a):
-				setattr(p, k, a)
-			try:
-				a = word_to_python(c, d, v)
-				setattr(p, k, a)
-			except CircularReferenceError:
-				c.patch_work.append([d, p, k, patch])
-		get_put()
-
-		c.walking_stack.pop()
-
+	plan = message_plan(t.element)
+	p = plan.decode(c, w)
 	return p
 
 def w2p_pointer(c, a, t):
@@ -997,6 +950,262 @@ def word_to_python(c, w, t):
 
 	return f(c, w, t)
 
+# Compiled plans. The schema of each registered message is
+# turned into a list of per-member encode/decode functions, once,
+# on first use. Every function is specialized for its portable
+# type, with a fast path for the exact class that the generic
+# tables would accept and a fallback to python_to_word/word_to_python
+# for everything else. Errors and unusual values therefore take
+# exactly the same route as before.
+
+def patch_attribute(p, k, a):
+	object.__setattr__(p, k, a)		# Including immutables.
+
+def patch_item(p, i, a):
+	p[i] = a
+
+def compile_encoder(t):
+	"""Generate a function that transforms python data, expected to be of type `t`."""
+	b = t.__class__
+
+	if b is UserDefined:
+		message = t.element
+		def encode(c, p):
+			if p.__class__ is not message:
+				return python_to_word(c, p, t)
+			return message_plan(message).encode(c, p)
+		return encode
+
+	if b is Enumeration:
+		element = t.element
+		def encode(c, p):
+			if p.__class__ is not element:
+				return python_to_word(c, p, t)
+			return p.name
+		return encode
+
+	if b is VectorOf or b is ArrayOf:
+		e = compile_encoder(t.element)
+		size = t.size if b is ArrayOf else None
+		def encode(c, p):
+			if p.__class__ is not list:
+				return python_to_word(c, p, t)
+			if size is not None and len(p) != size:
+				raise ValueError(f'array [{len(p)}] vs type [{size}]')
+			stack = c.walking_stack
+			w = []
+			for i, y in enumerate(p):
+				stack.append(i)
+				w.append(e(c, y))
+				stack.pop()
+			return w
+		return encode
+
+	if b is SetOf or b is DequeOf:
+		e = compile_encoder(t.element)
+		expected = set if b is SetOf else deque
+		def encode(c, p):
+			if p.__class__ is not expected:
+				return python_to_word(c, p, t)
+			return [e(c, y) for y in p]
+		return encode
+
+	if b is MapOf:
+		k_e = compile_encoder(t.key)
+		v_e = compile_encoder(t.value)
+		def encode(c, p):
+			if p.__class__ is not dict:
+				return python_to_word(c, p, t)
+			return [[k_e(c, k), v_e(c, v)] for k, v in p.items()]
+		return encode
+
+	# Everything else is a direct lookup on the class
+	# of the value, taken from the generic table.
+	jump = {a: f for (a, x), f in p2w.items() if x is b}
+	passing = {a for a, f in jump.items() if f is pass_thru}
+	if len(passing) == len(jump):
+		def encode(c, p):
+			if p.__class__ in passing:
+				return p
+			return python_to_word(c, p, t)
+		return encode
+
+	def encode(c, p):
+		f = jump.get(p.__class__, None)
+		if f is None:
+			return python_to_word(c, p, t)
+		return f(c, p, t)
+	return encode
+
+def compile_decoder(t):
+	"""Generate a function that transforms a generic word into python data of type `t`."""
+	b = t.__class__
+
+	if b is UserDefined:
+		message = t.element
+		def decode(c, w):
+			if w.__class__ is not dict:
+				return word_to_python(c, w, t)
+			return message_plan(message).decode(c, w)
+		return decode
+
+	if b is VectorOf:
+		e = compile_decoder(t.element)
+		def decode(c, w):
+			if w.__class__ is not list:
+				return word_to_python(c, w, t)
+			stack = c.walking_stack
+			p = []
+			for i, d in enumerate(w):
+				stack.append(i)
+				try:
+					p.append(e(c, d))
+				except CircularReferenceError:
+					p.append(None)
+					c.patch_work.append([d, p, i, patch_item])
+				stack.pop()
+			return p
+		return decode
+
+	if b is MapOf:
+		k_d = compile_decoder(t.key)
+		v_d = compile_decoder(t.value)
+		def decode(c, w):
+			if w.__class__ is not list:
+				return word_to_python(c, w, t)
+			p = {}
+			for d in w:
+				k = k_d(c, d[0])
+				try:
+					p[k] = v_d(c, d[1])
+				except CircularReferenceError:
+					c.patch_work.append([d[1], p, k, patch_item])
+			return p
+		return decode
+
+	# Arrays, sets and deques are less common. Along with all
+	# the other types these go to the generic table.
+	jump = {a: f for (a, x), f in w2p.items() if x is b}
+	passing = {a for a, f in jump.items() if f is pass_thru}
+	if len(passing) == len(jump):
+		def decode(c, w):
+			if w.__class__ in passing:
+				return w
+			return word_to_python(c, w, t)
+		return decode
+
+	def decode(c, w):
+		f = jump.get(w.__class__, None)
+		if f is None:
+			return word_to_python(c, w, t)
+		return f(c, w, t)
+	return decode
+
+# Types that need the pointer and address machinery
+# of a full encoding.
+NOT_FLAT = (PointerTo, Any, Address, TargetAddress)
+
+def is_flat(t, bread):
+	"""Is type `t` free of pointers, addresses and nested Any."""
+	if isinstance(t, NOT_FLAT):
+		return False
+	if isinstance(t, (VectorOf, ArrayOf, SetOf, DequeOf)):
+		return is_flat(t.element, bread)
+	if isinstance(t, MapOf):
+		return is_flat(t.key, bread) and is_flat(t.value, bread)
+	if isinstance(t, UserDefined):
+		message = t.element
+		if message in bread:
+			return True
+		bread.add(message)
+		schema = message.__art__.schema
+		if schema is None:
+			return False
+		return all(is_flat(v, bread) for v in schema.values())
+	return True
+
+class MessagePlan(object):
+	"""Compiled encoding and decoding of a registered message.
+
+	:param message: the registered class
+	:type message: :ref:`message<lc-message>`
+	"""
+	def __init__(self, message):
+		schema = message.__art__.schema
+		self.message = message
+		self.signature = portable_to_signature(UserDefined(message))
+		self.member = [(k, compile_encoder(v), compile_decoder(v), is_structural(v)) for k, v in schema.items()]
+		self.flat = is_flat(UserDefined(message), set())
+
+	def encode(self, c, p):
+		"""Transform an instance of the message into a generic dict."""
+		stack = c.walking_stack
+		w = {}
+		for k, e, _, structural in self.member:
+			m = getattr(p, k, NotFound)
+			if m is NotFound:
+				continue
+			stack.append(k)
+			if m is None and structural:
+				raise ValueError(f'null structure')
+			w[k] = e(c, m)
+			stack.pop()
+		return w
+
+	def decode(self, c, w):
+		"""Transform a generic dict into a new instance of the message.
+
+		Use the full set of names from the schema to pull named values
+		from the dict. If the name is not present this is assumed to be
+		a case of skipping the encode of null values.
+		"""
+		stack = c.walking_stack
+		p = self.message()
+		for k, _, d, structural in self.member:
+			a = w.get(k, NotFound)
+			if a is NotFound:
+				continue
+			stack.append(k)
+			if a is None:
+				if structural:
+					raise ValueError(f'null structure')
+			else:
+				try:
+					object.__setattr__(p, k, d(c, a))
+				except CircularReferenceError:
+					c.patch_work.append([a, p, k, patch_attribute])
+			stack.pop()
+		return p
+
+def message_plan(message):
+	"""Find or compile the plan for a registered message. Return a MessagePlan."""
+	rt = message.__art__
+	plan = rt.plan
+	if plan is None:
+		plan = MessagePlan(message)
+		rt.plan = plan
+	return plan
+
+def flat_plan(value, expression):
+	"""Find the plan for a top-level value that needs no pointer or address handling, or None."""
+	if isinstance(expression, UserDefined):
+		if value.__class__ is not expression.element:
+			return None
+	elif not isinstance(expression, Any) or isinstance(value, Incognito):
+		return None
+	rt = getattr(value.__class__, '__art__', None)
+	if rt is None or rt.schema is None:
+		return None
+	plan = message_plan(value.__class__)
+	if not plan.flat:
+		return None
+	return plan
+
+# Unique naming of pointer aliases and address keys, per
+# encoding. A process-wide space and a running number.
+CODEC_SPACE = str(uuid.uuid4())
+CODEC_OPERATION = itertools.count(1)
+
 # The base class for all codecs and essentially a
 # wrapping around 2 functions;
 # 1. word to text representation (w2t)
@@ -1076,20 +1285,29 @@ class Codec(object):
 		"""
 		self.address_book = address_book
 		self.walking_stack = []				# Breadcrumbs for m.a[0].f.c[1] tracking.
-		self.aliased_pointer = {}			# Pointers encountered in value.
-		self.portable_pointer = {}			# Pointers accumulated from Incognitos.
-		self.any_stack = [set()]
-		self.pointer_alias = STARTING_ALIAS
 
-		u4 = uuid.uuid4()
-		self.alias_space = str(u4)
-		self.opcode = str(u4)
+		# Messages without pointers or addresses go straight to
+		# their compiled plan. Everything else needs the tables.
+		plan = flat_plan(value, expression)
+		if plan is None:
+			self.aliased_pointer = {}			# Pointers encountered in value.
+			self.portable_pointer = {}			# Pointers accumulated from Incognitos.
+			self.any_stack = [set()]
+			self.pointer_alias = STARTING_ALIAS
+
+			space = f'{next(CODEC_OPERATION)}-{CODEC_SPACE}'
+			self.alias_space = space
+			self.opcode = space
 
 		try:
 			# Convert the value to a generic intermediate
 			# representation.
-
-			w = python_to_word(self, value, expression)
+			if plan is None:
+				w = python_to_word(self, value, expression)
+			elif isinstance(expression, Any):
+				w = [plan.signature, plan.encode(self, value), []]
+			else:
+				w = plan.encode(self, value)
 		except (AttributeError, TypeError, ValueError, IndexError, KeyError, ConversionEncodeError) as e:
 			s = str(e)
 			nesting = self.nesting()
@@ -1099,16 +1317,17 @@ class Codec(object):
 
 		# Create a dict with value, address and version.
 		shipment = {'value': w}
-		if len(self.aliased_pointer) > 0:
-			# New pointers in the p2w transformations. Need to add them
-			# to the older accumulated pointer materials (i.e. Incognitos).
-			a = {v[0]: v[1] for _, v in self.aliased_pointer.items()}
-			self.portable_pointer.update(a)
-
-		if len(self.portable_pointer) > 0:
-			# Pointers in the outbound encoding. Need to
-			# flatten then into generic form.
-			shipment['pointer'] = [[k, v] for k, v in self.portable_pointer.items()]
+		if plan is None:
+			if len(self.aliased_pointer) > 0:
+				# New pointers in the p2w transformations. Need to add them
+				# to the older accumulated pointer materials (i.e. Incognitos).
+				a = {v[0]: v[1] for _, v in self.aliased_pointer.items()}
+				self.portable_pointer.update(a)
+
+			if len(self.portable_pointer) > 0:
+				# Pointers in the outbound encoding. Need to
+				# flatten then into generic form.
+				shipment['pointer'] = [[k, v] for k, v in self.portable_pointer.items()]
 
 		try:
 			# Convert generic form to portable
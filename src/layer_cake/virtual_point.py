@@ -32,11 +32,9 @@ __docformat__ = 'restructuredtext'
 
 import os
 import inspect
-from copy import deepcopy
 import types
 import typing
 from collections import deque
-from queue import Empty
 from time import time
 from .general_purpose import *
 from .virtual_memory import *
@@ -288,7 +286,7 @@ class Point(object):
 			if pf.message_trail and xf.message_trail:
 				self.log(USER_TAG.SENT, 'Sent %s to <%08x>' % (mf.name, to[-1]))
 			if mf.copy_before_sending:
-				c = deepcopy(message)
+				c = copy_message(message)
 				send_a_message(c, to, self.object_address)
 				return
 		send_a_message(message, to, self.object_address)
@@ -330,7 +328,7 @@ class Point(object):
 			if pf.message_trail and xf.message_trail:
 				self.log(USER_TAG.SENT, 'Forward %s to <%08x> (from <%08x>)' % (mf.name, to[-1], return_address[-1]))
 			if mf.copy_before_sending:
-				c = deepcopy(message)
+				c = copy_message(message)
 				send_a_message(c, to, return_address)
 				return
 		send_a_message(message, to, return_address)
@@ -545,7 +543,7 @@ class Point(object):
 			return
 		text = self.a_kv(a, kv)
 		if text:
-			self.log(USER_LOG.DEBUG, text)
+			self.log(USER_TAG.DEBUG, text)
 
 	def trace(self, *a, **kv):
 		"""Generate a log at level TRACE.
@@ -701,11 +699,7 @@ class Player(object):
 			self.pending.append(mtr)
 
 	def flush(self):
-		try:
-			while True:
-				self.message_queue.get_nowait()
-		except Empty:
-			pass
+		self.message_queue.clear()
 		self.replaying.clear()
 		self.pending.clear()
 
@@ -130,6 +130,7 @@ class Runtime(object):
 			execution_trace=True,
 			copy_before_sending=True,
 			not_portable=False,
+			immutable=False,
 			user_logs=USER_LOG.DEBUG):
 		"""Construct the settings.
 
@@ -147,6 +148,8 @@ class Runtime(object):
 		:type copy_before_sending: bool
 		:param not_portable: prevent inappropriate send
 		:type not_portable: bool
+		:param immutable: refuse changes after construction
+		:type immutable: bool
 		:param user_logs: log level
 		:type user_logs: int
 		"""
@@ -159,7 +162,11 @@ class Runtime(object):
 		self.execution_trace = execution_trace  # Receiving
 		self.copy_before_sending = copy_before_sending
 		self.not_portable = not_portable
+		self.immutable = immutable
 		self.user_logs = user_logs			  # Object trace, warning...
+		self.plan = None					  # Compiled encode/decode.
+		self.copy = None					  # Compiled copy before send.
+		self.dispatch = None				  # Portable for handler lookup.
 
 		self.path = f'{module}.{name}'
 
@@ -1238,10 +1238,13 @@ def resource(self, word, remainder,
 		if not os.path.isdir(target_path):
 			return lc.Faulted(cannot_resource, f'folder "{target_path}" does not exist')
 
+		# Hashes are cached at the home, never in
+		# the trees being compared.
+		cache = os.path.join(home_path, lc.DIGEST_CACHE)
 		if not word:
 			if resource_path:
-				source_storage, _ = lc.storage_manifest(resource_path)
-				target_storage, _ = lc.storage_manifest(target_path)
+				source_storage, _ = lc.storage_manifest(resource_path, digest=True, cache=cache)
+				target_storage, _ = lc.storage_manifest(target_path, digest=True, cache=cache)
 			elif clear_all:
 				lc.remove_contents(target_path)
 				return None
@@ -1253,8 +1256,8 @@ def resource(self, word, remainder,
 		else:
 			if resource_path or clear_all or full_path or recursive_listing:
 				return lc.Faulted(cannot_resource, 'inappropriate argument(s)')
-			source_storage, _ = lc.storage_selection(word, path=os.getcwd())
-			target_storage, _ = lc.storage_manifest(target_path)
+			source_storage, _ = lc.storage_selection(word, path=os.getcwd(), digest=True, cache=cache)
+			target_storage, _ = lc.storage_manifest(target_path, digest=True, cache=cache)
 
 		storage_delta = [d for d in lc.storage_delta(source_storage, target_storage)]
 
@@ -0,0 +1,249 @@
+# binary_codec_test.py
+# Verify the encode/decode operation of the binary codec.
+import uuid
+
+from unittest import TestCase
+import layer_cake as lc
+from test_message import *
+__all__ = [
+	'TestCodecBinary',
+]
+
+class Telemetry(object):
+	def __init__(self, sensor: uuid.UUID=None, sequence: int=0, reading: float=0.0, flag: bool=False):
+		self.sensor = sensor
+		self.sequence = sequence
+		self.reading = reading
+		self.flag = flag
+
+lc.bind(Telemetry)
+
+list_int = lc.def_type(list[int])
+
+class TestCodecBinary(TestCase):
+	def setUp(self):
+		pass
+
+	def tearDown(self):
+		pass
+
+	def test_codec(self):
+		c = lc.CodecBinary()
+
+		# Simplest possible encode/decode cycle.
+		s = c.encode(True, lc.Boolean())
+		r = c.decode(s, lc.Boolean())
+
+		assert isinstance(s, bytes)
+		assert r == True
+
+	def test_integer(self):
+		c = lc.CodecBinary()
+		t = lc.VectorOf(lc.Integer8())
+		a = [0, 1, -1, 63, -64, 64, 2 ** 63 - 1, -2 ** 63, 2 ** 80, None]
+
+		s = c.encode(a, t)
+		b = c.decode(s, t)
+		assert b == a
+
+	def test_auto(self):
+		assert encode_decode(lc.CodecBinary(), AutoTypes)
+
+	def test_encode_failed(self):
+		c = lc.CodecBinary()
+		t = lc.UserDefined(AutoTypes)
+		r = lc.make(t)
+		r.f = AutoTypes		 # CLOBBER
+
+		try:
+			s = c.encode(r, t)
+			assert False
+		except lc.CodecRuntimeError as e:
+			assert e.note.find('near "f"') != -1
+			assert e.note.find('no transform type/Unicode') != -1
+
+	def test_decode_failed(self):
+		c = lc.CodecBinary()
+		t = lc.UserDefined(AutoTypes)
+		r = lc.make(t)
+
+		s = c.encode(r, t)
+
+		# CLOBBER
+		try:
+			s = c.decode(s[:len(s) // 2], t)
+			assert False
+		except lc.CodecRuntimeError as e:
+			pass
+
+	def test_plain(self):
+		assert encode_decode(lc.CodecBinary(), PlainTypes)
+
+	def test_container(self):
+		assert encode_decode(lc.CodecBinary(), ContainerTypes)
+
+	def test_array_of_type(self):
+		c = lc.CodecBinary()
+		a = [PlainTypes]
+
+		s = c.encode(a, lc.VectorOf(lc.Type()))
+		b = c.decode(s, lc.VectorOf(lc.Type()))
+		assert b == a
+
+	def test_special(self):
+		c = lc.CodecBinary(return_proxy=(9,))
+		t = lc.UserDefined(SpecialTypes)
+		r = lc.make(t)
+
+		r.f.append(AutoTypes)
+		r.f.append(ContainerTypes)
+		try:
+			s = c.encode(r, t)
+			b = c.decode(s, t)
+		except lc.CodecRuntimeError as e:
+			print(e.note)
+			assert False
+
+		assert b.b == (3, 5)		# Loses the 7.
+		assert b.c == (2, 4, 6, 9)  # Acquires the 9.
+
+		b.b = (3, 5, 7)	 # Restore for comparison of others.
+		b.c = (2, 4, 6)
+
+		assert lc.equal_to(b, r)
+
+	def test_time(self):
+		assert encode_decode(lc.CodecBinary(), TimeTypes)
+
+	def test_time_encoding(self):
+		c = lc.CodecBinary()
+		t = lc.UserDefined(TimeTypes)
+		r = lc.make(t)
+
+		r.c = r.c.replace(tzinfo=None)
+		try:
+			s = c.encode(r, t)
+			assert False
+		except lc.CodecRuntimeError as e:
+			assert e.note.find('naive datetime') != -1
+
+	def test_pointer(self):
+		c = lc.CodecBinary()
+		t = lc.UserDefined(PointerTypes)
+		r = lc.make(t)
+
+		try:
+			s = c.encode(r, t)
+			b = c.decode(s, t)
+		except lc.CodecRuntimeError as e:
+			print(e.note)
+			assert False
+
+		assert lc.equal_to(b.a, r.a, lc.Boolean)
+		assert lc.equal_to(b.b, r.b, lc.Boolean)
+		assert id(b.a) == id(b.b)
+		assert lc.equal_to(b.c, r.c, lc.UserDefined(PlainTypes))
+		assert isinstance(b.d, Item)
+		assert isinstance(b.e, Item)
+		assert isinstance(b.f, Cat)
+		assert isinstance(b.g, State)
+
+	def test_enumeration_fail(self):
+		c = lc.CodecBinary()
+		t = lc.UserDefined(PlainTypes)
+		r = lc.make(t)
+
+		r.p = 0
+		try:
+			s = c.encode(r, t)
+			assert False
+		except lc.CodecRuntimeError as e:
+			assert e.note.find('near "p"') != -1
+			assert e.note.find('no transform int/Enumeration') != -1
+
+	def test_array_misfit_encode(self):
+		c = lc.CodecBinary()
+		t = lc.UserDefined(ContainerTypes)
+		r = lc.make(t)
+
+		r.a = [bytes()] * 7
+
+		try:
+			s = c.encode(r, t)
+			assert False
+		except lc.CodecRuntimeError as e:
+			assert e.note.find('near "a"') != -1
+			assert e.note.find('array [7] vs') != -1
+
+	def test_trombone(self):
+		x = lc.CodecBinary(return_proxy=(6,))	# Remote client.
+		y = lc.CodecBinary(return_proxy=(9,))	# Local service.
+		t = lc.UserDefined(SpecialTypes)
+		r = lc.make(t)
+
+		s = x.encode(r, t)
+		b = y.decode(s, t)
+
+		assert b.b == (3, 5)
+		assert b.c == (2, 4)
+
+	def test_any(self):
+		c = lc.CodecBinary()
+		r = Telemetry(sensor=uuid.uuid4(), sequence=-7, reading=0.25, flag=True)
+
+		s = c.encode(r, lc.Any())
+		b = c.decode(s, lc.Any())
+		assert lc.equal_to(b, r)
+
+		v = ([1, 2, 3], list_int)
+		s = c.encode(v, lc.Any())
+		b = c.decode(s, lc.Any())
+		assert b[0] == [1, 2, 3]
+
+	def test_compact(self):
+		j = lc.CodecJson()
+		c = lc.CodecBinary()
+		r = Telemetry(sensor=uuid.uuid4(), sequence=12345, reading=98.6, flag=True)
+
+		s = j.encode(r, lc.Any())
+		b = c.encode(r, lc.Any())
+		assert len(b) * 2 < len(s)
+
+	def test_incognito(self):
+		c = lc.CodecBinary()
+		t = lc.Any()
+		r = Telemetry(sensor=uuid.uuid4(), sequence=3)
+
+		# Fiddle the type to be a non-existent,
+		# unregistered type.
+		s = c.encode(r, t)
+		name = b'binary_codec_test.Telemetry'
+		no_such_type = b'binary_codec_test.Telemetri'
+		s = s.replace(name, no_such_type)
+
+		b = c.decode(s, t)
+		assert isinstance(b, lc.Incognito) and b.type_name == no_such_type.decode()
+
+		# Carried forward and put back
+		# in place of the original.
+		s = c.encode(b, t)
+		s = s.replace(no_such_type, name)
+		b = c.decode(s, t)
+		assert lc.equal_to(b, r)
+
+	def test_json_incognito(self):
+		j = lc.CodecJson()
+		c = lc.CodecBinary()
+		t = lc.Any()
+		r = ContainerTypes()
+
+		s = j.encode(r, t)
+		s = s.replace('"test_message.ContainerTypes"', '"no-such-type"')
+		b = j.decode(s, t)
+		assert isinstance(b, lc.Incognito)
+
+		# Incognito from a JSON decoding can
+		# travel as binary.
+		s = c.encode(b, t)
+		b = c.decode(s, t)
+		assert isinstance(b, lc.Incognito) and b.type_name == 'no-such-type'
@@ -0,0 +1,99 @@
+# countdown_timer_test.py
+from time import monotonic
+from unittest import TestCase
+
+import layer_cake as lc
+from layer_cake.countdown_timer import CountdownTimer, TimerClock
+
+__all__ = [
+	'TestCountdownTimer',
+]
+
+class TestCountdownTimer(TestCase):
+	def setUp(self):
+		lc.PB.tear_down_atexit = False
+		super().__init__()
+
+	def tearDown(self):
+		lc.PB.exit_status = None
+		lc.tear_down()
+		return super().tearDown()
+
+	def test_sub_second(self):
+		with lc.channel() as ch:
+			started = monotonic()
+			ch.start(lc.T1, 0.05)
+			selected, i = ch.select(lc.T1)
+			elapsed = monotonic() - started
+		assert isinstance(selected, lc.T1)
+		assert 0.04 < elapsed < 0.2
+
+	def test_restart_and_cancel(self):
+		with lc.channel() as ch:
+			ch.start(lc.T1, 0.1)
+			ch.start(lc.T2, 5.0)
+			ch.start(lc.T1, 0.2)		# Restart replaces.
+			ch.cancel(lc.T2)
+			ch.start(lc.T3, 0.3)
+			ch.start(lc.T4, 0.6)
+			selected1, i = ch.select(lc.T1, lc.T2, lc.T3, lc.T4)
+			selected2, i = ch.select(lc.T1, lc.T2, lc.T3, lc.T4)
+			selected3, i = ch.select(lc.T1, lc.T2, lc.T3, lc.T4)
+		assert isinstance(selected1, lc.T1)
+		assert isinstance(selected2, lc.T3)
+		assert isinstance(selected3, lc.T4)
+
+	def test_restart_immediate(self):
+		with lc.channel() as ch:
+			ch.start(lc.T1, 1.0)
+			ch.start(lc.T1, 0)			# Restart at zero replaces.
+			ch.start(lc.T2, 1.3)
+			selected1, i = ch.select(lc.T1, lc.T2)
+			selected2, i = ch.select(lc.T1, lc.T2)
+		assert isinstance(selected1, lc.T1)
+		assert isinstance(selected2, lc.T2)
+
+	def test_repeating(self):
+		with lc.channel() as ch:
+			started = monotonic()
+			ch.start(lc.T1, 0.05, repeating=True)
+			for i in range(4):
+				ch.select(lc.T1)
+			ch.cancel(lc.T1)
+			elapsed = monotonic() - started
+		assert 0.19 < elapsed < 0.5
+
+	def test_heap(self):
+		countdown = CountdownTimer()
+		now = monotonic()
+		for i in range(2000):
+			countdown.schedule((i,), 1.0, False, now + i)
+		for i in range(1500):
+			countdown.discard((i,))
+		assert len(countdown.index) == 500
+		assert len(countdown.running) < 1000		# Compacted.
+		countdown.next_deadline()
+		assert countdown.published == now + 1500
+		assert countdown.clock.deadline == now + 1500
+
+	def test_clock(self):
+		clock = TimerClock()
+		assert not clock.expired(0.01)
+		clock.publish(monotonic() + 0.02)
+		assert clock.expired(1.0)
+		clock.publish(None)					# Answered.
+		assert not clock.expired(0.01)
+
+	def test_lost_tick(self):
+		countdown = CountdownTimer()
+		clock = countdown.clock
+		countdown.schedule((1,), 1.0, False, monotonic() - 1.0)
+		countdown.next_deadline()
+		assert clock.expired(0.05)			# This Tick is lost.
+		assert clock.expired(0.05)			# Sent again after the idle period.
+		assert clock.expired(0.05)
+
+		countdown.discard((1,))
+		lc.countdown_timer.CountdownTimer_Tick(countdown, lc.countdown_timer.Tick())
+		assert clock.deadline is None
+		assert not clock.expired(0.01)
@@ -23,6 +23,15 @@ __all__ = [
 	'TestDiskStorage',
 ]
 
+# Stand-in for the object running
+# a transfer.
+class TransferContext(object):
+	def __init__(self, halted=False):
+		self.halted = halted
+
+	def console(self, *args, **kw):
+		pass
+
 class TestDiskStorage(TestCase):
 	def setUp(self):
 		# Test framework doesnt like atexit.
@@ -114,3 +123,173 @@ class TestDiskStorage(TestCase):
 		walk = [s for s in lc.storage_walk(source)]
 		assert len(walk) > 10
 		lc.show_listings(source)
+
+	def test_digest(self):
+		source = os.path.join(self.temp, 'source')
+		target = os.path.join(self.temp, 'target')
+		for p in (source, target):
+			os.makedirs(os.path.join(p, 'sub'))
+			for n in ('a', 'b', os.path.join('sub', 'c')):
+				with open(os.path.join(p, n), 'w') as f:
+					f.write(n)
+		with open(os.path.join(target, 'b'), 'w') as f:
+			f.write('changed')
+		os.utime(os.path.join(source, 'a'), (0, 0))		# Same content, older.
+		os.utime(os.path.join(source, 'b'), (0, 0))		# Different content, older.
+
+		cache = os.path.join(self.temp, lc.DIGEST_CACHE)
+		s, t = lc.storage_manifest(source, digest=True)
+		assert s.manifests == 1
+		assert s.listings == 3
+		assert s.content['a'].digest == lc.file_digest(os.path.join(source, 'a'))
+		assert not os.path.exists(cache)
+
+		w, t = lc.storage_manifest(source, digest=True, cache=cache, workers=1)
+		assert w.content['sub'].content['c'].digest == s.content['sub'].content['c'].digest
+		assert sorted(os.listdir(source)) == ['a', 'b', 'sub']
+		sidecar = os.listdir(cache)
+		assert len(sidecar) == 1
+
+		# Cached hashes are trusted while the file is unchanged.
+		sidecar = os.path.join(cache, sidecar[0])
+		with open(sidecar) as f:
+			cached = json.load(f)
+		assert sorted(k.split(':')[0] for k in cached) == ['a', 'b', os.path.join('sub', 'c')]
+		for k in cached:
+			cached[k] = 'cached'
+		with open(sidecar, 'w') as f:
+			json.dump(cached, f)
+		c, t = lc.storage_manifest(source, digest=True, cache=cache)
+		assert c.content['a'].digest == 'cached'
+
+		target, t = lc.storage_manifest(target, digest=True)
+		delta = [d for d in lc.storage_delta(s, target)]
+		assert len(delta) == 1
+		assert isinstance(delta[0], lc.UpdateFile)
+		assert delta[0].source.name == 'b'
+
+	def test_transfer(self):
+		source = os.path.join(self.temp, 'source')
+		target = os.path.join(self.temp, 'target')
+		os.makedirs(os.path.join(source, 'sub', 'deeper'))
+		names = ['a', 'b', os.path.join('sub', 'c'), os.path.join('sub', 'deeper', 'd')]
+		for i, n in enumerate(names):
+			with open(os.path.join(source, n), 'wb') as f:
+				f.write(os.urandom(lc.TRANSFER_BLOCK // 3 * i + 7))
+
+		for workers in (1, lc.TRANSFER_WORKERS):
+			os.makedirs(os.path.join(target, 'sub'))
+			with open(os.path.join(target, 'b'), 'wb') as f:
+				f.write(b'stale')
+
+			s, _ = lc.storage_manifest(source, digest=True)
+			t, _ = lc.storage_manifest(target, digest=True)
+			delta = [d for d in lc.storage_delta(s, t)]
+
+			with lc.channel() as ch:
+				a = ch.create(lc.FolderTransfer, delta, t.path, workers=workers)
+				m, _ = ch.select(lc.Returned)
+			assert isinstance(m.message, lc.Ack)
+
+			for n in names:
+				with open(os.path.join(source, n), 'rb') as f, open(os.path.join(target, n), 'rb') as g:
+					assert f.read() == g.read()
+			shutil.rmtree(target)
+
+	def test_transfer_halted(self):
+		source = os.path.join(self.temp, 'source')
+		target = os.path.join(self.temp, 'target')
+		os.makedirs(source)
+		os.makedirs(target)
+		for n in ('a', 'b', 'c'):
+			with open(os.path.join(source, n), 'wb') as f:
+				f.write(b'x' * 100)
+
+		s, _ = lc.storage_manifest(source)
+		t, _ = lc.storage_manifest(target)
+		delta = [d for d in lc.storage_delta(s, t)]
+
+		r = lc.disk_storage.folder_transfer(TransferContext(halted=True), delta, target)
+		assert isinstance(r, lc.Aborted)
+		assert os.listdir(target) == []
+
+	def test_halted_before_removal(self):
+		source = os.path.join(self.temp, 'source')
+		target = os.path.join(self.temp, 'target')
+		os.makedirs(source)
+		os.makedirs(os.path.join(target, 'old'))
+		for n in ('a', 'b', 'c'):
+			with open(os.path.join(source, n), 'wb') as f:
+				f.write(b'x' * 100)
+		for n in ('z', os.path.join('old', 'y')):
+			with open(os.path.join(target, n), 'wb') as f:
+				f.write(b'z')
+
+		s, _ = lc.storage_manifest(source)
+		t, _ = lc.storage_manifest(target)
+		delta = [d for d in lc.storage_delta(s, t)]
+		copies = [d for d in delta if isinstance(d, lc.AddFile)]
+		removals = [d for d in delta if isinstance(d, (lc.RemoveFile, lc.RemoveFolder))]
+		assert copies and removals
+
+		# Halted while copying, with removals still to come.
+		context = TransferContext()
+		class Halting(object):
+			def __init__(self, d):
+				self.d = d
+			def __call__(self, dm):
+				self.d(dm)
+				context.halted = True
+		delta = [Halting(copies[0])] + copies[1:] + removals
+
+		for workers in (1, lc.TRANSFER_WORKERS):
+			context.halted = False
+			r = lc.disk_storage.folder_transfer(context, delta, target, workers=workers)
+			assert isinstance(r, lc.Aborted)
+			assert sorted(os.listdir(target)) == ['old', 'z']
+			assert os.listdir(os.path.join(target, 'old')) == ['y']
+
+	def test_patch(self):
+		source = os.path.join(self.temp, 'source')
+		target = os.path.join(self.temp, 'target')
+		os.makedirs(source)
+		os.makedirs(target)
+		b = os.urandom(lc.PATCH_BLOCK * 8)
+		with open(os.path.join(target, 'model'), 'wb') as f:
+			f.write(b)
+		b = b[:1000] + b'inserted' + b[1000:lc.PATCH_BLOCK * 5] + os.urandom(100) + b[lc.PATCH_BLOCK * 5 + 100:]
+		with open(os.path.join(source, 'model'), 'wb') as f:
+			f.write(b)
+
+		s, _ = lc.storage_manifest(source, digest=True)
+		t, _ = lc.storage_manifest(target, digest=True)
+		delta = [d for d in lc.storage_delta(s, t, patch_size=lc.PATCH_BLOCK)]
+		assert len(delta) == 1
+		assert isinstance(delta[0], lc.PatchFile)
+
+		alias = os.path.join(self.temp, 'alias')
+		reused, copied = lc.disk_storage.patch_file(TransferContext(), os.path.join(source, 'model'), os.path.join(target, 'model'), alias)
+		assert reused == lc.PATCH_BLOCK * 6
+		assert reused + copied == len(b)
+
+		# Unaligned insertion of more than can be rolled over.
+		roll, stride = lc.disk_storage.PATCH_ROLL, lc.disk_storage.PATCH_STRIDE
+		tail = os.urandom(roll + stride + lc.PATCH_BLOCK * 32)
+		old = os.path.join(self.temp, 'old')
+		with open(old, 'wb') as f:
+			f.write(tail)
+		inserted = os.path.join(self.temp, 'inserted')
+		with open(inserted, 'wb') as f:
+			f.write(os.urandom(roll * 2 + 7) + tail)
+		reused, copied = lc.disk_storage.patch_file(TransferContext(), inserted, old, alias)
+		assert reused >= lc.PATCH_BLOCK * 31
+		assert reused + copied == os.path.getsize(inserted)
+		with open(alias, 'rb') as f, open(inserted, 'rb') as g:
+			assert f.read() == g.read()
+
+		with lc.channel() as ch:
+			a = ch.create(lc.FolderTransfer, delta, t.path)
+			m, _ = ch.select(lc.Returned)
+		assert isinstance(m.message, lc.Ack)
+		with open(os.path.join(target, 'model'), 'rb') as f:
+			assert f.read() == b
@@ -161,6 +161,52 @@ class TestFolderObject(TestCase):
 		lastly = {k: m for k, m in f.recover()}
 		assert len(lastly) == 0
 
+	def test_track_changes(self):
+		t = lc.UserDefined(AutoTypes)
+		kn = (lambda m: m.b, lambda m: '%04d' % (m.b,))
+		name = os.path.join(self.temp, 'track-changes')
+		f = lc.Folder(name, tip=t, keys_names=kn, track_changes=True)
+
+		d = {}
+		for i in range(64):
+			e = lc.make(t)
+			e.b = i
+			d[i] = e
+		f.store(d)
+
+		# Change one, drop one and add one. Leave
+		# a marker in an unchanged file.
+		def path(i):
+			return os.path.join(name, '%04d.json' % (i,))
+		with open(path(1), 'a') as x:
+			x.write(' ')
+		d[3].a = not d[3].a
+		del d[4]
+		e = lc.make(t)
+		e.b = 100
+		d[100] = e
+		f.store(d)
+
+		with open(path(1), 'r') as x:
+			assert x.read().endswith(' ')
+		assert not os.path.exists(path(4))
+		assert os.path.exists(path(100))
+
+		# Recovery resets what is known.
+		from concurrent.futures import ThreadPoolExecutor
+		g = lc.Folder(name, tip=t, keys_names=kn, track_changes=True)
+		with ThreadPoolExecutor(4) as pool:
+			r = {k: m for k, m in g.recover(executor=pool)}
+		assert sorted(r.keys()) == sorted(d.keys())
+		assert lc.equal_to(r[3], d[3], t)
+		with open(path(2), 'a') as x:
+			x.write(' ')
+		g.store(r)
+		with open(path(1), 'r') as x:
+			assert not x.read().endswith(' ')
+		with open(path(2), 'r') as x:
+			assert x.read().endswith(' ')
+
 	def test_trees(self):
 		t = lc.UserDefined(AutoTypes)
 		kn = (lambda m: m.b, lambda m: '%04d' % (m.b,))
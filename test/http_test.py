@@ -0,0 +1,345 @@
+# http_test.py
+# Verify the recovery of HTTP frames from byte streams.
+from unittest import TestCase
+
+import layer_cake as lc
+from layer_cake.http import LARGE_BODY, REQUEST_LENGTH, SECTION_SIZE, CHUNK_WINDOW, stream_response
+from layer_cake.listen_connect import *
+from test_ip import *
+
+__all__ = [
+	'TestHttp',
+]
+
+class Xy(object):
+	def __init__(self, x: int=1, y: int=1):
+		self.x = x
+		self.y = y
+
+lc.bind(Xy)
+
+TEST_PORT = TEST_PORT_START + 125
+
+class FakeRequest(object):
+	def __init__(self):
+		self.default_to_request = True
+		self.layer_cake_json = False
+		self.stream_body = False
+
+class FakeParent(object):
+	def __init__(self):
+		self.named_type = {'Xy': Xy}
+		self.search_subs = None
+		self.request = FakeRequest()
+
+class FakeTransport(object):
+	def __init__(self, stream_body=False):
+		self.codec = lc.CodecJson()
+		self.return_proxy = (1,)
+		self.local_termination = (2,)
+		self.parent = FakeParent()
+		self.parent.request.stream_body = stream_body
+		self.encoded_bytes = bytearray()
+		self.receiving = True
+		self.resumed = False
+
+def recover(stream, data, size=None):
+	size = size or len(data) or 1
+	recovered = []
+	for i in range(0, len(data) or 1, size):
+		for m, t, r in stream.recover_message(data[i:i + size], None):
+			recovered.append(m)
+	return recovered
+
+XY_JSON = lc.CodecJson().encode(Xy(3, 4), lc.UserDefined(Xy)).encode('utf-8')
+POST_XY = b'POST /Xy HTTP/1.1\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n' % (len(XY_JSON),) + XY_JSON
+
+class TestHttp(TestCase):
+	def setUp(self):
+		lc.PB.tear_down_atexit = False
+		super().__init__()
+
+	def tearDown(self):
+		lc.PB.exit_status = None
+		lc.tear_down()
+		return super().tearDown()
+
+	def test_request(self):
+		for size in (None, 1, 7):
+			stream = lc.ApiServerStream(FakeTransport())
+			recovered = recover(stream, POST_XY * 3, size)
+			assert len(recovered) == 3
+			for m in recovered:
+				assert isinstance(m, Xy)
+				assert m.x == 3 and m.y == 4
+
+	def test_http_request(self):
+		stream = lc.ApiServerStream(FakeTransport())
+		recovered = recover(stream, b'GET /other HTTP/1.1\nHost: localhost\nX-Padded:  value \n\n')
+		assert len(recovered) == 1
+		m = recovered[0]
+		assert isinstance(m, lc.HttpRequest)
+		assert m.method == 'GET' and m.request_uri == '/other' and m.http == 'HTTP/1.1'
+		assert m.header == {'Host': 'localhost', 'X-Padded': ' value '}
+		assert m.body is None
+
+	def test_query(self):
+		stream = lc.ApiServerStream(FakeTransport())
+		recovered = recover(stream, b'GET /Xy?x=10&y=20 HTTP/1.1\r\n\r\n')
+		assert isinstance(recovered[0], Xy)
+		assert recovered[0].x == 10 and recovered[0].y == 20
+
+	def test_form_body(self):
+		stream = lc.ApiServerStream(FakeTransport())
+		form = b'POST /Xy HTTP/1.1\r\nContent-Type: application/x-www-form-urlencoded\r\nContent-Length: %d\r\n\r\n'
+		recovered = recover(stream, form % (9,) + b'x=10&y=20' + form % (10,) + b'x=10&y=abc')
+		assert isinstance(recovered[0], Xy)
+		assert recovered[0].x == 10 and recovered[0].y == 20
+		m = recovered[1]
+		assert isinstance(m, lc.HttpResponse) and m.status_code == 400
+		assert 'no conversion for "y"' in m.body
+
+	def test_resource_dispatch(self):
+		form = lc.ReForm('/{resource}(/{identity})?', resource='[a-z]+', identity='[0-9]+')
+		t = FakeTransport()
+		t.parent.search_subs = form.compile_form()
+		stream = lc.ApiServerStream(t)
+
+		def get_all(layer):
+			return 'all'
+		def get_one(layer, identity=None):
+			return identity
+		def put_one(layer, identity=None, body=None):
+			return identity, body
+
+		dispatch = lc.ResourceDispatch(form, [Xy])
+		dispatch.add(Xy, lc.HttpMethod.GET, get_all)
+		dispatch.add(Xy, lc.HttpMethod.GET, get_one, identity=int)
+		dispatch.add(Xy, lc.HttpMethod.PUT, put_one, identity=int, body=lc.decode_body(Xy))
+
+		data = (b'GET /xy HTTP/1.1\r\n\r\n'
+			b'GET /xy/42 HTTP/1.1\r\n\r\n'
+			b'PUT /xy/7 HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (len(XY_JSON),) + XY_JSON +
+			b'DELETE /xy/7 HTTP/1.1\r\n\r\n'
+			b'GET /other HTTP/1.1\r\n\r\n'
+			b'GET /xy/99999999999999999999x HTTP/1.1\r\n\r\n')
+		recovered = recover(stream, data)
+		assert all(isinstance(m, lc.FormRequest) for m in recovered[:5])
+
+		f, a = dispatch.lookup(recovered[0])
+		assert f(None, **a) == 'all'
+		f, a = dispatch.lookup(recovered[1])
+		assert f(None, **a) == 42
+		f, a = dispatch.lookup(recovered[2])
+		identity, body = f(None, **a)
+		assert identity == 7 and isinstance(body, Xy) and body.x == 3
+		f, a = dispatch.lookup(recovered[3])
+		assert f is lc.cannot_be_dispatched and a['error'] == 'no matching call signature'
+		f, a = dispatch.lookup(recovered[4])
+		assert f is lc.cannot_be_dispatched and a['error'] == 'unusable resource, method or URI'
+		assert isinstance(recovered[5], lc.HttpResponse) and recovered[5].status_code == 400
+
+	def test_discard(self):
+		stream = lc.ApiServerStream(FakeTransport())
+		long_method = b'ABCDEFGHIJK /Xy HTTP/1.1\r\n\r\n'
+		bad_header = b'POST /Xy HTTP/1.1\r\nBad:value\r\n\r\n'
+		long_request = b'GET /' + b'x' * REQUEST_LENGTH + b' HTTP/1.1\r\n\r\n'
+		recovered = recover(stream, long_method + bad_header + long_request + POST_XY, 1024)
+		assert len(recovered) == 1
+		assert isinstance(recovered[0], Xy)
+
+	def test_response(self):
+		t = FakeTransport()
+		stream = lc.ApiClientStream(t)
+		data = b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok' + b'HTTP/1.1 204 \r\n\r\n'
+		recovered = recover(stream, data, 5)
+		assert len(recovered) == 2
+		m = recovered[0]
+		assert isinstance(m, lc.HttpResponse)
+		assert m.status_code == 200 and m.reason_phrase == 'OK'
+		assert m.body == bytearray(b'ok')
+		m = recovered[1]
+		assert m.status_code == 204 and m.reason_phrase == 'OK'		# Defaulted.
+		assert m.body is None
+
+		t.parent.request.layer_cake_json = True
+		body = t.codec.encode(Xy(5, 6), lc.Any()).encode('utf-8')
+		data = b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n' % (len(body),) + body
+		recovered = recover(stream, data, 3)
+		assert isinstance(recovered[0], Xy)
+		assert recovered[0].x == 5 and recovered[0].y == 6
+
+	def test_chunked_request(self):
+		chunked = (b'POST /upload HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+			b'5\r\nhello\r\n6;name=value\r\n world\r\n0\r\nX-Trailer: t\r\n\r\n')
+		for size in (None, 1, 7):
+			stream = lc.ApiServerStream(FakeTransport(stream_body=True))
+			recovered = recover(stream, chunked + POST_XY, size)
+			assert len(recovered) == 5
+			m = recovered[0]
+			assert isinstance(m, lc.HttpRequest)
+			assert m.request_uri == '/upload' and m.body is None
+			assert [c.block for c in recovered[1:4]] == [b'hello', b' world', b'']
+			assert isinstance(recovered[4], Xy)
+
+	def test_whole_body(self):
+		chunked = (b'POST /upload HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+			b'5\r\nhello\r\n6;name=value\r\n world\r\n0\r\nX-Trailer: t\r\n\r\n')
+		for size in (None, 1, 7):
+			stream = lc.ApiServerStream(FakeTransport())
+			recovered = recover(stream, chunked + POST_XY, size)
+			assert len(recovered) == 2
+			m = recovered[0]
+			assert isinstance(m, lc.HttpRequest)
+			assert m.request_uri == '/upload' and m.body == b'hello world'
+			assert isinstance(recovered[1], Xy)
+
+		t = FakeTransport()
+		stream = lc.ApiServerStream(t)
+		body = b'x' * (LARGE_BODY + 1)
+		large = b'POST /upload HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n%x\r\n' % (len(body),) + body + b'\r\n0\r\n\r\n'
+		recovered = recover(stream, large + POST_XY, 10000)
+		assert len(recovered) == 1
+		assert isinstance(recovered[0], Xy)
+		assert t.receiving
+
+	def test_large_body(self):
+		t = FakeTransport(stream_body=True)
+		stream = lc.ApiServerStream(t)
+		body = bytes(range(256)) * (LARGE_BODY // 256) + b'!'
+		large = b'POST /Xy HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (len(body),) + body
+		recovered = recover(stream, large + POST_XY, 10000)
+		assert isinstance(recovered[0], lc.HttpRequest)
+		chunks = recovered[1:-1]
+		assert all(len(c.block) <= SECTION_SIZE for c in chunks)
+		assert b''.join(c.block for c in chunks) == body
+		assert len(chunks[-1].block) == 0
+		assert isinstance(recovered[-1], Xy)
+		assert t.receiving
+
+	def test_window(self):
+		t = FakeTransport(stream_body=True)
+		stream = lc.ApiServerStream(t)
+		chunked = b'POST /upload HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n' + b'1\r\nx\r\n' * 10 + b'0\r\n\r\n'
+		recovered = recover(stream, chunked)
+		assert len(recovered) == 1 + CHUNK_WINDOW
+		assert not t.receiving
+
+		stream.streamed(lc.HttpChunkAck())
+		assert t.receiving and t.resumed
+		recovered = recover(stream, b'')
+		assert len(recovered) == 1
+		assert not t.receiving
+
+		for i in range(CHUNK_WINDOW):
+			stream.streamed(lc.HttpChunkAck())
+		recovered = recover(stream, b'')
+		assert [c.block for c in recovered] == [b'x', b'']
+		assert t.receiving
+
+	def test_chunk_errors(self):
+		head = b'POST /upload HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+		for bad in (b'zz\r\n', b'3\r\nabcd\r\n', b'1\r\nx\r\n0\r\nbad trailer\r\n'):
+			stream = lc.ApiServerStream(FakeTransport())
+			with self.assertRaises(ValueError):
+				recover(stream, head + bad)
+
+	def test_chunked_response(self):
+		t = FakeTransport(stream_body=True)
+		stream = lc.ApiClientStream(t)
+		data = bytearray()
+		stream_response(data, header={'Transfer-Encoding': 'chunked'}, body=b'abc')
+		assert b'Content-Length' not in data
+		assert data.endswith(b'\r\n\r\n3\r\nabc\r\n')
+
+		t.encoded_bytes = data
+		stream.streamed(lc.HttpChunk(bytearray(b'defghijklmnopqrstuvwxyz')))
+		stream.streamed(lc.HttpChunk())
+		assert data.endswith(b'17\r\ndefghijklmnopqrstuvwxyz\r\n0\r\n\r\n')
+
+		recovered = recover(stream, bytes(data), 4)
+		assert isinstance(recovered[0], lc.HttpResponse)
+		assert recovered[0].status_code == 200 and recovered[0].body is None
+		assert b''.join(c.block for c in recovered[1:]) == b'abcdefghijklmnopqrstuvwxyz'
+		assert len(recovered[-1].block) == 0
+
+	def test_streaming(self):
+		sections = 3 * CHUNK_WINDOW
+		with lc.channel() as ch:
+			listen(ch, requested_ipp=lc.HostPort('127.0.0.1', TEST_PORT + 1), http_server=[Xy], stream_body=True)
+			selected, i = ch.select(Listening)
+			connect(ch, requested_ipp=lc.HostPort('127.0.0.1', TEST_PORT + 1), http_client='/', stream_body=True)
+			session = None
+			while session is None:
+				m = ch.input()
+				if isinstance(m, Connected):
+					session = ch.return_address
+
+			# Upload.
+			chunked = {'Transfer-Encoding': 'chunked', 'Content-Type': 'application/octet-stream'}
+			ch.send(lc.HttpRequest(request_uri='upload', header=chunked), session)
+			for i in range(sections):
+				ch.send(lc.HttpChunk(bytearray(b'%d,' % (i,))), session)
+			ch.send(lc.HttpChunk(), session)
+
+			uploaded = bytearray()
+			while True:
+				m = ch.input()
+				if isinstance(m, lc.HttpRequest):
+					proxy = ch.return_address
+				elif isinstance(m, lc.HttpChunk):
+					ch.reply(lc.HttpChunkAck())
+					if not m.block:
+						break
+					uploaded += m.block
+
+			# Download.
+			ch.send(lc.HttpResponse(header=chunked), proxy)
+			for i in range(sections):
+				ch.send(lc.HttpChunk(bytearray(b'%d;' % (i,))), proxy)
+			ch.send(lc.HttpChunk(), proxy)
+
+			downloaded = bytearray()
+			while True:
+				m = ch.input()
+				if isinstance(m, lc.HttpResponse):
+					assert m.status_code == 200
+				elif isinstance(m, lc.HttpChunk):
+					ch.reply(lc.HttpChunkAck())
+					if not m.block:
+						break
+					downloaded += m.block
+
+			ch.send(Close(), session)
+			ch.select(Closed)
+		assert uploaded == b''.join(b'%d,' % (i,) for i in range(sections))
+		assert downloaded == b''.join(b'%d;' % (i,) for i in range(sections))
+
+	def test_pool(self):
+		requests = 40
+		with lc.channel() as ch:
+			listen(ch, requested_ipp=lc.HostPort('127.0.0.1', TEST_PORT + 0), http_server=[Xy])
+			selected, i = ch.select(Listening)
+			pool = ch.create(lc.ApiClientPool, lc.HostPort('127.0.0.1', TEST_PORT + 0),
+				connections=3, pipelining=4, layer_cake_json=True)
+			for x in range(requests):
+				ch.send(Xy(x, 1), pool)
+
+			served = set()
+			responses = []
+			while len(responses) < requests:
+				m = ch.input()
+				if isinstance(m, Accepted):
+					continue
+				assert isinstance(m, Xy)
+				if m.y == 1:
+					served.add(ch.return_address)
+					ch.reply(Xy(m.x * 10, 2))
+				else:
+					responses.append(m.x)
+
+			ch.send(lc.Stop(), pool)
+			while not isinstance(ch.input(), lc.Returned):
+				pass
+		assert sorted(responses) == [x * 10 for x in range(requests)]
+		assert len(served) > 1
@@ -0,0 +1,117 @@
+# journal_object_test.py
+# Verify the storage of maps as a journal.
+import os
+
+from unittest import TestCase
+
+from test_message import *
+
+import shutil, tempfile
+import layer_cake as lc
+import layer_cake.journal_object as jo
+
+__all__ = [
+	'TestJournalObject',
+]
+
+kn = (lambda m: m.b, lambda m: '%04d' % (m.b,))
+
+class TestJournalObject(TestCase):
+	def setUp(self):
+		self.temp = tempfile.mkdtemp()
+		self.name = os.path.join(self.temp, 'map.journal')
+
+	def tearDown(self):
+		shutil.rmtree(self.temp)
+
+	def test_map_cycle(self):
+		t = lc.UserDefined(AutoTypes)
+		j = lc.Journal(self.name, tip=t, keys_names=kn)
+
+		d = {}
+		for i in range(20):
+			e = lc.make(t)
+			e.b = i
+			d[i] = e
+		j.store(d)
+
+		r = {k: m for k, m in lc.Journal(self.name, tip=t, keys_names=kn).recover()}
+		assert len(r) == 20
+		assert isinstance(r[5], AutoTypes)
+		assert lc.equal_to(r[5], d[5], t)
+
+	def test_add_update_remove(self):
+		t = lc.UserDefined(AutoTypes)
+		j = lc.Journal(self.name, tip=t, keys_names=kn)
+		r = {k: m for k, m in j.recover()}
+		assert len(r) == 0
+
+		for i in range(256):
+			e = lc.make(t)
+			e.b = i
+			j.add(r, e)
+		with self.assertRaises(ValueError):
+			j.add(r, r[7])
+
+		u = lc.make(t)
+		u.b = 7
+		u.f = 'updated'
+		j.update(r, u)
+		j.remove(r, r[210])
+		j.close()
+
+		lastly = {k: m for k, m in lc.Journal(self.name, tip=t, keys_names=kn).recover()}
+		assert len(lastly) == 255
+		assert 210 not in lastly
+		assert lastly[7].f == 'updated'
+
+		j.clear(r)
+		assert len(r) == 0
+		assert len([k for k in j.recover()]) == 0
+
+	def test_interrupted(self):
+		t = lc.UserDefined(AutoTypes)
+		j = lc.Journal(self.name, tip=t, keys_names=kn)
+		r = {}
+		for i in range(4):
+			e = lc.make(t)
+			e.b = i
+			j.add(r, e)
+		j.close()
+
+		# Half a line at the end.
+		with open(self.name, 'ab') as f:
+			f.write(b'+\t0004\t{"value": {')
+		j = lc.Journal(self.name, tip=t, keys_names=kn)
+		r = {k: m for k, m in j.recover()}
+		assert len(r) == 4
+
+		e = lc.make(t)
+		e.b = 4
+		j.add(r, e)
+		j.close()
+		r = {k: m for k, m in lc.Journal(self.name, tip=t, keys_names=kn).recover()}
+		assert len(r) == 5
+
+	def test_compact(self):
+		t = lc.UserDefined(AutoTypes)
+		j = lc.Journal(self.name, tip=t, keys_names=kn)
+		r = {}
+		e = lc.make(t)
+		e.b = 1
+		j.add(r, e)
+
+		saved = jo.COMPACT_MINIMUM
+		jo.COMPACT_MINIMUM = 8
+		try:
+			for i in range(100):
+				j.update(r, e)
+		finally:
+			jo.COMPACT_MINIMUM = saved
+		j.close()
+
+		with open(self.name, 'rb') as f:
+			lines = f.readlines()
+		assert len(lines) < 12
+		r = {k: m for k, m in lc.Journal(self.name, tip=t, keys_names=kn).recover()}
+		assert len(r) == 1
@@ -398,6 +398,23 @@ class TestCodecJson(TestCase):
 		# An Incognito is created inside the library.
 		assert isinstance(b, lc.Incognito) and b.type_name == no_such_type
 
+	def test_plan(self):
+		c = lc.CodecJson()
+		plan = lc.virtual_codec.message_plan(PlainTypes)
+		assert plan is lc.virtual_codec.message_plan(PlainTypes)
+		assert plan.flat
+		assert not lc.virtual_codec.message_plan(PointerTypes).flat
+
+		r = lc.make(lc.UserDefined(PlainTypes))
+		s = c.encode(r, lc.Any())
+		b = c.decode(s, lc.Any())
+		assert isinstance(b, PlainTypes)
+		assert lc.equal_to(b, r)
+
+		s = c.encode(r, lc.UserDefined(PlainTypes))
+		b = c.decode(s, lc.UserDefined(PlainTypes))
+		assert lc.equal_to(b, r)
+
 	def test_code_usage_return(self):
 		try:
 			c = lc.CodecJson(return_proxy=8)
@@ -1,9 +1,12 @@
 # object_startup_test.py
 import uuid
+import socket
 from unittest import TestCase
 
 import layer_cake as lc
 from layer_cake.listen_connect import *
+from layer_cake.listen_connect import MessageStream, NUMBER_OF_DIGITS, GIANT_FRAME
+from layer_cake.listen_connect import SelectEngine, SelectorsEngine, OutboundBytes, Relay, TcpClient
 from test_ip import *
 
 __all__ = [
@@ -130,4 +133,186 @@ class TestListenConnect(TestCase):
 			selected, i = ch.select()
 		assert isinstance(selected, lc.Ack)
 
+	def exchange(self, port, listen_binary, connect_binary, encrypted=False):
+		# Note the first byte of every header that arrives at the
+		# connecting end. A JSON header starts with a brace.
+		received = []
+		recover_frame = MessageStream.recover_frame
+		def recording(stream, block):
+			for f in recover_frame(stream, block):
+				if isinstance(stream.transport.parent, TcpClient):
+					received.append(f[0][:1])
+				yield f
+		MessageStream.recover_frame = recording
+		try:
+			selected = self.round_trip(port, listen_binary, connect_binary, encrypted)
+		finally:
+			MessageStream.recover_frame = recover_frame
+		return selected, received
+
+	def round_trip(self, port, listen_binary, connect_binary, encrypted):
+		with lc.channel() as ch:
+			listen(ch, requested_ipp=lc.HostPort('127.0.0.1', port), encrypted=encrypted, binary=listen_binary)
+			selected1, i = ch.select()
+			connect(ch, requested_ipp=lc.HostPort('127.0.0.1', port), encrypted=encrypted, binary=connect_binary)
+			selected2, i = ch.select()
+			if isinstance(selected2, Connected):
+				server = ch.return_address
+			selected3, i = ch.select()
+			if isinstance(selected3, Connected):
+				server = ch.return_address
+			ch.send(lc.cast_to(42, lc.int_type), server)
+			selected, i = ch.select()
+			assert selected == 42
+			ch.send(lc.cast_to([[0.125, 30.02],[0.5, 2.5],[1.1, 2.2, 3.3]], table_type), server)
+			selected, i = ch.select()
+			assert selected[0] == [0.125, 30.02]
+			ch.send(lc.Ack(), server)
+			selected, i = ch.select()
+			ch.reply(lc.cast_to(7, lc.int_type))		# Back to the connecting end.
+			echo, i = ch.select()
+			assert echo == 7
+		return selected
+
+	def test_send_binary(self):
+		selected, received = self.exchange(TEST_PORT + 7, True, True)
+		assert isinstance(selected, lc.Ack)
+		assert received[-1] != b'{'
+
+	def test_send_binary_encrypted(self):
+		selected, received = self.exchange(TEST_PORT + 8, True, True, encrypted=True)
+		assert isinstance(selected, lc.Ack)
+		assert received[-1] != b'{'
+
+	def test_send_binary_declined(self):
+		selected, received = self.exchange(TEST_PORT + 9, False, True)
+		assert isinstance(selected, lc.Ack)
+		assert received and all(b == b'{' for b in received)
+
+	def test_recover_frame(self):
+		frame = b'3,4,10\nabcdefghij\n'
+		stream = MessageStream(FrameTransport())
+		whole = [f for f in stream.recover_frame(frame + frame)]
+		split = []
+		for c in frame:
+			split.extend(stream.recover_frame(bytes([c])))
+		assert len(whole) == 2
+		assert len(split) == 1
+		h, b, a = split[0]
+		assert h == b'abc'
+		assert b == b'defg'
+		assert a == b'hij'
+
+	def test_recover_frame_limits(self):
+		stream = MessageStream(FrameTransport())
+		with self.assertRaises(OverflowError):
+			list(stream.recover_frame(b'1' * (NUMBER_OF_DIGITS + 1)))
+		stream = MessageStream(FrameTransport())
+		with self.assertRaises(OverflowError):
+			list(stream.recover_frame(f'0,0,{GIANT_FRAME + 1}\n'.encode('ascii')))
+		stream = MessageStream(FrameTransport())
+		with self.assertRaises(ValueError):
+			list(stream.recover_frame(b'0,0,x\n'))
+		stream = MessageStream(FrameTransport())
+		with self.assertRaises(ValueError):
+			list(stream.recover_frame(b'0,0,2\nab!'))
+
+	def test_engine_interest(self):
+		for engine_type in (SelectEngine, SelectorsEngine):
+			engine = engine_type()
+			a, b = socket.socketpair()
+			engine.register(a, sending=True)
+			R, S, F = engine.wait()
+			assert a in S
+			engine.interest(a, sending=False)
+			b.send(b'X')
+			R, S, F = engine.wait()
+			assert a in R and a not in S
+			engine.unregister(a)
+			engine.close()
+			a.close()
+			b.close()
+
+	def test_engine_pause(self):
+		for engine_type in (SelectEngine, SelectorsEngine):
+			engine = engine_type()
+			c, d = socket.socketpair()
+			engine.register(c)
+			a, b = socket.socketpair()
+			engine.register(a)
+			b.send(b'X')
+			engine.pause(a)
+			d.send(b'Y')
+			R, S, F = engine.wait()
+			assert a not in R and c in R
+			engine.interest(a, sending=True)
+			engine.interest(a, sending=False)
+			engine.resume(a)
+			R, S, F = engine.wait()
+			assert a in R
+			engine.unregister(a)
+			engine.unregister(c)
+			engine.close()
+			for s in (a, b, c, d):
+				s.close()
+
+	def test_outbound_bytes(self):
+		a, b = socket.socketpair()
+		outbound = OutboundBytes()
+		outbound += b'0123'
+		outbound += bytearray(b'456')
+		outbound += b''
+		outbound += b'789'
+		assert len(outbound) == 10
+		received = bytearray()
+		while len(outbound):
+			outbound.send(a, 4)
+			received += b.recv(16)
+		assert received == b'0123456789'
+		assert len(outbound.block) == 0
+		a.close()
+		b.close()
+
+	def test_relay_incognito(self):
+		# Unregistered type arriving from a binary peer and
+		# headed on to a JSON peer.
+		b = lc.CodecBinary().encode(Relayed(value=7), lc.Any())
+		b = b.replace(b'listen_connect_test.Relayed', b'listen_connect_test.Relayex')
+		incognito = lc.CodecBinary().decode(b, lc.Any())
+		assert isinstance(incognito, lc.Incognito)
+
+		transport = JsonTransport()
+		stream = MessageStream(transport)
+		stream.message_to_block((Relay(b, {}, True), (1, 2), (3,)))
+		stream.message_to_block((incognito, (1,), (3,)))
+		stream.message_to_block((lc.Ack(), (1,), (3,)))
+
+		frames = list(MessageStream(FrameTransport()).recover_frame(bytes(transport.encoded_bytes)))
+		assert len(frames) == 3
+		for h, b_, a in frames[:2]:
+			assert h[:1] != b'{'
+			r = lc.CodecBinary().decode(bytes(b_), lc.Any())
+			assert isinstance(r, lc.Incognito)
+			assert r.type_name == 'listen_connect_test.Relayex'
+		h, b_, a = frames[2]
+		assert h[:1] == b'{'
+
+class FrameTransport(object):
+	def __init__(self):
+		self.key_box = None
+
+class JsonTransport(object):
+	def __init__(self):
+		self.key_box = None
+		self.binary = False
+		self.codec = lc.CodecJson()
+		self.binary_codec = lc.CodecBinary()
+		self.encoded_bytes = bytearray()
+
+class Relayed(object):
+	def __init__(self, value: int=0):
+		self.value = value
+
+lc.bind(Relayed)
+
 table_type = lc.def_type(list[list[float]])
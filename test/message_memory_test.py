@@ -91,8 +91,36 @@ class InferType(object):
 	def __init__(self, a=1):
 		self.a = a
 
+class Frozen(object):
+	def __init__(self, a: int=None, b: list[int]=None):
+		self.a = a
+		self.b = b or []
+
+class Copied(object):
+	def __init__(self, a: int=None, b: list[list[int]]=None, c: dict[str, M]=None, d: Frozen=None, e: bytearray=None):
+		self.a = a
+		self.b = b or []
+		self.c = c or {}
+		self.d = d
+		self.e = e or bytearray()
+
 lc.bind_message(C)
 lc.bind_message(M)
+lc.bind_message(Frozen, immutable=True)
+lc.bind_message(Copied)
+
+class FrozenMore(Frozen):
+	def __init__(self, a: int=None, b: list[int]=None, c: list[int]=None):
+		super().__init__(a=a, b=b)
+		self.c = c or []
+
+class FrozenSame(Frozen):
+	pass
+
+class CopiedMore(Copied):
+	def __init__(self, a: int=None, f: list[int]=None):
+		super().__init__(a=a)
+		self.f = f or []
 
 '''
 
@@ -514,3 +542,52 @@ class TestMessageMemory(TestCase):
 		assert size == 8
 		assert element.element == C
 	'''
+
+	def test_immutable(self):
+		f = Frozen(a=1, b=[2])
+		assert f.a == 1
+		with self.assertRaises(lc.MessageImmutableError):
+			f.a = 2
+		with self.assertRaises(AttributeError):
+			del f.b
+		assert lc.copy_message(f) is f
+
+		c = lc.CodecJson()
+		s = c.encode(f, lc.Any())
+		d = c.decode(s, lc.Any())
+		assert isinstance(d, Frozen) and d.b == [2]
+		with self.assertRaises(lc.MessageImmutableError):
+			d.a = 2
+
+	def test_copy_message(self):
+		f = Frozen(a=1)
+		a = Copied(a=1, b=[[1, 2], [3]], c={'m': M(a=2, b=0.5)}, d=f, e=bytearray(b'xyz'))
+		b = lc.copy_message(a)
+		assert lc.equal_to(a, b)
+		assert b.b is not a.b and b.b[0] is not a.b[0]
+		assert b.c['m'] is not a.c['m']
+		assert b.d is f
+		assert b.e is not a.e
+
+		a = CopiedMore(a=1, f=[[1], 2])
+		a.g = {'h': [3]}
+		b = lc.copy_message(a)
+		assert isinstance(b, CopiedMore)
+		assert b.f == a.f and b.f is not a.f and b.f[0] is not a.f[0]
+		assert b.g == a.g and b.g['h'] is not a.g['h']
+
+	def test_immutable_subclass(self):
+		f = FrozenMore(a=1, b=[2], c=[3])
+		assert f.c == [3]
+		with self.assertRaises(lc.MessageImmutableError):
+			f.a = 2
+		with self.assertRaises(lc.MessageImmutableError):
+			f.c = None
+		assert lc.copy_message(f) is f
+
+		f = FrozenSame(a=1)
+		with self.assertRaises(lc.MessageImmutableError):
+			f.a = 2
+		f = Frozen(a=1)
+		with self.assertRaises(lc.MessageImmutableError):
+			f.a = 2
@@ -12,6 +12,7 @@ import layer_cake as lc
 import layer_cake.object_space as lcs
 import layer_cake.message_pump as lcp
 import layer_cake.point_runtime as lcr
+import layer_cake.log_agent as lca
 
 __all__ = [
 	'TestSpacing',
@@ -80,3 +81,97 @@ class TestSpacing(TestCase):
 		assert t == a1
 		assert r == a2
 
+
+	def test_contention(self):
+		# Threads sending round-robin between pumps while
+		# another thread creates and destroys objects.
+		import threading
+		senders = 8
+		count = 2000
+
+		pumps = [lcs.create_an_object(ObjectWithPump, None, None, (), {}) for _ in range(senders)]
+		running = True
+
+		def churn():
+			while running:
+				a, _ = lcs.create_an_object(ObjectWithPump, None, None, (), {})
+				lcs.destroy_an_object(a)
+
+		def send(n):
+			a = pumps[n][0]
+			for i in range(count):
+				b = pumps[(n + i) % senders][0]
+				lcs.send_a_message(lcr.Start(), b, a)
+
+		c = threading.Thread(target=churn)
+		c.start()
+		s = [threading.Thread(target=send, args=(n,)) for n in range(senders)]
+		for t in s:
+			t.start()
+		for t in s:
+			t.join()
+		running = False
+		c.join()
+
+		received = 0
+		for a, p in pumps:
+			while not p.message_queue.empty():
+				p.get()
+				received += 1
+			lcs.destroy_an_object(a)
+		assert received == senders * count
+
+	def test_mailbox(self):
+		import threading
+		mailbox = lcp.Mailbox(maxsize=4)
+		for i in range(4):
+			mailbox.put([i, None, None], False)
+		with self.assertRaises(lcp.Full):
+			mailbox.put([4, None, None], False)
+
+		# Drained but not taken, still counts.
+		assert mailbox.get()[0] == 0
+		mailbox.put([4, None, None], False)
+		with self.assertRaises(lcp.Full):
+			mailbox.put([5, None, None], False)
+
+		# Blocked sender resumes after the batch is taken.
+		sender = threading.Thread(target=mailbox.put, args=([5, None, None], True))
+		sender.start()
+		received = [mailbox.get()[0] for i in range(5)]
+		sender.join()
+		assert received == [1, 2, 3, 4, 5]
+		assert mailbox.empty()
+
+		with self.assertRaises(lcp.Empty):
+			mailbox.get_nowait()
+		mailbox.put([6, None, None])
+		mailbox.clear()
+		assert mailbox.empty()
+
+	def test_log_mailbox(self):
+		def log(tag, i):
+			return [lc.PointLog(stamp=float(i), tag=tag, address=(i,), name='x', text=''), None, None]
+
+		mailbox = lca.LogMailbox(maxsize=4, overflow=lc.LogOverflow.DROP_OLDEST)
+		for i in range(6):
+			mailbox.put(log(lc.USER_TAG.CONSOLE, i), True)
+		mailbox.put([lc.Stop(), None, None], True)
+		received = [mailbox.get()[0] for i in range(5)]
+		assert [m.address[0] for m in received[:4]] == [2, 3, 4, 5]
+		assert isinstance(received[4], lc.Stop)
+		assert mailbox.take_dropped() == {lc.USER_TAG.CONSOLE: 2}
+		assert mailbox.take_dropped() == {}
+
+		# Debug refused once at the reserve, others
+		# take the space.
+		mailbox = lca.LogMailbox(maxsize=4, overflow=lc.LogOverflow.DROP_DEBUG)
+		for i in range(3):
+			mailbox.put(log(lc.USER_TAG.DEBUG, i), True)
+		mailbox.put(log(lc.USER_TAG.DEBUG, 3), True)
+		mailbox.put(log(lc.USER_TAG.WARNING, 4), True)
+		mailbox.put(log(lc.USER_TAG.FAULT, 5), True)
+		received = [mailbox.get()[0] for i in range(4)]
+		assert [m.address[0] for m in received] == [1, 2, 4, 5]
+		assert mailbox.take_dropped() == {lc.USER_TAG.DEBUG: 2}
+		assert mailbox.empty()
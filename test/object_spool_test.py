@@ -1,4 +1,5 @@
 # object_spool_test.py
+import time
 from unittest import TestCase
 
 import layer_cake as lc
@@ -15,6 +16,16 @@ __all__ = [
 	'TestObjectSpool',
 ]
 
+def worker(self, tag, seconds):
+	while True:
+		m = self.input()
+		if isinstance(m, lc.Stop):
+			return lc.Aborted()
+		time.sleep(seconds)
+		self.send(lc.cast_to(tag, lc.int_type), self.return_address)
+
+lc.bind(worker)
+
 class TestObjectSpool(TestCase):
 	def setUp(self):
 		# Test framework doesnt like atexit.
@@ -49,3 +60,44 @@ class TestObjectSpool(TestCase):
 
 		assert isinstance(m, lc.Returned)
 		assert isinstance(m.message, lc.Aborted)
+
+	def test_least_latency(self):
+		with lc.channel() as ch:
+			spool = ch.create(lc.ObjectSpool, None, dispatch=lc.SpoolDispatch.LEAST_LATENCY)
+			slow = ch.create(worker, 1, 0.05)
+			fast = ch.create(worker, 2, 0.0)
+			ch.send(lc.JoinSpool(worker_address=slow), spool)
+			ch.send(lc.JoinSpool(worker_address=fast), spool)
+
+			served = []
+			for i in range(20):
+				ch.send(lc.cast_to(i, lc.int_type), spool)
+				m, i = ch.select(int, lc.Faulted, lc.Stop)
+				served.append(m)
+
+			for a in (spool, slow, fast):
+				ch.send(lc.Stop(), a)
+				ch.select(lc.Returned)
+
+		assert served.count(1) < 3
+
+	def test_queue_wait(self):
+		with lc.channel() as ch:
+			spool = ch.create(lc.ObjectSpool, None, queue_wait=0.1)
+			busy = ch.create(worker, 1, 0.5)
+			ch.send(lc.JoinSpool(worker_address=busy), spool)
+
+			ch.send(lc.cast_to(1, lc.int_type), spool)
+			ch.send(lc.cast_to(2, lc.int_type), spool)
+			time.sleep(0.2)
+			ch.send(lc.cast_to(3, lc.int_type), spool)
+			m, i = ch.select(int, lc.Busy, lc.Faulted, lc.Stop)
+			assert isinstance(m, lc.Busy)
+			m, i = ch.select(int, lc.Busy, lc.Faulted, lc.Stop)
+			assert m == 1
+			m, i = ch.select(int, lc.Busy, lc.Faulted, lc.Stop)
+			assert m == 1
+
+			for a in (spool, busy):
+				ch.send(lc.Stop(), a)
+				ch.select(lc.Returned)
@@ -2,11 +2,20 @@
 import uuid
 from unittest import TestCase
 
+import re
 import layer_cake as lc
+from layer_cake.object_directory import SearchIndex, literal_prefix, ListingJournal
+from layer_cake.object_directory import ObjectDirectory, DirectorySync, DirectoryDelta, PublishedDirectory, ClearListings
+from layer_cake.object_directory import ObjectDirectory_READY_Connected, ObjectDirectory_READY_T3
+from layer_cake.object_directory import ObjectDirectory_READY_Closed, ObjectDirectory_READY_DirectorySync
+from layer_cake.object_directory import ObjectDirectory_READY_DirectoryDelta
 import test_directory
 
 __all__ = [
 	'TestPublishSubscribe',
+	'TestSearchIndex',
+	'TestListingJournal',
+	'TestDirectorySync',
 ]
 
 class TestPublishSubscribe(TestCase):
@@ -156,4 +165,175 @@ class TestPublishSubscribe(TestCase):
 		assert isinstance(selected, lc.Ack)
 
 table_type = lc.def_type(list[list[float]])
-'''
\ No newline at end of file
+'''
+
+class TestSearchIndex(TestCase):
+	def test_literal_prefix(self):
+		assert literal_prefix('abc') == ('abc', True)
+		assert literal_prefix('a\\.b') == ('a.b', True)
+		assert literal_prefix('svc-.*') == ('svc-', False)
+		assert literal_prefix('ab*') == ('a', False)
+		assert literal_prefix('x(a|b)') == ('x', False)
+		assert literal_prefix('ab|cd') == ('', False)
+		assert literal_prefix('(?i)abc') == ('', False)
+
+	def test_matching(self):
+		names = ['abc', 'abd', 'ab', 'svc-1', 'svc-12', 'svc-2', 'other']
+		searches = ['abc', 'ab.', 'svc-1.*', 'svc-[0-9]', '.*', 'a|svc-2', 'none']
+		index = SearchIndex()
+		for s in searches:
+			index.add_search(s, re.compile(s))
+		for n in names:
+			index.add_name(n)
+
+		for n in names:
+			expected = {s for s in searches if re.fullmatch(s, n)}
+			assert set(index.searches(n)) == expected
+		for s in searches:
+			expected = {n for n in names if re.fullmatch(s, n)}
+			assert set(index.names(s)) == expected
+
+		index.remove_search('svc-1.*')
+		index.remove_name('svc-12')
+		assert set(index.searches('svc-1')) == {'svc-[0-9]', '.*'}
+		assert set(index.names('.*')) == set(names) - {'svc-12'}
+
+def published(name):
+	return lc.Published(name=name, scope=lc.ScopeOfDirectory.HOST, published_id=uuid.uuid4())
+
+def subscribed(search):
+	return lc.Subscribed(search=search, scope=lc.ScopeOfDirectory.HOST, subscribed_id=uuid.uuid4())
+
+class TestListingJournal(TestCase):
+	def test_since(self):
+		j = ListingJournal()
+		a, b, c = published('a'), published('b'), subscribed('a')
+		assert j.add(a) and j.add(b) and j.add(c)
+		assert not j.add(a)
+		assert j.version == 3
+
+		held = j.version
+		d = published('d')
+		j.add(d)
+		j.clear(set(), {b.published_id})
+		j.clear({c.subscribed_id}, set())
+		p, s, subscribers, publishers = j.since(held)
+		assert [x.published_id for x in p] == [d.published_id]
+		assert s == []
+		assert subscribers == {c.subscribed_id}
+		assert publishers == {b.published_id}
+
+		# Added and cleared within the window.
+		held = j.version
+		e = published('e')
+		j.add(e)
+		j.clear(set(), {e.published_id})
+		p, s, subscribers, publishers = j.since(held)
+		assert p == [] and publishers == {e.published_id}
+
+		assert j.since(j.version) == ([], [], set(), set())
+		assert j.since(j.version + 1) is None
+		assert j.since(0) is None
+
+	def test_full(self):
+		j = ListingJournal()
+		a, b = published('a'), subscribed('b')
+		j.add(a)
+		j.add(b)
+		digest = j.digest()
+		p, s = j.full()
+		assert p[0] is a and s[0] is b
+
+		j.clear(set(), {a.published_id})
+		assert j.digest() != digest
+		j.add(a)
+		assert j.digest() == digest
+
+	def test_limit(self):
+		j = ListingJournal(limit=4)
+		for i in range(4):
+			j.add(published(f'n{i}'))
+		assert j.since(1) is not None
+		j.add(published('n4'))
+		assert j.since(1) is not None
+		j.add(published('n5'))
+		assert j.since(1) is None
+		p, s, subscribers, publishers = j.since(2)
+		assert len(p) == 4
+
+# Directory handlers driven without the runtime. Sends
+# are collected rather than delivered.
+class SyncDirectory(ObjectDirectory):
+	def __init__(self):
+		ObjectDirectory.__init__(self, directory_scope=lc.ScopeOfDirectory.HOST)
+		self.sent = []
+		self.started = []
+
+	def send(self, message, to_address):
+		self.sent.append(message)
+
+	def reply(self, message):
+		self.sent.append(message)
+
+	def start(self, timer, seconds, repeating=False):
+		self.started.append(timer)
+
+	def cancel(self, timer):
+		pass
+
+	def console(self, *args, **kw):
+		pass
+
+	def warning(self, *args, **kw):
+		pass
+
+	def receive(self, handler, message, k):
+		self.return_address = (k,)
+		handler(self, message)
+
+	def accept(self, k, directory_id, published):
+		self.accepted[k] = [lc.Accepted(), set(), set()]
+		self.receive(ObjectDirectory_READY_DirectorySync, DirectorySync(directory_id=directory_id, reconnect_delay=1.0), k)
+		self.receive(ObjectDirectory_READY_DirectoryDelta, DirectoryDelta(version=1, full=True, published=published), k)
+
+class TestDirectorySync(TestCase):
+	def test_restart_in_grace(self):
+		d = SyncDirectory()
+		first = published('svc')
+		d.accept(1, uuid.uuid4(), [first])
+		assert d.published_name['svc'][0] is first
+
+		# Lost and restarted, with a new identity.
+		closed = lc.Closed(reason=lc.EndOfTransport.WENT_STALE)
+		d.receive(ObjectDirectory_READY_Closed, closed, 1)
+		assert len(d.retained) == 1
+		assert d.published_name['svc'][0] is first
+
+		second = published('svc')
+		d.accept(2, uuid.uuid4(), [second])
+		assert d.published_name['svc'][0] is second
+		assert first.published_id not in d.listed_publisher
+		r = list(d.retained.values())[0]
+		assert not r.published
+
+	def test_legacy_parent(self):
+		d = SyncDirectory()
+		d.directory_scope = lc.ScopeOfDirectory.GROUP
+		a = published('a')
+		d.journal.add(a)
+
+		d.receive(ObjectDirectory_READY_Connected, lc.Connected(proxy_address=(3,)), 3)
+		assert isinstance(d.sent[-1], DirectorySync)
+		assert lc.T3 in d.started
+
+		# No answer from the parent.
+		d.receive(ObjectDirectory_READY_T3, lc.T3(), 3)
+		assert isinstance(d.sent[-1], PublishedDirectory)
+		assert d.sent[-1].published == [a]
+
+		b = published('b')
+		d.send_up(b)
+		assert d.sent[-1] is b
+		d.clear_up(set(), {a.published_id})
+		assert isinstance(d.sent[-1], ClearListings)
+		assert d.sent[-1].publishers == {a.published_id}
@@ -89,3 +89,56 @@ class TestRollingLog(TestCase):
 
 		assert len(read) == 15
 		assert len(rewind) == 15
+
+	def test_buffered(self):
+		rolling = rl.RollingLog(self.name, lines_in_file=100, files_in_folder=10, buffered=True, flush_interval=60.0)
+		path = rolling.opened.name
+		now = lc.clock_now()
+
+		def lines():
+			with open(path, 'r') as f:
+				return f.readlines()
+
+		rolling(lc.PointLog(stamp=now, tag=lc.USER_TAG.DEBUG, address=(1,), name='Hortense', text='blah'))
+		rolling(lc.PointLog(stamp=now, tag=lc.USER_TAG.DEBUG, address=(1,), name='Hortense', text='blah'))
+		assert len(lines()) == 0
+
+		# Immediate on a warning.
+		rolling(lc.PointLog(stamp=now, tag=lc.USER_TAG.WARNING, address=(1,), name='Hortense', text='blah'))
+		assert len(lines()) == 3
+
+		# Held until the interval passes.
+		rolling(lc.PointLog(stamp=now + 1.0, tag=lc.USER_TAG.DEBUG, address=(1,), name='Hortense', text='blah'))
+		assert len(lines()) == 3
+		rolling(lc.PointLog(stamp=now + 61.0, tag=lc.USER_TAG.DEBUG, address=(1,), name='Hortense', text='blah'))
+		assert len(lines()) == 5
+
+		rolling(lc.PointLog(stamp=now + 61.0, tag=lc.USER_TAG.DEBUG, address=(1,), name='Hortense', text='blah'))
+		rolling.flush()
+		read = lines()
+		assert len(read) == 6
+		assert read[0].startswith(rolling.log_time(now))
+		rolling.close_file(rolling.opened)
+
+	def test_index(self):
+		rolling = rl.RollingLog(self.name, lines_in_file=2000, files_in_folder=10)
+		start = lc.clock_now() - 100.0
+		for i in range(1000):
+			rolling(lc.PointLog(stamp=start + i * 0.05, tag=lc.USER_TAG.CONSOLE, address=(i,), name='Hortense', text='blah'))
+		rolling.close_file(rolling.opened)
+
+		path = rolling.opened.name
+		times, offsets = rl.read_index(path)
+		assert len(times) == 1000 // rl.INDEX_LINES + 1
+		with open(path, 'rb') as f:
+			f.seek(offsets[2])
+			assert f.readline().decode().startswith(rolling.log_time(start + rl.INDEX_LINES * 2 * 0.05))
+
+		begin = lc.text_to_world(rolling.log_time(start + 700 * 0.05))
+		read = [r for r in rl.read_log(rolling, begin, None, 3)]
+		assert [int(l.split('<')[1][:8], 16) for d, l in read] == [700, 701, 702]
+
+		rewind = [r for r in rl.rewind_log(rolling, 5, None, None)]
+		assert [int(l.split('<')[1][:8], 16) for d, l in rewind] == [995, 996, 997, 998, 999]
+		assert rl.tail_lines(path, 0) == []
+		assert len(rl.tail_lines(path, 2000)) == 1000
@@ -36,3 +36,14 @@ class TestStateless(TestCase):
 		assert f == Main_dict_UUID_Person
 		m, p, a, f = stateless.transition(lc.Stop())
 		assert f == Main_Stop
+
+	def test_resolved(self):
+		stateless = Main()
+		for i in range(2):
+			m, p, a, f = stateless.transition(lc.Stop())
+			assert f == Main_Stop
+			m, p, a, f = stateless.transition(lc.Ack())
+			assert f is None
+		resolved = Main.__art__.resolved
+		assert resolved[lc.Stop.__art__] == Main_Stop
+		assert resolved[lc.Ack.__art__] is None
@@ -46,3 +46,18 @@ class TestStateMachine(TestCase):
 		assert f == Main_READY_Faulted
 		m, p, a, f = statemachine.transition(READY, lc.Ack())
 		assert f == Main_READY_Unknown
+
+	def test_resolved(self):
+		statemachine = Main()
+		for i in range(2):
+			m, p, a, f = statemachine.transition(READY, lc.Aborted())
+			assert f == Main_READY_Faulted		# Base-derived match.
+			m, p, a, f = statemachine.transition(INITIAL, lc.Aborted())
+			assert f == Main_INITIAL_Faulted
+			m, p, a, f = statemachine.transition(READY, lc.cast_to(42, lc.int_type))
+			assert f == Main_READY_int
+			m, p, a, f = statemachine.transition(INITIAL, lc.cast_to(42, lc.int_type))
+			assert f == Main_INITIAL_Unknown
+		resolved = Main.__art__.resolved
+		assert (READY, lc.Aborted.__art__) in resolved
+		assert (INITIAL, lc.Aborted.__art__) in resolved